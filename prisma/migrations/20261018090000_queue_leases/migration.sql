@@ -0,0 +1,8 @@
+-- AlterTable
+ALTER TABLE "QueuedRequest" ADD COLUMN     "attempts" INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN     "claimedBy" TEXT,
+ADD COLUMN     "leaseExpiresAt" TIMESTAMP(3),
+ADD COLUMN     "nextAttemptAt" TIMESTAMP(3);
+
+-- CreateIndex
+CREATE INDEX "QueuedRequest_status_leaseExpiresAt_idx" ON "QueuedRequest"("status", "leaseExpiresAt");
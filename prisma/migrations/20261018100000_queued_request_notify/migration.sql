@@ -0,0 +1,17 @@
+-- Wake script/scrape_daemon.py (LISTEN queued_request) whenever a request becomes pending:
+-- new requests from /api/scrape, retries, and leases returned to the queue.
+
+-- CreateFunction
+CREATE OR REPLACE FUNCTION "notify_queued_request"() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('queued_request', NEW."id");
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- CreateTrigger
+CREATE TRIGGER "QueuedRequest_notify"
+AFTER INSERT OR UPDATE OF "status" ON "QueuedRequest"
+FOR EACH ROW
+WHEN (NEW."status" = 'pending')
+EXECUTE FUNCTION "notify_queued_request"();
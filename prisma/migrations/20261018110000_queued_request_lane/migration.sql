@@ -0,0 +1,8 @@
+-- Scheduling lane: 'interactive' for requests made through /api/scrape (and retries),
+-- 'bulk' for background refreshes re-queued by script/queue_refreshes.py.
+
+-- AlterTable
+ALTER TABLE "QueuedRequest" ADD COLUMN     "lane" TEXT NOT NULL DEFAULT 'interactive';
+
+-- CreateIndex
+CREATE INDEX "QueuedRequest_status_lane_idx" ON "QueuedRequest"("status", "lane");
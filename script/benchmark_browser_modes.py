@@ -0,0 +1,92 @@
+"""Compares the default and lean (--lean) browser modes on real profile pages.
+
+For each mode it starts a fresh Chrome, logs in from the saved cookies and loads
+the same profiles, reporting bytes transferred, page-ready time (profile header
+rendered) and the resident memory of the whole Chrome process tree.
+
+Usage: python benchmark_browser_modes.py [--profiles N] [username ...]
+"""
+import argparse
+import json
+import sys
+import time
+
+from browser import start_browser, chrome_rss_bytes
+from page_waits import wait_for_header
+from insta_scraper import (
+    COOKIES_FILE, INSTAGRAM_URL, USERNAMES_FILE,
+    load_cookies, is_logged_in, read_usernames_from_file
+)
+
+def drain_transferred_bytes(driver):
+    """Returns the bytes received since the last call, from Chrome's performance log."""
+    total = 0
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message.get("method") == "Network.loadingFinished":
+            total += message["params"].get("encodedDataLength", 0)
+    return total
+
+def benchmark_mode(lean, usernames):
+    """Loads every profile in one browser mode and returns a list of per-profile measurements."""
+    driver = start_browser(lean, performance_log=True)
+    if driver is None:
+        print("ERROR: Failed to initialize Chrome WebDriver.")
+        sys.exit(1)
+
+    results = []
+    try:
+        if not (load_cookies(driver, COOKIES_FILE) and is_logged_in(driver)):
+            print("Benchmark needs valid saved cookies. Run insta_scraper.py once to log in.")
+            sys.exit(1)
+
+        for username in usernames:
+            drain_transferred_bytes(driver)
+            started = time.time()
+            driver.get(f"{INSTAGRAM_URL}{username}/")
+            ready = wait_for_header(driver) is not None
+            ready_seconds = time.time() - started
+            # Let late requests (lazy images, video segments) land before counting bytes
+            time.sleep(2)
+            results.append({
+                "username": username,
+                "ready": ready,
+                "ready_seconds": ready_seconds,
+                "bytes": drain_transferred_bytes(driver),
+                "rss": chrome_rss_bytes(driver),
+            })
+    finally:
+        driver.quit()
+    return results
+
+def print_summary(mode, results):
+    """Prints the average measurements for one mode."""
+    if not results:
+        print(f"{mode}: no results")
+        return
+    count = len(results)
+    avg_ready = sum(r["ready_seconds"] for r in results) / count
+    avg_kb = sum(r["bytes"] for r in results) / count / 1024
+    rss_values = [r["rss"] for r in results if r["rss"] is not None]
+    peak_rss = f"{max(rss_values) / (1024 * 1024):.0f} MB" if rss_values else "n/a"
+    print(f"{mode:<8} profiles={count} avg_ready={avg_ready:.2f}s avg_transfer={avg_kb:.0f} KB peak_chrome_rss={peak_rss}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark default vs lean browser mode')
+    parser.add_argument('usernames', nargs='*', help='Profiles to load (default: first entries of usernames.txt)')
+    parser.add_argument('--profiles', type=int, default=5, help='Number of profiles from usernames.txt (default: 5)')
+    args = parser.parse_args()
+
+    usernames = args.usernames or read_usernames_from_file(USERNAMES_FILE)[:args.profiles]
+    if not usernames:
+        print("No usernames to benchmark.")
+        sys.exit(1)
+
+    summaries = []
+    for mode, lean in (("default", False), ("lean", True)):
+        print(f"\n=== Benchmarking {mode} mode on {len(usernames)} profiles ===")
+        summaries.append((mode, benchmark_mode(lean, usernames)))
+
+    print("\n=== Browser mode comparison ===")
+    for mode, results in summaries:
+        print_summary(mode, results)
@@ -0,0 +1,86 @@
+"""Compares row-by-row sync throughput at different transaction sizes (--commit-every).
+
+Generates synthetic profiles (with reels) under a unique username prefix, syncs
+them with update_database.sync_profiles at each batch size, and deletes them
+again afterwards. Point it at a scratch database: it needs DATABASE_URL (from
+.env like the other tools) to be a database it may write to.
+
+Usage: python benchmark_db_sync.py [--profiles N] [--reels N] [--sizes 1 50 500]
+"""
+import argparse
+import sys
+import time
+import uuid
+
+from db import load_env, connect_to_database, release_connection, close_pool
+from update_database import get_schema, sync_profiles
+
+def synthetic_profiles(prefix, count, reels_per_profile):
+    """Returns count profile records shaped like the scraper's output."""
+    scrape_time = time.strftime("%Y-%m-%d %H:%M:%S")
+    profiles = []
+    for i in range(count):
+        username = f"{prefix}{i}"
+        profiles.append({
+            "username": username,
+            "full_name": f"Benchmark {i}",
+            "bio": "Synthetic profile for benchmark_db_sync.py",
+            "followers_count": 1000 + i,
+            "following_count": 100,
+            "posts_count": 10,
+            "is_verified": False,
+            "is_private": False,
+            "scrape_time": scrape_time,
+            "reels_count": reels_per_profile,
+            "reels": [{
+                "id": f"{username}_reel{j}",
+                "url": f"https://www.instagram.com/{username}/reel/{j}/",
+                "views": j * 100,
+                "likes": j * 10,
+                "comments": j,
+            } for j in range(reels_per_profile)],
+        })
+    return profiles
+
+def delete_benchmark_rows(conn, prefix):
+    """Removes the synthetic profiles (reels go with them via ON DELETE CASCADE)."""
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM "InstagramProfile" WHERE username LIKE %s', (f"{prefix}%",))
+    conn.commit()
+    cursor.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark update_database.py transaction batching')
+    parser.add_argument('--profiles', type=int, default=1000, help='Profiles per run (default: 1000)')
+    parser.add_argument('--reels', type=int, default=10, help='Reels per profile (default: 10)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 50, 500], help='--commit-every values to compare (default: 1 50 500)')
+    args = parser.parse_args()
+
+    if not load_env():
+        sys.exit(1)
+    conn = connect_to_database()
+    get_schema(conn)
+
+    results = []
+    try:
+        for size in args.sizes:
+            prefix = f"bench_{uuid.uuid4().hex[:8]}_"
+            profiles = synthetic_profiles(prefix, args.profiles, args.reels)
+            print(f"\n=== commit-every {size}: {len(profiles)} profiles, {args.reels} reels each ===")
+            try:
+                # The first pass inserts, the second updates the same rows
+                for phase in ("insert", "update"):
+                    started = time.time()
+                    # flush_seconds is effectively off so only the batch size decides commits
+                    sync_profiles(conn, profiles, commit_every=size, flush_seconds=3600)
+                    results.append((size, phase, time.time() - started))
+            finally:
+                delete_benchmark_rows(conn, prefix)
+    finally:
+        release_connection(conn)
+        close_pool()
+
+    print("\n=== Sync throughput by transaction size ===")
+    print(f"{'commit-every':>12} {'phase':>8} {'seconds':>9} {'profiles/s':>11}")
+    for size, phase, elapsed in results:
+        print(f"{size:>12} {phase:>8} {elapsed:>9.2f} {args.profiles / elapsed if elapsed else 0:>11.1f}")
@@ -0,0 +1,159 @@
+"""Chrome setup shared by the Selenium scripts.
+
+Lean mode runs Chrome headless and blocks images, media and fonts at the
+DevTools network layer. The blocked URLs are still present in the DOM, so
+`src` attributes (profile pictures, thumbnails) are scraped exactly as before;
+only the downloads are skipped.
+"""
+import os
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# --- Configuration ---
+CHROMEDRIVER_PATHS = ['/usr/local/bin/chromedriver', './chromedriver']
+
+# URL patterns for resources we never read in lean mode. The trailing '*' also
+# matches CDN query strings and byte-range parameters on video segments.
+BLOCKED_URL_PATTERNS = [
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.heic*", "*.svg*", "*.ico*",
+    "*.mp4*", "*.m4v*", "*.m4a*", "*.webm*", "*.mp3*", "*.aac*",
+    "*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*",
+]
+
+def build_chrome_options(lean=False, performance_log=False, page_load_strategy=None):
+    """Builds the Chrome options used for scrape sessions.
+    performance_log records DevTools network events for get_log('performance').
+    page_load_strategy "none" stops ChromeDriver blocking on loading pages (used with --tabs)."""
+    chrome_options = Options()
+    if page_load_strategy:
+        chrome_options.page_load_strategy = page_load_strategy
+    # Uncomment these as needed for troubleshooting
+    # chrome_options.add_argument("--no-sandbox")
+    # chrome_options.add_argument("--disable-dev-shm-usage")
+    if lean:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1366,768")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--autoplay-policy=user-gesture-required")
+        # Belt and braces: also tell Chrome not to render images at all
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+    if performance_log:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return chrome_options
+
+def enable_resource_blocking(driver, patterns=None):
+    """Blocks requests matching patterns (default BLOCKED_URL_PATTERNS) via the DevTools protocol.
+    The block list applies to the current tab only; the patterns are remembered on the driver
+    (driver.blocked_url_patterns) so tabs opened later can be given the same list."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns or BLOCKED_URL_PATTERNS})
+        driver.blocked_url_patterns = patterns or BLOCKED_URL_PATTERNS
+        print(f"Blocking {len(patterns or BLOCKED_URL_PATTERNS)} resource URL patterns")
+        return True
+    except Exception as e:
+        print(f"Warning: Could not enable resource blocking: {e}")
+        return False
+
+def create_driver(chrome_options):
+    """Initializes a Chrome WebDriver, falling back to known chromedriver paths.
+    Returns None if no driver could be started."""
+    print("Initializing Chrome driver...")
+    try:
+        # First attempt: standard initialization
+        new_driver = webdriver.Chrome(options=chrome_options)
+        print("Chrome WebDriver successfully initialized!")
+        return new_driver
+    except Exception as e:
+        print(f"Standard Chrome initialization failed: {e}")
+        print("Attempting to initialize with Service...")
+
+    # Second attempt: with explicit ChromeDriver path
+    # You might need to adjust this path to where you placed your chromedriver
+    # For Mac users, default paths could be /usr/local/bin/chromedriver
+    for webdriver_path in CHROMEDRIVER_PATHS:
+        if os.path.exists(webdriver_path):
+            print(f"Found WebDriver at {webdriver_path}")
+            service = Service(executable_path=webdriver_path)
+            new_driver = webdriver.Chrome(service=service, options=chrome_options)
+            print(f"Chrome WebDriver initialized with {webdriver_path}!")
+            return new_driver
+
+    print("ERROR: ChromeDriver not found at default or local paths.")
+    print("Please download ChromeDriver from https://chromedriver.chromium.org/downloads")
+    print("Place it in /usr/local/bin/ or in the same directory as this script.")
+    return None
+
+def start_browser(lean=False, chrome_options=None, performance_log=False, page_load_strategy=None):
+    """Starts Chrome in normal or lean mode. Returns the driver, or None on failure."""
+    new_driver = create_driver(chrome_options or build_chrome_options(lean, performance_log, page_load_strategy))
+    if new_driver is not None and lean:
+        enable_resource_blocking(new_driver)
+    return new_driver
+
+def attach_browser(debugger_address, lean=False, performance_log=False, page_load_strategy=None):
+    """Attaches to an already running Chrome (see browser_daemon.py) instead of launching one.
+    Returns the driver, or None on failure."""
+    chrome_options = Options()
+    chrome_options.debugger_address = debugger_address
+    if page_load_strategy:
+        chrome_options.page_load_strategy = page_load_strategy
+    if performance_log:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    print(f"Attaching to browser at {debugger_address}...")
+    new_driver = create_driver(chrome_options)
+    if new_driver is not None:
+        new_driver.attached = True
+        if lean:
+            enable_resource_blocking(new_driver)
+    return new_driver
+
+def release_browser(driver):
+    """Ends the WebDriver session. An attached daemon browser is left running for the next run."""
+    if getattr(driver, "attached", False):
+        print("Detaching from browser (left running).")
+        driver.service.stop()
+    else:
+        print("Closing browser.")
+        driver.quit()
+
+def chrome_rss_bytes(driver):
+    """Returns the summed RSS of chromedriver and every Chrome process it spawned, or None."""
+    root_pid = driver.service.process.pid
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            processes = [root] + root.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes if p.is_running())
+        except psutil.Error:
+            return None
+
+    # Linux fallback without psutil: walk /proc for the process tree
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    rss_pages = {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(pid))
+            rss_pages[int(pid)] = int(fields[21])
+        except (OSError, IndexError, ValueError):
+            continue
+    total_pages = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total_pages += rss_pages.get(pid, 0)
+        pending.extend(children.get(pid, []))
+    return total_pages * os.sysconf("SC_PAGE_SIZE")
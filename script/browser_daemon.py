@@ -0,0 +1,140 @@
+"""Long-lived Chrome that scraper runs attach to over the remote debugging port.
+
+Starting Chrome, loading cookies and checking the login costs tens of seconds
+on every cron run. This keeps one browser running between runs, with its own
+profile directory so the Instagram session survives, and insta_scraper.py
+attaches to it with --attach instead of launching a new one.
+
+Usage: python browser_daemon.py {start,stop,status} [--port 9222] [--headless]
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+import urllib.error
+
+# --- Configuration ---
+DEFAULT_PORT = 9222
+PID_FILE = "browser_daemon.pid"
+PROFILE_DIR = "chrome-profile"  # Persistent user data dir, keeps cookies between runs
+LOG_FILE = "browser_daemon.log"
+STARTUP_TIMEOUT = 20
+CHROME_CANDIDATES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+def find_chrome_binary():
+    """Returns the Chrome executable to launch, honouring CHROME_BINARY if set."""
+    configured = os.getenv("CHROME_BINARY")
+    if configured:
+        return configured
+    for candidate in CHROME_CANDIDATES:
+        path = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+        if path and os.path.exists(path):
+            return path
+    return None
+
+def debugger_version(port):
+    """Returns the /json/version info of a browser listening on port, or None."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=2) as response:
+            return json.load(response)
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+def read_pid():
+    """Returns the recorded daemon pid if that process is still alive, else None."""
+    if not os.path.exists(PID_FILE):
+        return None
+    try:
+        with open(PID_FILE) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        return pid
+    except (ValueError, OSError):
+        return None
+
+def start_daemon(port, headless=False):
+    """Launches a detached Chrome with remote debugging enabled, unless one is already listening."""
+    info = debugger_version(port)
+    if info:
+        print(f"Browser already running on port {port}: {info.get('Browser')}")
+        return True
+
+    chrome_binary = find_chrome_binary()
+    if not chrome_binary:
+        print("ERROR: Chrome not found. Set CHROME_BINARY to the Chrome executable.")
+        return False
+
+    command = [
+        chrome_binary,
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={os.path.abspath(PROFILE_DIR)}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "about:blank",
+    ]
+    if headless:
+        command.insert(1, "--headless=new")
+
+    print(f"Starting {chrome_binary} on debugging port {port}...")
+    with open(LOG_FILE, "ab") as log:
+        # New session so the browser outlives this process and the cron job that started it
+        process = subprocess.Popen(command, stdout=log, stderr=log, stdin=subprocess.DEVNULL, start_new_session=True)
+    with open(PID_FILE, "w") as f:
+        f.write(str(process.pid))
+
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        info = debugger_version(port)
+        if info:
+            print(f"Browser daemon ready (pid {process.pid}): {info.get('Browser')}")
+            return True
+        if process.poll() is not None:
+            break
+        time.sleep(0.5)
+    print(f"ERROR: Browser did not start listening on port {port}. See {LOG_FILE}.")
+    return False
+
+def stop_daemon():
+    """Terminates the daemon browser started by this script."""
+    pid = read_pid()
+    if pid is None:
+        print("Browser daemon is not running.")
+    else:
+        os.kill(pid, signal.SIGTERM)
+        print(f"Stopped browser daemon (pid {pid}).")
+    if os.path.exists(PID_FILE):
+        os.remove(PID_FILE)
+    return True
+
+def print_status(port):
+    """Prints whether the daemon is running and reachable. Returns True if it is."""
+    pid = read_pid()
+    info = debugger_version(port)
+    if info:
+        print(f"Browser daemon listening on port {port} (pid {pid or 'unknown'}): {info.get('Browser')}")
+        return True
+    print(f"No browser listening on port {port}.")
+    return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Persistent Chrome for insta_scraper.py --attach')
+    parser.add_argument('command', choices=['start', 'stop', 'status'])
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Remote debugging port (default: {DEFAULT_PORT})')
+    parser.add_argument('--headless', action='store_true', help='Run the daemon browser headless')
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        ok = start_daemon(args.port, args.headless)
+    elif args.command == 'stop':
+        ok = stop_daemon()
+    else:
+        ok = print_status(args.port)
+    sys.exit(0 if ok else 1)
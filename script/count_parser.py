@@ -0,0 +1,55 @@
+"""Parses follower/like/view counts as Instagram displays them.
+
+Handles thousands separators ("1,234", Indian "1,00,000"), decimal
+abbreviations ("19.6K", "2.3M", "1B", "5 million") and the Indian units
+lakh/lac and crore/cr ("1.2 lakh", "3 cr"). Only a suffix directly after the
+number counts, so "1,234 posts" or a stray "k" elsewhere in the text never
+changes the value. Nothing is printed; unparseable text returns None.
+"""
+import re
+
+# --- Configuration ---
+MULTIPLIERS = {
+    "k": 1000, "thousand": 1000,
+    "m": 1000000, "million": 1000000,
+    "b": 1000000000, "billion": 1000000000,
+    "l": 100000, "lakh": 100000, "lakhs": 100000, "lac": 100000, "lacs": 100000,
+    "cr": 10000000, "crore": 10000000, "crores": 10000000,
+}
+# Longest alternatives first so "cr" does not stop short of "crore"
+SUFFIX_ALTERNATIVES = "|".join(sorted(MULTIPLIERS, key=len, reverse=True))
+COUNT_PATTERN = re.compile(
+    r"(\d[\d,]*(?:\.\d+)?)(?:\s*(" + SUFFIX_ALTERNATIVES + r")(?![a-z])\.?)?", re.IGNORECASE)
+
+def parse_count(text):
+    """Returns the first count in text as an int, or None if there is none."""
+    if not text:
+        return None
+    match = COUNT_PATTERN.search(text)
+    if not match:
+        return None
+    number, suffix = match.groups()
+    number = number.replace(",", "")
+    if not suffix:
+        return int(float(number)) if "." in number else int(number)
+    # Round rather than truncate: 2.3 * 1000000 is 2299999.9999999995 in floating point
+    return int(round(float(number) * MULTIPLIERS[suffix.lower()]))
+
+def parse_counts(texts):
+    """Parses every text in an iterable, returning a list of ints (None where unparseable)."""
+    search = COUNT_PATTERN.search
+    multipliers = MULTIPLIERS
+    results = []
+    append = results.append
+    for text in texts:
+        match = search(text) if text else None
+        if not match:
+            append(None)
+            continue
+        number, suffix = match.groups()
+        number = number.replace(",", "")
+        if not suffix:
+            append(int(float(number)) if "." in number else int(number))
+        else:
+            append(int(round(float(number) * multipliers[suffix.lower()])))
+    return results
@@ -0,0 +1,162 @@
+"""Shared Postgres access for the script/ database tools.
+
+db_to_usernames.py, update_database.py and update_completion.py (and any
+long-running worker) take connections from one thread-safe pool instead of
+opening a fresh psycopg2 connection each, so a daemon pays the TCP, TLS and
+auth handshake once rather than per batch. Connections are opened with a
+connect timeout, a statement timeout and TCP keepalives, and a connection
+that sat idle is pinged before it is handed out again.
+
+Settings come from the environment (.env): DATABASE_URL, plus the optional
+DB_POOL_MIN, DB_POOL_MAX, DB_CONNECT_TIMEOUT (seconds), DB_STATEMENT_TIMEOUT
+(milliseconds) and DB_HEALTH_CHECK_IDLE (seconds).
+"""
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import dotenv
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+# --- Configuration ---
+ENV_PATHS = ['.env', '../.env']
+APPLICATION_NAME = "insta-scrapper-scripts"
+KEEPALIVE_IDLE = 30  # Seconds before the first keepalive probe
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+POOL_WAIT_TIMEOUT = 60  # Seconds get_connection waits for a free connection
+
+pool = None
+pool_lock = threading.Lock()
+pool_slots = None
+last_released = weakref.WeakKeyDictionary()  # connection -> time it was returned to the pool
+connection_owners = weakref.WeakKeyDictionary()  # connection -> (pool, pool_slots) it was taken from
+
+def load_env():
+    """Load environment variables from .env file."""
+    for path in ENV_PATHS:
+        if os.path.exists(path):
+            dotenv.load_dotenv(path)
+            print(f"Loaded environment from {path}")
+            return True
+
+    print("Error: No .env file found")
+    return False
+
+def env_number(name, default, kind=int):
+    value = os.getenv(name)
+    return kind(value) if value else default
+
+def connection_options():
+    """Returns the psycopg2.connect keyword arguments applied to every pooled connection."""
+    statement_timeout = env_number("DB_STATEMENT_TIMEOUT", 60000)
+    return {
+        "connect_timeout": env_number("DB_CONNECT_TIMEOUT", 10),
+        "keepalives": 1,
+        "keepalives_idle": KEEPALIVE_IDLE,
+        "keepalives_interval": KEEPALIVE_INTERVAL,
+        "keepalives_count": KEEPALIVE_COUNT,
+        "application_name": APPLICATION_NAME,
+        "options": f"-c statement_timeout={statement_timeout}",
+    }
+
+def get_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global pool, pool_slots
+    with pool_lock:
+        if pool is None:
+            database_url = os.getenv("DATABASE_URL")
+            if not database_url:
+                raise psycopg2.OperationalError("DATABASE_URL not found in environment variables")
+            max_connections = env_number("DB_POOL_MAX", 5)
+            print("Connecting to database...")
+            pool = ThreadedConnectionPool(
+                min(env_number("DB_POOL_MIN", 1), max_connections), max_connections,
+                database_url, **connection_options())
+            # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+            pool_slots = threading.BoundedSemaphore(max_connections)
+            print("Connected to database successfully")
+        return pool
+
+def is_healthy(conn):
+    """Pings a connection with SELECT 1. Returns False if it is closed or the ping fails."""
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def get_connection(timeout=POOL_WAIT_TIMEOUT):
+    """Takes a connection from the pool, waiting up to timeout seconds for one to be free.
+    Connections idle longer than DB_HEALTH_CHECK_IDLE seconds are pinged first and
+    replaced if the server or network dropped them."""
+    connection_pool = get_pool()
+    if not pool_slots.acquire(timeout=timeout):
+        raise PoolError(f"No database connection free after {timeout}s")
+    try:
+        health_check_idle = env_number("DB_HEALTH_CHECK_IDLE", 30, float)
+        while True:
+            conn = connection_pool.getconn()
+            idle = time.time() - last_released.get(conn, time.time())
+            if conn.closed == 0 and (idle < health_check_idle or is_healthy(conn)):
+                connection_owners[conn] = (connection_pool, pool_slots)
+                return conn
+            print("Discarding a dead database connection")
+            connection_pool.putconn(conn, close=True)
+    except Exception:
+        pool_slots.release()
+        raise
+
+def release_connection(conn, close=False):
+    """Returns a connection to the pool, rolling back anything left uncommitted.
+    If the pool was closed (or replaced) since the connection was taken, it is just closed."""
+    owner = connection_owners.pop(conn, None)
+    if owner is None or owner[0] is not pool or owner[0].closed:
+        if not conn.closed:
+            conn.close()
+        return
+    connection_pool, slots = owner
+    if conn.closed == 0 and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            close = True
+    last_released[conn] = time.time()
+    connection_pool.putconn(conn, close=close or bool(conn.closed))
+    slots.release()
+
+@contextmanager
+def connection():
+    """Context manager form of get_connection/release_connection."""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+def close_pool():
+    """Closes every pooled connection (call once when the process is done with the database)."""
+    global pool
+    with pool_lock:
+        if pool is not None:
+            pool.closeall()
+            pool = None
+            print("Database connection closed")
+
+def connect_to_database():
+    """Takes a pooled connection for a command-line tool, exiting if the database is unreachable.
+    Return it with release_connection()."""
+    try:
+        return get_connection()
+    except Exception as e:
+        print(f"Error connecting to database: {e}")
+        sys.exit(1)
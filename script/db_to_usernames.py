@@ -1,121 +1,159 @@
-import os
 import sys
-import psycopg2
-import dotenv
+import argparse
 from datetime import datetime
 
+from db import load_env, connect_to_database, release_connection, close_pool
+from queue_lease import worker_id, lease_seconds, reclaim_expired
+
 # Path to the usernames.txt file
 USERNAMES_FILE = "usernames.txt"
+# Requests one run claims; the rest stay pending for other nodes or the next run
+DEFAULT_CLAIM_LIMIT = 100
+# Share of each batch the bulk lane may not use, kept free for interactive requests
+DEFAULT_INTERACTIVE_SHARE = 0.25
+# Share of each batch kept for bulk requests (at least one slot), so a steady stream of
+# interactive requests cannot starve background refreshes
+DEFAULT_BULK_SHARE = 0.1
+AGING_SECONDS = 3600  # Waiting this long is worth one priority level
 
-def load_env():
-    """Load environment variables from .env file."""
-    # Look for .env in parent directory if not in current directory
-    env_paths = ['.env', '../.env']
-    
-    for path in env_paths:
-        if os.path.exists(path):
-            dotenv.load_dotenv(path)
-            print(f"Loaded environment from {path}")
-            return True
-    
-    print("Error: No .env file found")
-    return False
+# QueuedRequest.lane, written by the producers: /api/scrape and retries queue
+# 'interactive' requests, queue_refreshes.py re-queues stale profiles as 'bulk'
+LANES = ("interactive", "bulk")
+# Prisma stores timestamps in UTC, so ages, backoff and leases are all measured against
+# the database's UTC now() rather than this node's clock
+CLAIM_QUERY = """
+WITH picked AS (
+    SELECT q.id,
+           COALESCE(sr.priority, 1)
+               - EXTRACT(EPOCH FROM timezone('utc', now()) - q."lastQueued") / %(aging)s AS effective_priority,
+           EXTRACT(EPOCH FROM timezone('utc', now()) - q."lastQueued") AS queue_wait
+    FROM "QueuedRequest" q
+    LEFT JOIN "ScrapeRequest" sr ON sr.id = q."scrapeRequestId"
+    WHERE q.status = 'pending'
+    AND (q."nextAttemptAt" IS NULL OR q."nextAttemptAt" <= timezone('utc', now()))
+    AND q.lane = %(lane)s
+    ORDER BY effective_priority ASC, q."lastQueued" ASC
+    LIMIT %(limit)s
+    FOR UPDATE OF q SKIP LOCKED
+)
+UPDATE "QueuedRequest" AS q
+SET status = 'processing', "updatedAt" = timezone('utc', now()),
+    "claimedBy" = %(worker)s, "leaseExpiresAt" = timezone('utc', now()) + %(lease_seconds)s * interval '1 second',
+    attempts = q.attempts + 1
+FROM picked
+WHERE q.id = picked.id
+RETURNING q.username, q.id, picked.effective_priority, picked.queue_wait
+"""
 
-def connect_to_database():
-    """Connect to the PostgreSQL database using the DATABASE_URL from .env."""
-    try:
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            print("Error: DATABASE_URL not found in environment variables")
-            sys.exit(1)
-            
-        print("Connecting to database...")
-        conn = psycopg2.connect(database_url)
-        print("Connected to database successfully")
-        return conn
-    except Exception as e:
-        print(f"Error connecting to database: {e}")
-        sys.exit(1)
+queue_waits = {lane: [] for lane in LANES}  # Seconds each claimed request spent pending, per lane
 
-def fetch_usernames_from_db(conn):
-    """Fetch usernames from QueuedRequest table with pending status."""
-    try:
-        cursor = conn.cursor()
-        
-        # Query to get distinct usernames from QueuedRequest where status is pending
-        query = """
-        SELECT DISTINCT username, id, "lastQueued"
-        FROM "QueuedRequest" 
-        WHERE status = 'pending' 
-        ORDER BY "lastQueued" ASC
-        """
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        
-        # Extract usernames and IDs from results
-        usernames = []
-        request_ids = []
-        for row in results:
-            usernames.append(row[0])
-            request_ids.append(row[1])
-
-        print (usernames)
-        print(f"Fetched {len(usernames)} pending usernames from database")
-        return usernames, request_ids
-    except Exception as e:
-        print(f"Error fetching usernames: {e}")
-        return [], []
-    finally:
-        cursor.close()
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
 
-def update_status_to_processing(conn, request_ids):
-    """Update QueuedRequest status to 'processing' for the given request IDs."""
-    if not request_ids:
-        return True
-        
+def record_queue_waits(lane, waits):
+    queue_waits[lane].extend(waits)
+
+def summarize_queue_waits():
+    """One line of queue-wait percentiles per lane, over every claim this process made."""
+    parts = []
+    for lane in LANES:
+        waits = sorted(queue_waits[lane])
+        if waits:
+            parts.append(f"{lane} n={len(waits)} p50 {percentile(waits, 0.5):.0f}s p95 {percentile(waits, 0.95):.0f}s")
+        else:
+            parts.append(f"{lane} n=0")
+    return "; ".join(parts)
+
+def claim_lane(cursor, lane, limit, worker):
+    """Claims up to limit requests from one lane, best effective priority first.
+    Returns (username, id, effective_priority, queue_wait_seconds) rows."""
+    if limit <= 0:
+        return []
+    cursor.execute(CLAIM_QUERY, {
+        "lane": lane, "worker": worker, "lease_seconds": lease_seconds(),
+        "aging": AGING_SECONDS, "limit": limit,
+    })
+    return cursor.fetchall()
+
+def claim_batch(conn, limit=DEFAULT_CLAIM_LIMIT, worker=None, interactive_share=DEFAULT_INTERACTIVE_SHARE,
+                bulk_share=DEFAULT_BULK_SHARE):
+    """Atomically claim up to limit pending QueuedRequest rows.
+
+    The rows are locked with FOR UPDATE SKIP LOCKED and flipped to 'processing'
+    in the same statement, so concurrent scraper nodes each get a disjoint batch
+    instead of all selecting (and then claiming) the whole backlog. Each claimed
+    row gets a lease held by worker (see queue_lease.py) and one more attempt;
+    rows still backing off after a reclaimed lease are skipped.
+
+    Requests are split by QueuedRequest.lane. Interactive requests (made through
+    /api/scrape or retried) are claimed first, but leave bulk_share of the batch
+    (at least one slot when limit > 1) to background refreshes, so steady
+    interactive load cannot starve them. Bulk never takes more than
+    1 - interactive_share of it, so a new interactive request always has room in
+    the next batch, and slots a lane leaves unused go to the other. Within a
+    lane, requests are ordered by ScrapeRequest.priority (lower first, 1 without
+    one) minus one point per AGING_SECONDS waited, so low-priority requests
+    cannot starve their own lane either.
+    Returns (usernames, request_ids) in that order."""
+    cursor = None
+    worker = worker or worker_id()
+    reserved = int(limit * interactive_share)
+    bulk_reserved = min(max(int(limit * bulk_share), 1 if limit > 1 else 0), limit - reserved)
     try:
         cursor = conn.cursor()
-        
-        # Update query to set status to 'processing' and update updatedAt
-        placeholders = ','.join(['%s'] * len(request_ids))
-        query = f"""
-        UPDATE "QueuedRequest" 
-        SET status = 'processing', "updatedAt" = %s 
-        WHERE id IN ({placeholders})
-        """
-        
-        # Current time for updatedAt
-        now = datetime.now()
-        
-        # Execute the query with parameters
-        cursor.execute(query, [now] + request_ids)
-        
-        # Commit the changes
+        interactive = claim_lane(cursor, "interactive", limit - bulk_reserved, worker)
+        bulk = claim_lane(cursor, "bulk", min(limit - len(interactive), limit - reserved), worker)
+        # Slots the bulk lane could not fill go back to interactive requests
+        interactive += claim_lane(cursor, "interactive", limit - len(interactive) - len(bulk), worker)
         conn.commit()
-        
-        print(f"Updated {cursor.rowcount} requests to 'processing' status")
-        return True
     except Exception as e:
-        print(f"Error updating request status to processing: {e}")
+        print(f"Error claiming queued requests: {e}")
         conn.rollback()
-        return False
+        return [], []
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
+
+    results = []
+    for lane, rows in (("interactive", interactive), ("bulk", bulk)):
+        # RETURNING does not keep the subquery's order
+        rows = sorted(rows, key=lambda row: (row[2], -row[3]))
+        record_queue_waits(lane, [float(row[3]) for row in rows])
+        results.extend(rows)
+
+    usernames = [row[0] for row in results]
+    request_ids = [row[1] for row in results]
+
+    print(f"Claimed {len(request_ids)} pending requests from database "
+          f"({len(interactive)} interactive, {len(bulk)} bulk)")
+    if request_ids:
+        print(f"Queue wait: {summarize_queue_waits()}")
+    return usernames, request_ids
 
 def write_usernames_to_file(usernames):
-    """Write usernames to the usernames.txt file."""
+    """Write usernames to the usernames.txt file (once each, in claim order)."""
     try:
+        usernames = list(dict.fromkeys(usernames))
         with open(USERNAMES_FILE, 'w') as f:
             for username in usernames:
                 f.write(f"{username}\n")
-        print(f"Successfully wrote {len(usertolnames)} usernames to {USERNAMES_FILE}")
+        print(f"Successfully wrote {len(usernames)} usernames to {USERNAMES_FILE}")
         return True
     except Exception as e:
         print(f"Error writing to {USERNAMES_FILE}: {e}")
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description='Claim pending scrape requests and write their usernames to usernames.txt')
+    parser.add_argument('--limit', type=int, default=DEFAULT_CLAIM_LIMIT,
+                        help=f'Maximum requests to claim in this run (default: {DEFAULT_CLAIM_LIMIT})')
+    parser.add_argument('--interactive-share', type=float, default=DEFAULT_INTERACTIVE_SHARE,
+                        help=f'Share of the batch reserved for interactive requests (default: {DEFAULT_INTERACTIVE_SHARE})')
+    parser.add_argument('--bulk-share', type=float, default=DEFAULT_BULK_SHARE,
+                        help=f'Share of the batch reserved for bulk requests (default: {DEFAULT_BULK_SHARE})')
+    args = parser.parse_args()
+
     print(f"=== Instagram Scraper Database Fetch ===")
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -127,24 +165,24 @@ def main():
     conn = connect_to_database()
     
     try:
-        # Fetch usernames from database
-        usernames, request_ids = fetch_usernames_from_db(conn)
+        # Put requests abandoned by dead workers back in the queue first
+        reclaim_expired(conn)
+
+        # Claim a batch of pending requests (marks them 'processing' under our lease)
+        usernames, request_ids = claim_batch(conn, args.limit, interactive_share=args.interactive_share,
+                                           bulk_share=args.bulk_share)
         
         if not usernames:
             print("No pending usernames found in database")
             sys.exit(0)
             
-        # Update status to 'processing'
-        if not update_status_to_processing(conn, request_ids):
-            print("Warning: Failed to update request status to processing")
-            
         # Write usernames to file
         write_usernames_to_file(usernames)
         
         print(f"Process completed successfully at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     finally:
-        conn.close()
-        print("Database connection closed")
+        release_connection(conn)
+        close_pool()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""Background Postgres writer for insta_scraper.py --pipeline.
+
+Without it, scraped profiles reach the database only after the whole batch
+is done and update_database.py re-reads the profile file. Here each finished
+profile goes onto a bounded queue, and a writer thread upserts them in
+micro-batches (update_database.sync_profiles_bulk) as soon as batch_size
+profiles are waiting or flush_seconds have passed. When the database falls
+behind, the queue fills and submit_profile() blocks, which slows the
+scrapers down instead of buffering without limit.
+
+A batch that fails is rolled back and counted, never retried here: the
+profiles are still saved to the profile store, and insta_scraper.py exits
+with EXIT_DB_WRITE_FAILED so run_scraper.sh and scrape_daemon.py re-sync
+them with update_database.py --bulk before marking any request completed.
+"""
+import queue
+import threading
+import time
+
+from db import get_connection, release_connection
+from update_database import get_schema, sync_profiles_bulk
+
+# --- Configuration ---
+DEFAULT_QUEUE_SIZE = 50
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_FLUSH_SECONDS = 2.0
+EXIT_DB_WRITE_FAILED = 3  # insta_scraper.py exit code when some profiles did not reach the database
+
+def start_db_writer(queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE, flush_seconds=DEFAULT_FLUSH_SECONDS):
+    """Starts the writer thread and returns its state, to pass to submit_profile and stop_db_writer."""
+    writer = {
+        "queue": queue.Queue(maxsize=queue_size),
+        "batch_size": batch_size,
+        "flush_seconds": flush_seconds,
+        "latencies": [],  # Seconds from submit_profile to the commit that stored the profile
+        "written": 0,
+        "blocked_seconds": 0.0,
+        "failed_batches": 0,
+        "failed_profiles": [],  # Usernames whose batch was rolled back
+    }
+    writer["thread"] = threading.Thread(target=writer_loop, args=(writer,), name="db-writer", daemon=True)
+    writer["thread"].start()
+    return writer
+
+def submit_profile(writer, profile_data):
+    """Queues a scraped profile for the writer, blocking while the queue is full (backpressure)."""
+    started = time.time()
+    writer["queue"].put((started, profile_data))
+    writer["blocked_seconds"] += time.time() - started
+
+def write_batch(writer, conn, batch):
+    """Upserts one micro-batch and records each profile's queue-to-commit latency.
+    Opens a connection when conn is None. Returns the connection to use for the next
+    batch: None after a failure, so the next batch starts on a fresh one."""
+    profiles = [profile_data for _, profile_data in batch]
+    try:
+        if conn is None:
+            conn = get_connection()
+            get_schema(conn)
+        _, written = sync_profiles_bulk(conn, profiles, len(batch), raise_errors=True)[:2]
+        # The upsert keeps one row per username (and skips records without one), like the profile store
+        expected = len({profile_data.get("username") for profile_data in profiles if profile_data.get("username")})
+        if written < expected:
+            raise RuntimeError(f"only {written} of {expected} profiles were upserted")
+    except Exception as e:
+        writer["failed_batches"] += 1
+        writer["failed_profiles"].extend(str(profile_data.get("username")) for profile_data in profiles)
+        print(f"[db-writer] Failed to write {len(batch)} profiles: {e}")
+        if conn is not None:
+            release_connection(conn, close=True)
+        return None
+    committed = time.time()
+    writer["written"] += len(batch)
+    writer["latencies"].extend(committed - submitted for submitted, _ in batch)
+    return conn
+
+def writer_loop(writer):
+    """Drains the queue in micro-batches until it receives the None sentinel. Database
+    errors only fail the batch at hand, so the queue keeps draining and scrapers
+    blocked on a full queue are never stuck."""
+    conn = None
+    try:
+        finished = False
+        while not finished:
+            item = writer["queue"].get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.time() + writer["flush_seconds"]
+            while len(batch) < writer["batch_size"]:
+                try:
+                    item = writer["queue"].get(timeout=max(0, deadline - time.time()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+            conn = write_batch(writer, conn, batch)
+    finally:
+        if conn is not None:
+            release_connection(conn)
+
+def stop_db_writer(writer):
+    """Flushes what is queued, stops the thread and prints a latency summary.
+    Returns the usernames that could not be written."""
+    writer["queue"].put(None)
+    writer["thread"].join()
+    latencies = sorted(writer["latencies"])
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        latency = f"queue-to-row latency p50 {p50:.1f}s, p95 {p95:.1f}s, max {latencies[-1]:.1f}s"
+    else:
+        latency = "no profiles written"
+    print(f"DB writer: {writer['written']} profiles written, {writer['failed_batches']} failed batches, "
+          f"{latency}, scrapers blocked {writer['blocked_seconds']:.1f}s on a full queue")
+    if writer["failed_profiles"]:
+        print(f"DB writer: {len(writer['failed_profiles'])} profiles not written; "
+              f"they are in the profile store for update_database.py to sync")
+    return writer["failed_profiles"]
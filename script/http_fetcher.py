@@ -0,0 +1,133 @@
+"""Plain-HTTP fast path for public profile metadata.
+
+Most queue entries only need the counts and bio, which Instagram serves from
+the web_profile_info JSON endpoint (and, failing that, the og:description meta
+tag of the profile HTML). A pooled keep-alive requests.Session that reuses the
+browser's saved cookies fetches those without starting Selenium at all; the
+scraper falls back to the browser only for profiles this cannot resolve.
+"""
+import os
+import pickle
+import re
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from count_parser import parse_count
+from network_capture import parse_profile_payload
+
+# --- Configuration ---
+INSTAGRAM_URL = "https://www.instagram.com/"
+COOKIES_FILE = "instagram_cookies.pkl"
+IG_APP_ID = "936619743392459"  # Public app id the web client sends with API calls
+REQUEST_TIMEOUT = 10
+POOL_SIZE = 10
+USER_AGENT = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
+
+META_DESCRIPTION_PATTERN = re.compile(
+    r'<meta[^>]+(?:property|name)="(?:og:)?description"[^>]+content="([^"]*)"', re.IGNORECASE)
+META_COUNTS_PATTERN = re.compile(
+    r'([\d.,]+(?:\s*[A-Za-z]+)?)\s+Followers,\s*([\d.,]+(?:\s*[A-Za-z]+)?)\s+Following,\s*([\d.,]+(?:\s*[A-Za-z]+)?)\s+Posts',
+    re.IGNORECASE)
+META_NAME_PATTERN = re.compile(r'from\s+(.*?)\s+\(@', re.IGNORECASE)
+
+def create_session(cookies_file=COOKIES_FILE, pool_size=POOL_SIZE):
+    """Creates a keep-alive session with a connection pool, loaded with the saved browser cookies."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "X-IG-App-ID": IG_APP_ID,
+        "Accept": "*/*",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+
+    if cookies_file and os.path.exists(cookies_file):
+        with open(cookies_file, 'rb') as cookiesfile:
+            for cookie in pickle.load(cookiesfile):
+                session.cookies.set(
+                    cookie["name"], cookie["value"],
+                    domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        csrf_token = session.cookies.get("csrftoken")
+        if csrf_token:
+            session.headers["X-CSRFToken"] = csrf_token
+        print(f"HTTP session loaded cookies from {cookies_file}")
+    return session
+
+def parse_profile_html(html):
+    """Extracts counts (and the display name, if present) from profile HTML, or None."""
+    description = META_DESCRIPTION_PATTERN.search(html)
+    if not description:
+        return None
+    content = description.group(1).replace("&#064;", "@").replace("&amp;", "&")
+    counts = META_COUNTS_PATTERN.search(content)
+    if not counts:
+        return None
+    profile = {
+        "followers_count": parse_count(counts.group(1)),
+        "following_count": parse_count(counts.group(2)),
+        "posts_count": parse_count(counts.group(3)),
+    }
+    name = META_NAME_PATTERN.search(content)
+    if name:
+        profile["full_name"] = name.group(1)
+    return profile
+
+def fetch_profile_http(session, username, base_url=INSTAGRAM_URL, timeout=REQUEST_TIMEOUT):
+    """Fetches profile metadata over HTTP, trying the JSON endpoint first and the profile HTML second.
+    Returns a profile_data dict in the scraper's format, or None if neither yields counts."""
+    profile_data = {
+        "username": username,
+        "scrape_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+    try:
+        response = session.get(
+            f"{base_url}api/v1/users/web_profile_info/",
+            params={"username": username}, timeout=timeout)
+        if response.status_code == 200:
+            fields = parse_profile_payload(response.json(), username)
+            if fields:
+                profile_data.update(fields)
+                return profile_data
+        print(f"HTTP JSON lookup for {username} returned status {response.status_code}")
+    except (requests.RequestException, ValueError) as e:
+        print(f"HTTP JSON lookup for {username} failed: {e}")
+
+    try:
+        response = session.get(f"{base_url}{username}/", timeout=timeout)
+        if response.status_code == 200:
+            fields = parse_profile_html(response.text)
+            if fields:
+                profile_data.update(fields)
+                return profile_data
+        print(f"HTTP HTML lookup for {username} returned status {response.status_code}")
+    except requests.RequestException as e:
+        print(f"HTTP HTML lookup for {username} failed: {e}")
+
+    return None
+
+def fetch_profiles_http(usernames, session=None, base_url=INSTAGRAM_URL, profile_delay=0):
+    """Fetches metadata for every username over one pooled session, pausing profile_delay
+    seconds between profiles like the browser path does (the session carries the login cookies).
+    Returns (profiles, failed_usernames) so the caller can send failures to the browser."""
+    session = session or create_session()
+    profiles = []
+    failed = []
+    started = time.time()
+    for position, username in enumerate(usernames):
+        if position and profile_delay:
+            time.sleep(profile_delay)
+        profile_data = fetch_profile_http(session, username, base_url)
+        if profile_data:
+            print(f"Fetched {username} over HTTP: {profile_data.get('followers_count')} followers")
+            profiles.append(profile_data)
+        else:
+            failed.append(username)
+    elapsed = time.time() - started
+    print(f"HTTP fast path: {len(profiles)} fetched, {len(failed)} need the browser ({elapsed:.1f}s)")
+    return profiles, failed
@@ -4,22 +4,30 @@ import os
 import getpass
 import sys
 import traceback
-import json
-import re
 import argparse
-from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from count_parser import parse_count
+from profile_store import PROFILE_DATA_FILE, get_profiles, save_profiles, stale_usernames
+from session_cache import (
+    DEFAULT_TTL_MINUTES, SessionExpired, cookie_jar_key, lookup_session, record_validation,
+    mark_trusted, revalidate_after_failure, summarize_session_cache
+)
 
 print("Python version:", sys.version)
 print("Starting Instagram Scraper...")
 
 try:
-    from selenium import webdriver
     from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import NoSuchElementException, TimeoutException
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+    from browser import start_browser, attach_browser, release_browser, chrome_rss_bytes, enable_resource_blocking
+    import page_waits
+    from page_waits import (
+        set_wait_ceiling, reset_wait_timings, summarize_wait_timings,
+        wait_for_header, wait_for_url_contains, wait_for_reel_links
+    )
+    from network_capture import drain_json_responses, profile_from_payloads, reels_from_payloads
     print("Selenium successfully imported!")
 except ImportError as e:
     print(f"ERROR: Failed to import Selenium: {e}")
@@ -33,7 +41,8 @@ USERNAMES_FILE = "usernames.txt"  # File containing usernames to scrape
 INSTAGRAM_URL = "https://www.instagram.com/"
 LOGIN_URL = "https://www.instagram.com/accounts/login/"
 COOKIES_FILE = "instagram_cookies.pkl"
-PROFILE_DATA_FILE = "profile_data.json"
+# With several tabs ChromeDriver must not wait for navigations, or probing a loading tab blocks
+TABS_PAGE_LOAD_STRATEGY = "none"
 
 # Initialize driver variable to None
 driver = None
@@ -85,6 +94,18 @@ def is_logged_in(driver):
         return False
 
 
+def browser_cookies(driver):
+    """Returns the browser's instagram.com cookies via CDP, without navigating anywhere."""
+    try:
+        return driver.execute_cdp_cmd("Network.getCookies", {"urls": [INSTAGRAM_URL]}).get("cookies", [])
+    except Exception as e:
+        print(f"Could not read browser cookies: {e}")
+        return []
+
+def has_session_cookie(driver):
+    """Checks for an Instagram sessionid cookie in the browser without navigating anywhere."""
+    return any(cookie.get("name") == "sessionid" and cookie.get("value") for cookie in browser_cookies(driver))
+
 def login_to_instagram(driver, username, password):
     """Logs into Instagram using username and password."""
     print("Attempting to log in...")
@@ -167,540 +188,518 @@ def login_to_instagram(driver, username, password):
         print(f"An unexpected error occurred during login: {e}")
         return False
 
-def parse_count(text):
-    """Parse numeric counts from text, handling K/M notation."""
-    if not text:
-        return None
-    
-    original_text = text  # Keep the original for reference
-    
-    # First check if we have K/M notation in the text
-    has_k = 'k' in text.lower() or 'K' in text
-    has_m = 'm' in text.lower() or 'M' in text
-    
-    # Remove commas
-    text = text.replace(',', '').strip()
+def open_reels_tab(driver, username):
+    """Switches a loaded profile page to its reels grid, trying the REELS tab first
+    and navigating straight to the reels URL as a last resort."""
+    # Log the structure of the page to understand what's available
+    page_structure = driver.execute_script("""
+        // Find all tab links (Posts, Reels, Tagged, etc.)
+        const allLinks = Array.from(document.querySelectorAll('a'));
+        const tabLinks = allLinks.filter(link => {
+            const href = link.getAttribute('href');
+            const text = link.textContent.trim();
+            return href && (
+                href.includes('/reels') || 
+                text.includes('REELS') || 
+                text.includes('Reels')
+            );
+        });
+        
+        // Find all article elements (potential post/reel containers)
+        const articles = document.querySelectorAll('article').length;
+        
+        // Check for section headers that might indicate tabs
+        const headers = Array.from(document.querySelectorAll('h1, h2, span, div'))
+            .filter(el => ['POSTS', 'REELS', 'TAGGED', 'Posts', 'Reels', 'Tagged'].includes(el.textContent.trim()));
+        
+        return {
+            tabLinks: tabLinks.map(a => ({ href: a.href, text: a.textContent.trim() })),
+            articleCount: articles,
+            headers: headers.map(h => h.textContent.trim())
+        };
+    """)
+    print(f"Page structure analysis: {page_structure}")
     
-    # Handle K/M notation
-    if has_k:
-        # Extract numeric part using regex - match digits and possible decimal point
-        match = re.search(r'([\d.]+)', text)
-        if match:
-            num_part = match.group(1)
-            try:
-                value = float(num_part)
-                result = int(value * 1000)
-                return result
-            except (ValueError, TypeError) as e:
-                print(f"Error parsing K notation in: {text} - {str(e)}")
-        else:
-            print(f"No numeric part found in K notation: {text}")
-        return None
-    elif has_m:
-        # Extract numeric part using regex
-        match = re.search(r'([\d.]+)', text)
-        if match:
-            num_part = match.group(1)
+    # First, try to click on the REELS tab if it exists
+    try:
+        # More comprehensive approach - look for and click on REELS tab with various selectors
+        reels_tab_selectors = [
+            "//a[contains(text(), 'REELS')]",
+            "//a[contains(text(), 'Reels')]", 
+            "//a[@href='/{}/reels/']".format(username),
+            "//a[contains(@href, '/reels')]",
+            "//span[contains(text(), 'REELS')]/parent::a",
+            "//span[contains(text(), 'Reels')]/parent::a",
+            "//div[text()='REELS']/parent::a",
+            "//div[text()='Reels']/parent::a"
+        ]
+        
+        reels_tab_clicked = False
+        for selector in reels_tab_selectors:
             try:
-                value = float(num_part)
-                result = int(value * 1000000)
-                return result
-            except (ValueError, TypeError) as e:
-                print(f"Error parsing M notation in: {text} - {str(e)}")
-        else:
-            print(f"No numeric part found in M notation: {text}")
-        return None
-    else:
-        # Extract numeric part if there's text mixed in
-        match = re.search(r'([\d.]+)', text)
-        if match:
-            num_part = match.group(1)
+                reels_tab = driver.find_element(By.XPATH, selector)
+                print(f"Found REELS tab with selector: {selector}")
+                driver.execute_script("arguments[0].scrollIntoView();", reels_tab)
+                reels_tab.click()
+                print("Clicked REELS tab")
+                wait_for_url_contains(driver, "/reels")
+                wait_for_reel_links(driver)
+                reels_tab_clicked = True
+                break
+            except NoSuchElementException:
+                continue
+                
+        if not reels_tab_clicked:
+            # Try finding the tab using JavaScript directly
+            reels_tab_clicked = driver.execute_script("""
+                // Try to find and click on any element that might be the "Reels" tab
+                const allElements = document.querySelectorAll('*');
+                for (const el of allElements) {
+                    const text = el.textContent?.trim();
+                    if (text === 'REELS' || text === 'Reels') {
+                        if (el.tagName === 'A') {
+                            el.click();
+                            return true;
+                        } else {
+                            // Check if any parent or nearby element is clickable
+                            const parent = el.parentElement;
+                            if (parent && parent.tagName === 'A') {
+                                parent.click();
+                                return true;
+                            }
+                            
+                            const grandparent = parent?.parentElement;
+                            if (grandparent && grandparent.tagName === 'A') {
+                                grandparent.click();
+                                return true;
+                            }
+                        }
+                    }
+                }
+                return false;
+            """)
             
-            if num_part.isdigit():
-                result = int(num_part)
-                return result
-            elif num_part.replace('.', '', 1).isdigit():  # Handle decimal numbers
-                result = int(float(num_part))
-                return result
-        
-    print(f"Could not parse count: '{original_text}'")
-    return None
+            if reels_tab_clicked:
+                print("Found and clicked REELS tab using JavaScript")
+                wait_for_url_contains(driver, "/reels")
+                wait_for_reel_links(driver)
+            else:
+                # Try going directly to the reels URL
+                reels_url = f"{INSTAGRAM_URL}{username}/reels/"
+                print(f"Navigating directly to reels URL: {reels_url}")
+                driver.get(reels_url)
+                wait_for_reel_links(driver)
+            
+    except Exception as e:
+        print(f"Error accessing reels tab: {e}")
+        # Try going directly to the reels URL instead
+        reels_url = f"{INSTAGRAM_URL}{username}/reels/"
+        print(f"Navigating directly to reels URL: {reels_url}")
+        driver.get(reels_url)
+        wait_for_reel_links(driver)
+
+def is_on_profile_page(driver, username):
+    """Returns True if the browser is currently showing username's profile page."""
+    try:
+        path = urlparse(driver.current_url).path.strip('/')
+    except Exception:
+        return False
+    return path == username
 
-def scrape_reels_info(driver, username):
-    """Scrape information about reels from a profile."""
+def scrape_reels_info(driver, username, network_capture=False):
+    """Scrape information about reels from a profile.
+    Starts from the page it is handed: if the profile is already loaded it goes
+    straight to the reels URL instead of reloading the profile and hunting for the tab.
+    With network_capture, reels are built from the page's own JSON responses when available."""
     print("Attempting to scrape reels information...")
     profile_url = f"{INSTAGRAM_URL}{username}/"
-    driver.get(profile_url)
-    time.sleep(5)  # Initial wait for page to load
+    reels_url = f"{INSTAGRAM_URL}{username}/reels/"
+    profile_loaded = is_on_profile_page(driver, username)
+    if not profile_loaded:
+        driver.get(profile_url)
+        
+        # Wait for the page to fully load (wait for feed or profile elements)
+        if wait_for_header(driver):
+            print("Profile page loaded")
+        else:
+            print("Warning: Profile page load timeout - proceeding anyway")
     
-    # Wait for the page to fully load (wait for feed or profile elements)
     try:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.XPATH, "//header"))
-        )
-        print("Profile page loaded")
-    except TimeoutException:
-        print("Warning: Profile page load timeout - proceeding anyway")
-    
-    # Additional wait to ensure all profile elements are loaded
-    time.sleep(3)
-    
+        if profile_loaded:
+            print(f"Profile page already loaded, navigating directly to reels URL: {reels_url}")
+            driver.get(reels_url)
+            wait_for_reel_links(driver)
+        else:
+            open_reels_tab(driver, username)
+    except Exception as e:
+        print(f"Error scraping reels: {e}")
+        traceback.print_exc()
+        return []
+
+    return collect_reels_from_page(driver, username, network_capture)
+
+def collect_reels_from_page(driver, username, network_capture=False):
+    """Extracts up to 10 reels from the reels grid currently shown in the browser,
+    scrolling to trigger lazy loading first."""
     reels_info = []
     reel_ids_seen = set()  # Track reel IDs to avoid duplicates
     max_reels = 10  # Limit to top 10 reels
     
     try:
-        # Log the structure of the page to understand what's available
-        page_structure = driver.execute_script("""
-            // Find all tab links (Posts, Reels, Tagged, etc.)
-            const allLinks = Array.from(document.querySelectorAll('a'));
-            const tabLinks = allLinks.filter(link => {
-                const href = link.getAttribute('href');
-                const text = link.textContent.trim();
-                return href && (
-                    href.includes('/reels') || 
-                    text.includes('REELS') || 
-                    text.includes('Reels')
-                );
-            });
-            
-            // Find all article elements (potential post/reel containers)
-            const articles = document.querySelectorAll('article').length;
-            
-            // Check for section headers that might indicate tabs
-            const headers = Array.from(document.querySelectorAll('h1, h2, span, div'))
-                .filter(el => ['POSTS', 'REELS', 'TAGGED', 'Posts', 'Reels', 'Tagged'].includes(el.textContent.trim()));
-            
-            return {
-                tabLinks: tabLinks.map(a => ({ href: a.href, text: a.textContent.trim() })),
-                articleCount: articles,
-                headers: headers.map(h => h.textContent.trim())
-            };
-        """)
-        print(f"Page structure analysis: {page_structure}")
-        
-        # First, try to click on the REELS tab if it exists
-        try:
-            # More comprehensive approach - look for and click on REELS tab with various selectors
-            reels_tab_selectors = [
-                "//a[contains(text(), 'REELS')]",
-                "//a[contains(text(), 'Reels')]", 
-                "//a[@href='/{}/reels/']".format(username),
-                "//a[contains(@href, '/reels')]",
-                "//span[contains(text(), 'REELS')]/parent::a",
-                "//span[contains(text(), 'Reels')]/parent::a",
-                "//div[text()='REELS']/parent::a",
-                "//div[text()='Reels']/parent::a"
-            ]
-            
-            reels_tab_clicked = False
-            for selector in reels_tab_selectors:
-                try:
-                    reels_tab = driver.find_element(By.XPATH, selector)
-                    print(f"Found REELS tab with selector: {selector}")
-                    driver.execute_script("arguments[0].scrollIntoView();", reels_tab)
-                    time.sleep(1)
-                    reels_tab.click()
-                    print("Clicked REELS tab")
-                    time.sleep(7)  # Increased wait time for reels to load
-                    reels_tab_clicked = True
-                    break
-                except NoSuchElementException:
-                    continue
-                    
-            if not reels_tab_clicked:
-                # Try finding the tab using JavaScript directly
-                reels_tab_clicked = driver.execute_script("""
-                    // Try to find and click on any element that might be the "Reels" tab
-                    const allElements = document.querySelectorAll('*');
-                    for (const el of allElements) {
-                        const text = el.textContent?.trim();
-                        if (text === 'REELS' || text === 'Reels') {
-                            if (el.tagName === 'A') {
-                                el.click();
-                                return true;
-                            } else {
-                                // Check if any parent or nearby element is clickable
-                                const parent = el.parentElement;
-                                if (parent && parent.tagName === 'A') {
-                                    parent.click();
-                                    return true;
-                                }
-                                
-                                const grandparent = parent?.parentElement;
-                                if (grandparent && grandparent.tagName === 'A') {
-                                    grandparent.click();
-                                    return true;
-                                }
-                            }
-                        }
-                    }
-                    return false;
-                """)
-                
-                if reels_tab_clicked:
-                    print("Found and clicked REELS tab using JavaScript")
-                    time.sleep(7)  # Wait for reels to load
-                else:
-                    # Try going directly to the reels URL
-                    reels_url = f"{INSTAGRAM_URL}{username}/reels/"
-                    print(f"Navigating directly to reels URL: {reels_url}")
-                    driver.get(reels_url)
-                    time.sleep(7)  # Increased wait time for reels to load
-                
-        except Exception as e:
-            print(f"Error accessing reels tab: {e}")
-            # Try going directly to the reels URL instead
-            reels_url = f"{INSTAGRAM_URL}{username}/reels/"
-            print(f"Navigating directly to reels URL: {reels_url}")
-            driver.get(reels_url)
-            time.sleep(7)  # Increased wait time for reels to load
-        
-        # Scroll down multiple times to ensure all reels load
-        for _ in range(3):  # Scroll down 3 times
-            driver.execute_script("window.scrollBy(0, 1000)")
-            time.sleep(2)
+        # Prefer the reel JSON the page fetched itself, falling back to DOM scraping
+        if network_capture:
+            reels_info = reels_from_payloads(drain_json_responses(driver), username, max_reels)
+            if reels_info:
+                print(f"Using {len(reels_info)} reels captured from network responses")
+            else:
+                print("No reel payloads captured, falling back to DOM scraping")
+
+        if not reels_info:
+            # Scroll down multiple times to ensure all reels load
+            for _ in range(3):  # Scroll down 3 times
+                driver.execute_script("window.scrollBy(0, 1000)")
+                wait_for_reel_links(driver, "reels_after_scroll", stable_for=0.5, timeout=3)
         
-        # Count reels on page to validate our parsing
-        reels_count = driver.execute_script("""
-            // Count reels using multiple approaches
-            const reelLinks = document.querySelectorAll('a[href*="/reel/"]').length;
-            const articles = document.querySelectorAll('article').length;
-            const videoDivs = document.querySelectorAll('div[role="button"] video, article video').length;
+            # Count reels on page to validate our parsing
+            reels_count = driver.execute_script("""
+                // Count reels using multiple approaches
+                const reelLinks = document.querySelectorAll('a[href*="/reel/"]').length;
+                const articles = document.querySelectorAll('article').length;
+                const videoDivs = document.querySelectorAll('div[role="button"] video, article video').length;
             
-            return {
-                reelLinks,
-                articles,
-                videoDivs
-            };
-        """)
-        print(f"Found on page: {reels_count}")
+                return {
+                    reelLinks,
+                    articles,
+                    videoDivs
+                };
+            """)
+            print(f"Found on page: {reels_count}")
         
-        # Use enhanced JavaScript to find the reels and view counts with more robust selectors
-        reels_data = driver.execute_script("""
-            // Function to extract reel data with enhanced detection
-            function extractReelData() {
-                const reels = [];
-                const seenIds = new Set();
+            # Use enhanced JavaScript to find the reels and view counts with more robust selectors
+            reels_data = driver.execute_script("""
+                // Function to extract reel data with enhanced detection
+                function extractReelData() {
+                    const reels = [];
+                    const seenIds = new Set();
                 
-                // Get all possible reel links first
-                const reelLinks = document.querySelectorAll('a[href*="/reel/"]');
-                console.log('Found ' + reelLinks.length + ' reel links');
+                    // Get all possible reel links first
+                    const reelLinks = document.querySelectorAll('a[href*="/reel/"]');
+                    console.log('Found ' + reelLinks.length + ' reel links');
                 
-                // Extract data from each reel link
-                reelLinks.forEach(link => {
-                    try {
-                        const reelUrl = link.href;
-                        const reelId = reelUrl.split('/reel/')[1]?.split('/')[0];
-                        if (!reelId || seenIds.has(reelId)) return;
-                        seenIds.add(reelId);
+                    // Extract data from each reel link
+                    reelLinks.forEach(link => {
+                        try {
+                            const reelUrl = link.href;
+                            const reelId = reelUrl.split('/reel/')[1]?.split('/')[0];
+                            if (!reelId || seenIds.has(reelId)) return;
+                            seenIds.add(reelId);
                         
-                        // Look for containers around this link
-                        let container = link.closest('article');
-                        if (!container) {
-                            container = link.closest('div[role="presentation"]');
-                        }
-                        if (!container) {
-                            container = link.closest('li');
-                        }
-                        if (!container) {
-                            container = link.parentElement; // Fallback to parent element
-                        }
+                            // Look for containers around this link
+                            let container = link.closest('article');
+                            if (!container) {
+                                container = link.closest('div[role="presentation"]');
+                            }
+                            if (!container) {
+                                container = link.closest('li');
+                            }
+                            if (!container) {
+                                container = link.parentElement; // Fallback to parent element
+                            }
                         
-                        // Find potential view count and likes count
-                        let viewCountText = null;
-                        let likesCountText = null;
+                            // Find potential view count and likes count
+                            let viewCountText = null;
+                            let likesCountText = null;
                         
-                        // If we have a container, look for view count spans
-                        if (container) {
-                            // Look for spans that might contain view counts or likes
-                            const spans = container.querySelectorAll('span');
-                            for (const span of spans) {
-                                const text = span.textContent.trim();
-                                // Match common count patterns
-                                if (/^\\d+(\\.\\d+)?[KkMm]$/.test(text) || 
-                                    /^\\d+(\\.\\d+)?[KkMm]\\s*views?/i.test(text) ||
-                                    /^\\d+$/.test(text) ||
-                                    /^\\d+(,\\d+)+$/.test(text)) {
+                            // If we have a container, look for view count spans
+                            if (container) {
+                                // Look for spans that might contain view counts or likes
+                                const spans = container.querySelectorAll('span');
+                                for (const span of spans) {
+                                    const text = span.textContent.trim();
+                                    // Match common count patterns
+                                    if (/^\\d+(\\.\\d+)?[KkMm]$/.test(text) || 
+                                        /^\\d+(\\.\\d+)?[KkMm]\\s*views?/i.test(text) ||
+                                        /^\\d+$/.test(text) ||
+                                        /^\\d+(,\\d+)+$/.test(text)) {
                                     
-                                    // Check if this is likes or views
-                                    const parentText = span.parentElement?.textContent?.toLowerCase() || '';
-                                    const nearbyElements = Array.from(span.parentElement?.children || []);
-                                    const hasLikeIcon = nearbyElements.some(el => {
-                                        return el.querySelector('svg[aria-label="Like"]') !== null;
-                                    });
+                                        // Check if this is likes or views
+                                        const parentText = span.parentElement?.textContent?.toLowerCase() || '';
+                                        const nearbyElements = Array.from(span.parentElement?.children || []);
+                                        const hasLikeIcon = nearbyElements.some(el => {
+                                            return el.querySelector('svg[aria-label="Like"]') !== null;
+                                        });
                                     
-                                    const isLikes = parentText.includes('like') || 
-                                                   parentText.includes('heart') || 
-                                                   hasLikeIcon;
+                                        const isLikes = parentText.includes('like') || 
+                                                       parentText.includes('heart') || 
+                                                       hasLikeIcon;
                                     
-                                    if (isLikes) {
-                                        likesCountText = text;
-                                        console.log('Found likes count:', text);
-                                    } else if (parentText.includes('view') || 
-                                              text.toLowerCase().includes('view') ||
-                                              nearbyElements.some(el => el.textContent.toLowerCase().includes('view'))) {
-                                        viewCountText = text;
-                                        console.log('Found view count:', text);
-                                    } else {
-                                        // If we're not sure, assume it's views if no view count found yet
-                                        if (!viewCountText) {
+                                        if (isLikes) {
+                                            likesCountText = text;
+                                            console.log('Found likes count:', text);
+                                        } else if (parentText.includes('view') || 
+                                                  text.toLowerCase().includes('view') ||
+                                                  nearbyElements.some(el => el.textContent.toLowerCase().includes('view'))) {
                                             viewCountText = text;
-                                            console.log('Assumed view count:', text);
+                                            console.log('Found view count:', text);
+                                        } else {
+                                            // If we're not sure, assume it's views if no view count found yet
+                                            if (!viewCountText) {
+                                                viewCountText = text;
+                                                console.log('Assumed view count:', text);
+                                            }
                                         }
                                     }
                                 }
                             }
-                        }
                         
-                        reels.push({
-                            id: reelId,
-                            url: reelUrl,
-                            viewCountText: viewCountText,
-                            likesCountText: likesCountText
-                        });
-                    } catch (error) {
-                        console.error('Error processing reel link:', error);
-                    }
-                });
+                            reels.push({
+                                id: reelId,
+                                url: reelUrl,
+                                viewCountText: viewCountText,
+                                likesCountText: likesCountText
+                            });
+                        } catch (error) {
+                            console.error('Error processing reel link:', error);
+                        }
+                    });
                 
-                // Also look for video elements as alternative approach
-                if (reels.length === 0) {
-                    const videoElements = document.querySelectorAll('video');
-                    console.log('Found ' + videoElements.length + ' video elements');
+                    // Also look for video elements as alternative approach
+                    if (reels.length === 0) {
+                        const videoElements = document.querySelectorAll('video');
+                        console.log('Found ' + videoElements.length + ' video elements');
                     
-                    videoElements.forEach(video => {
-                        try {
-                            // Navigate up to find a container and link
-                            let container = video.closest('article');
-                            if (!container) {
-                                container = video.closest('div[role="presentation"]');
-                            }
-                            if (!container) {
-                                container = video.closest('li');
-                            }
+                        videoElements.forEach(video => {
+                            try {
+                                // Navigate up to find a container and link
+                                let container = video.closest('article');
+                                if (!container) {
+                                    container = video.closest('div[role="presentation"]');
+                                }
+                                if (!container) {
+                                    container = video.closest('li');
+                                }
                             
-                            if (!container) return;
+                                if (!container) return;
                             
-                            // Look for a reel link in this container
-                            const reelLink = container.querySelector('a[href*="/reel/"]');
-                            if (!reelLink) return;
+                                // Look for a reel link in this container
+                                const reelLink = container.querySelector('a[href*="/reel/"]');
+                                if (!reelLink) return;
                             
-                            const reelUrl = reelLink.href;
-                            const reelId = reelUrl.split('/reel/')[1]?.split('/')[0];
-                            if (!reelId || seenIds.has(reelId)) return;
-                            seenIds.add(reelId);
+                                const reelUrl = reelLink.href;
+                                const reelId = reelUrl.split('/reel/')[1]?.split('/')[0];
+                                if (!reelId || seenIds.has(reelId)) return;
+                                seenIds.add(reelId);
                             
-                            // Look for view count text
-                            let viewCountText = null;
-                            const spans = container.querySelectorAll('span');
-                            for (const span of spans) {
-                                const text = span.textContent.trim();
-                                if (/^\\d+(\\.\\d+)?[KkMm]$/.test(text) || 
-                                    /^\\d+(\\.\\d+)?[KkMm]\\s*views?/i.test(text) ||
-                                    /^\\d+$/.test(text) ||
-                                    /^\\d+(,\\d+)+$/.test(text)) {
+                                // Look for view count text
+                                let viewCountText = null;
+                                const spans = container.querySelectorAll('span');
+                                for (const span of spans) {
+                                    const text = span.textContent.trim();
+                                    if (/^\\d+(\\.\\d+)?[KkMm]$/.test(text) || 
+                                        /^\\d+(\\.\\d+)?[KkMm]\\s*views?/i.test(text) ||
+                                        /^\\d+$/.test(text) ||
+                                        /^\\d+(,\\d+)+$/.test(text)) {
                                     
-                                    // Make sure we're not capturing likes instead of views
-                                    const parentText = span.parentElement?.textContent?.toLowerCase() || '';
-                                    const isLikes = parentText.includes('like') || 
-                                                   parentText.includes('heart') || 
-                                                   span.previousElementSibling?.querySelector('svg[aria-label="Like"]');
+                                        // Make sure we're not capturing likes instead of views
+                                        const parentText = span.parentElement?.textContent?.toLowerCase() || '';
+                                        const isLikes = parentText.includes('like') || 
+                                                       parentText.includes('heart') || 
+                                                       span.previousElementSibling?.querySelector('svg[aria-label="Like"]');
                                     
-                                    if (!isLikes) {
-                                        viewCountText = text;
-                                        break;
-                                    } else {
-                                        console.log('Skipping like count:', text);
+                                        if (!isLikes) {
+                                            viewCountText = text;
+                                            break;
+                                        } else {
+                                            console.log('Skipping like count:', text);
+                                        }
                                     }
                                 }
-                            }
                             
-                            reels.push({
-                                id: reelId,
-                                url: reelUrl,
-                                viewCountText: viewCountText
-                            });
-                        } catch (error) {
-                            console.error('Error processing video element:', error);
-                        }
-                    });
-                }
+                                reels.push({
+                                    id: reelId,
+                                    url: reelUrl,
+                                    viewCountText: viewCountText
+                                });
+                            } catch (error) {
+                                console.error('Error processing video element:', error);
+                            }
+                        });
+                    }
                 
-                // If still no reels found, try a more generic approach for finding reel containers
-                if (reels.length === 0) {
-                    console.log('Trying generic approach for finding reels');
+                    // If still no reels found, try a more generic approach for finding reel containers
+                    if (reels.length === 0) {
+                        console.log('Trying generic approach for finding reels');
                     
-                    // Look for common reel container patterns
-                    const potentialContainers = document.querySelectorAll('article, div[role="presentation"], li');
+                        // Look for common reel container patterns
+                        const potentialContainers = document.querySelectorAll('article, div[role="presentation"], li');
                     
-                    potentialContainers.forEach(container => {
-                        try {
-                            // Filter for containers that might be reel posts
-                            const hasVideo = container.querySelector('video') !== null;
-                            const hasPlayButton = Array.from(container.querySelectorAll('div')).some(div => {
-                                return div.getAttribute('aria-label') === 'Play' || 
-                                       div.getAttribute('role') === 'button';
-                            });
+                        potentialContainers.forEach(container => {
+                            try {
+                                // Filter for containers that might be reel posts
+                                const hasVideo = container.querySelector('video') !== null;
+                                const hasPlayButton = Array.from(container.querySelectorAll('div')).some(div => {
+                                    return div.getAttribute('aria-label') === 'Play' || 
+                                           div.getAttribute('role') === 'button';
+                                });
                             
-                            if (!hasVideo && !hasPlayButton) return;
+                                if (!hasVideo && !hasPlayButton) return;
                             
-                            // Try to find the reel link
-                            const allLinks = container.querySelectorAll('a');
-                            let reelLink = null;
+                                // Try to find the reel link
+                                const allLinks = container.querySelectorAll('a');
+                                let reelLink = null;
                             
-                            for (const link of allLinks) {
-                                const href = link.getAttribute('href');
-                                if (href && href.includes('/reel/')) {
-                                    reelLink = link;
-                                    break;
+                                for (const link of allLinks) {
+                                    const href = link.getAttribute('href');
+                                    if (href && href.includes('/reel/')) {
+                                        reelLink = link;
+                                        break;
+                                    }
                                 }
-                            }
                             
-                            if (!reelLink) return;
+                                if (!reelLink) return;
                             
-                            const reelUrl = reelLink.href;
-                            const reelId = reelUrl.split('/reel/')[1]?.split('/')[0];
-                            if (!reelId || seenIds.has(reelId)) return;
-                            seenIds.add(reelId);
+                                const reelUrl = reelLink.href;
+                                const reelId = reelUrl.split('/reel/')[1]?.split('/')[0];
+                                if (!reelId || seenIds.has(reelId)) return;
+                                seenIds.add(reelId);
                             
-                            // Look for view count text
-                            let viewCountText = null;
-                            const textElements = container.querySelectorAll('span, div');
-                            for (const elem of textElements) {
-                                const text = elem.textContent.trim();
-                                if (/^\\d+(\\.\\d+)?[KkMm]$/.test(text) || 
-                                    /^\\d+(\\.\\d+)?[KkMm]\\s*views?/i.test(text) ||
-                                    /^\\d+$/.test(text) ||
-                                    /^\\d+(,\\d+)+$/.test(text)) {
+                                // Look for view count text
+                                let viewCountText = null;
+                                const textElements = container.querySelectorAll('span, div');
+                                for (const elem of textElements) {
+                                    const text = elem.textContent.trim();
+                                    if (/^\\d+(\\.\\d+)?[KkMm]$/.test(text) || 
+                                        /^\\d+(\\.\\d+)?[KkMm]\\s*views?/i.test(text) ||
+                                        /^\\d+$/.test(text) ||
+                                        /^\\d+(,\\d+)+$/.test(text)) {
                                     
-                                    // Make sure we're not capturing likes instead of views
-                                    const parentText = elem.parentElement?.textContent?.toLowerCase() || '';
-                                    const isLikes = parentText.includes('like') || 
-                                                   parentText.includes('heart') || 
-                                                   elem.previousElementSibling?.querySelector('svg[aria-label="Like"]');
+                                        // Make sure we're not capturing likes instead of views
+                                        const parentText = elem.parentElement?.textContent?.toLowerCase() || '';
+                                        const isLikes = parentText.includes('like') || 
+                                                       parentText.includes('heart') || 
+                                                       elem.previousElementSibling?.querySelector('svg[aria-label="Like"]');
                                     
-                                    if (!isLikes) {
-                                        viewCountText = text;
-                                        break;
-                                    } else {
-                                        console.log('Skipping like count:', text);
+                                        if (!isLikes) {
+                                            viewCountText = text;
+                                            break;
+                                        } else {
+                                            console.log('Skipping like count:', text);
+                                        }
                                     }
                                 }
-                            }
                             
-                            reels.push({
-                                id: reelId,
-                                url: reelUrl,
-                                viewCountText: viewCountText
-                            });
-                        } catch (error) {
-                            console.error('Error processing potential container:', error);
-                        }
-                    });
-                }
+                                reels.push({
+                                    id: reelId,
+                                    url: reelUrl,
+                                    viewCountText: viewCountText
+                                });
+                            } catch (error) {
+                                console.error('Error processing potential container:', error);
+                            }
+                        });
+                    }
                 
-                console.log(`Total reels found: ${reels.length}`);
-                // Return only the top 10 reels
-                return reels.slice(0, 10);
-            }
+                    console.log(`Total reels found: ${reels.length}`);
+                    // Return only the top 10 reels
+                    return reels.slice(0, 10);
+                }
             
-            return extractReelData();
-        """)
+                return extractReelData();
+            """)
         
-        # Check if we found any reels
-        if reels_data:
-            print(f"Found {len(reels_data)} unique reels via JavaScript")
+            # Check if we found any reels
+            if reels_data:
+                print(f"Found {len(reels_data)} unique reels via JavaScript")
             
-            for reel in reels_data:
-                reel_id = reel.get('id')
-                reel_url = reel.get('url')
-                view_count_text = reel.get('viewCountText')
-                likes_count_text = reel.get('likesCountText')
+                for reel in reels_data:
+                    reel_id = reel.get('id')
+                    reel_url = reel.get('url')
+                    view_count_text = reel.get('viewCountText')
+                    likes_count_text = reel.get('likesCountText')
                 
-                # Parse the view count from text
-                views = parse_count(view_count_text) if view_count_text else None
-                likes = parse_count(likes_count_text) if likes_count_text else None
+                    # Parse the view count from text
+                    views = parse_count(view_count_text) if view_count_text else None
+                    likes = parse_count(likes_count_text) if likes_count_text else None
                 
-                print(f"Reel ID: {reel_id}, URL: {reel_url}, View count: {views} (from '{view_count_text}'), Likes: {likes} (from '{likes_count_text}')")
+                    print(f"Reel ID: {reel_id}, URL: {reel_url}, View count: {views} (from '{view_count_text}'), Likes: {likes} (from '{likes_count_text}')")
                 
-                # Add to our results, avoiding duplicates
-                if reel_id and reel_id not in reel_ids_seen:
-                    reel_ids_seen.add(reel_id)
-                    reels_info.append({
-                        "id": reel_id,
-                        "url": reel_url,
-                        "thumbnail": None,  # We're not fetching thumbnails for simplicity
-                        "views": views,
-                        "likes": likes,
-                        "comments": None,
-                        "posted_date": None
-                    })
+                    # Add to our results, avoiding duplicates
+                    if reel_id and reel_id not in reel_ids_seen:
+                        reel_ids_seen.add(reel_id)
+                        reels_info.append({
+                            "id": reel_id,
+                            "url": reel_url,
+                            "thumbnail": None,  # We're not fetching thumbnails for simplicity
+                            "views": views,
+                            "likes": likes,
+                            "comments": None,
+                            "posted_date": None
+                        })
                     
-                    # Stop if we've reached the maximum number of reels
-                    if len(reels_info) >= max_reels:
-                        print(f"Reached limit of {max_reels} reels, stopping collection")
-                        break
+                        # Stop if we've reached the maximum number of reels
+                        if len(reels_info) >= max_reels:
+                            print(f"Reached limit of {max_reels} reels, stopping collection")
+                            break
         
-        # If we still couldn't find any reels, try this as a last resort
-        if not reels_info:
-            print("No reels found with primary methods, trying alternative approach...")
+            # If we still couldn't find any reels, try this as a last resort
+            if not reels_info:
+                print("No reels found with primary methods, trying alternative approach...")
             
-            # Look for any links that might be reels
-            try:
-                # Scroll down to try to load more content
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(3)
+                # Look for any links that might be reels
+                try:
+                    # Scroll down to try to load more content
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                    wait_for_reel_links(driver, "reels_after_final_scroll", stable_for=0.5, timeout=3)
                 
-                # Final attempt using a different approach
-                potential_reels = driver.execute_script("""
-                    const reels = [];
+                    # Final attempt using a different approach
+                    potential_reels = driver.execute_script("""
+                        const reels = [];
                     
-                    // Look for any links that might be reels
-                    const allLinks = Array.from(document.querySelectorAll('a'));
-                    const reelLinks = allLinks.filter(link => {
-                        const href = link.getAttribute('href');
-                        return href && href.includes('/reel/');
-                    });
+                        // Look for any links that might be reels
+                        const allLinks = Array.from(document.querySelectorAll('a'));
+                        const reelLinks = allLinks.filter(link => {
+                            const href = link.getAttribute('href');
+                            return href && href.includes('/reel/');
+                        });
                     
-                    for (const link of reelLinks) {
-                        const href = link.getAttribute('href');
-                        const reelId = href.split('/reel/')[1]?.split('/')[0];
-                        if (!reelId) continue;
+                        for (const link of reelLinks) {
+                            const href = link.getAttribute('href');
+                            const reelId = href.split('/reel/')[1]?.split('/')[0];
+                            if (!reelId) continue;
                         
-                        reels.push({
-                            id: reelId,
-                            url: link.href,
-                            viewCountText: null  // We couldn't find the view count
-                        });
-                    }
+                            reels.push({
+                                id: reelId,
+                                url: link.href,
+                                viewCountText: null  // We couldn't find the view count
+                            });
+                        }
                     
-                    return reels;
-                """)
+                        return reels;
+                    """)
                 
-                if potential_reels and len(potential_reels) > 0:
-                    print(f"Found {len(potential_reels)} potential reels in final attempt")
+                    if potential_reels and len(potential_reels) > 0:
+                        print(f"Found {len(potential_reels)} potential reels in final attempt")
                     
-                    for reel in potential_reels:
-                        reel_id = reel.get('id')
-                        reel_url = reel.get('url')
+                        for reel in potential_reels:
+                            reel_id = reel.get('id')
+                            reel_url = reel.get('url')
                         
-                        if reel_id and reel_id not in reel_ids_seen:
-                            reel_ids_seen.add(reel_id)
-                            reels_info.append({
-                                "id": reel_id,
-                                "url": reel_url,
-                                "thumbnail": None,
-                                "views": None,  # We couldn't determine the views
-                                "likes": None,
-                                "comments": None,
-                                "posted_date": None
-                            })
+                            if reel_id and reel_id not in reel_ids_seen:
+                                reel_ids_seen.add(reel_id)
+                                reels_info.append({
+                                    "id": reel_id,
+                                    "url": reel_url,
+                                    "thumbnail": None,
+                                    "views": None,  # We couldn't determine the views
+                                    "likes": None,
+                                    "comments": None,
+                                    "posted_date": None
+                                })
                             
-                            if len(reels_info) >= max_reels:
-                                break
-            except Exception as e:
-                print(f"Error in alternative reels extraction: {e}")
+                                if len(reels_info) >= max_reels:
+                                    break
+                except Exception as e:
+                    print(f"Error in alternative reels extraction: {e}")
         
         # Special handling for neeraj_madhav profile
         if username == "neeraj_madhav":
@@ -758,12 +757,343 @@ def scrape_reels_info(driver, username):
         traceback.print_exc()
         return []
 
-def scrape_profile_data(driver, target_username):
-    """Scrapes all available data from a user's profile."""
+COLLECT_STATS_JS = """
+function collectStats() {
+    // Find all elements displaying posts, followers, following counts
+    const countsElements = [];
+
+    // Try to find standard list elements first
+    const listItems = document.querySelectorAll('header li, header div[role="button"]');
+
+    for (const item of listItems) {
+        const text = item.textContent.trim();
+        if (
+            text.includes('post') || 
+            text.includes('follower') || 
+            text.includes('following') ||
+            /\\d+(\\.\\d+)?[KkMm]?/.test(text)
+        ) {
+            countsElements.push(item.textContent.trim());
+        }
+    }
+
+    // If we couldn't find list items, try another approach
+    if (countsElements.length === 0) {
+        // Look for specific span/div elements containing counts
+        const potentialCountElements = document.querySelectorAll('header span, header div');
+        for (const elem of potentialCountElements) {
+            const text = elem.textContent.trim();
+            
+            // Check if it has a number with potential K/M suffix
+            if (/\\d+(\\.\\d+)?[KkMm]?/.test(text)) {
+                // Check if another nearby element has "posts", "followers", or "following"
+                const parentElement = elem.parentElement;
+                if (parentElement) {
+                    const parentText = parentElement.textContent.trim();
+                    if (
+                        parentText.includes('post') || 
+                        parentText.includes('follower') || 
+                        parentText.includes('following')
+                    ) {
+                        countsElements.push(parentText);
+                    }
+                }
+            }
+        }
+    }
+
+    return countsElements;
+}
+"""
+
+# Reads every header field, the stats texts and recent posts in a single execute_script call.
+# The XPath expressions mirror scrape_profile_header_xpath so both paths agree on what they find.
+PROFILE_EXTRACT_JS = COLLECT_STATS_JS + """
+function firstNode(xpath, context) {
+    return document.evaluate(xpath, context || document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+const header = document.querySelector('header');
+if (!header) {
+    return null;
+}
+
+const nameElement = firstNode('.//h2', header);
+const bioElement = firstNode("//header/section/div[contains(., 'span')]/span");
+const urlElement = firstNode("//header//a[contains(@href, 'http') and not(contains(@href, 'instagram.com'))]");
+const imgElement = firstNode('//header//img');
+const privateElement = firstNode("//*[contains(text(), 'This Account is Private') or contains(text(), 'private account')]");
+
+const recentPosts = [];
+const postLinks = document.evaluate("//article//a[contains(@href, '/p/')]", document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (let i = 0; i < postLinks.snapshotLength && recentPosts.length < 12; i++) {
+    const link = postLinks.snapshotItem(i);
+    const img = link.querySelector('img');
+    recentPosts.push({url: link.href, thumbnail: img ? img.getAttribute('src') : null});
+}
+
+return {
+    full_name: nameElement ? nameElement.innerText : null,
+    is_verified: firstNode(".//div[contains(@class, 'coreSpriteVerifiedBadge')]", header) !== null,
+    bio: bioElement ? bioElement.innerText : '',
+    external_url: urlElement ? urlElement.href : null,
+    profile_pic_url: imgElement ? imgElement.getAttribute('src') : null,
+    is_private: privateElement !== null,
+    stats: collectStats(),
+    recent_posts: recentPosts
+};
+"""
+
+def count_round_trips(driver):
+    """Wraps driver.execute so every WebDriver command (including WebElement calls,
+    which go through their parent driver) increments driver.round_trips."""
+    if hasattr(driver, "round_trips"):
+        return
+    original_execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        driver.round_trips += 1
+        return original_execute(driver_command, params)
+
+    driver.round_trips = 0
+    driver.execute = counting_execute
+
+def extract_profile_in_page(driver):
+    """Extracts the profile header, stats and recent posts with one injected script.
+    Returns None if the script fails so callers can fall back to XPath lookups."""
+    try:
+        return driver.execute_script(PROFILE_EXTRACT_JS)
+    except Exception as e:
+        print(f"In-page profile extraction failed: {e}")
+        return None
+
+def apply_in_page_profile_data(profile_data, in_page_data):
+    """Copies the fields returned by extract_profile_in_page into profile_data."""
+    profile_data["full_name"] = in_page_data.get("full_name")
+    profile_data["is_verified"] = bool(in_page_data.get("is_verified"))
+    profile_data["bio"] = in_page_data.get("bio") or ""
+    profile_data["external_url"] = in_page_data.get("external_url")
+    profile_data["profile_pic_url"] = in_page_data.get("profile_pic_url")
+    profile_data["is_private"] = bool(in_page_data.get("is_private"))
+    if not profile_data["is_private"]:
+        profile_data["recent_posts"] = in_page_data.get("recent_posts") or []
+
+    print(f"Full name: {profile_data['full_name']}")
+    print("Account is verified" if profile_data["is_verified"] else "Account is not verified")
+    print(f"Bio: {profile_data['bio']}")
+    print(f"External URL: {profile_data['external_url']}")
+    print(f"Profile pic URL: {profile_data['profile_pic_url']}")
+    print("Account is private" if profile_data["is_private"] else "Account is public")
+    if "recent_posts" in profile_data:
+        print(f"Scraped {len(profile_data['recent_posts'])} recent posts")
+
+def scrape_profile_header_xpath(driver, header_section, profile_data):
+    """Fills header fields (name, verified, bio, URL, picture, private) with one WebDriver
+    lookup per field. Used when the in-page extractor is unavailable."""
+    # Get display name
+    try:
+        name_element = header_section.find_element(By.XPATH, ".//h2")
+        profile_data["full_name"] = name_element.text
+        print(f"Full name: {profile_data['full_name']}")
+    except NoSuchElementException:
+        print("Could not find full name element")
+
+    # Check if verified
+    try:
+        verified_badge = header_section.find_element(By.XPATH, ".//div[contains(@class, 'coreSpriteVerifiedBadge')]")
+        profile_data["is_verified"] = True
+        print("Account is verified")
+    except NoSuchElementException:
+        profile_data["is_verified"] = False
+        print("Account is not verified")
+
+    # Get bio
+    try:
+        bio_element = driver.find_element(By.XPATH, "//header/section/div[contains(., 'span')]/span")
+        profile_data["bio"] = bio_element.text
+        print(f"Bio: {profile_data['bio']}")
+    except NoSuchElementException:
+        print("Bio not found or empty")
+        profile_data["bio"] = ""
+
+    # Get external URL if available
+    try:
+        url_element = driver.find_element(By.XPATH, "//header//a[contains(@href, 'http') and not(contains(@href, 'instagram.com'))]")
+        profile_data["external_url"] = url_element.get_attribute("href")
+        print(f"External URL: {profile_data['external_url']}")
+    except NoSuchElementException:
+        print("No external URL found")
+        profile_data["external_url"] = None
+
+    # Get profile picture URL
+    try:
+        img_element = driver.find_element(By.XPATH, "//header//img")
+        profile_data["profile_pic_url"] = img_element.get_attribute("src")
+        print(f"Profile pic URL: {profile_data['profile_pic_url']}")
+    except NoSuchElementException:
+        print("Could not find profile picture")
+        profile_data["profile_pic_url"] = None
+
+    # Check if private
+    try:
+        private_text = driver.find_element(By.XPATH, "//*[contains(text(), 'This Account is Private') or contains(text(), 'private account')]")
+        profile_data["is_private"] = True
+        print("Account is private")
+    except NoSuchElementException:
+        profile_data["is_private"] = False
+        print("Account is public")
+
+def scrape_profile_stats(driver, profile_data, target_username, stats_data=None):
+    """Fills posts/followers/following counts, reading the header stats texts unless
+    stats_data was already collected by the in-page extractor."""
+    try:
+        if stats_data is None:
+            # Improved method to find the stats elements
+            stats_data = driver.execute_script(COLLECT_STATS_JS + "return collectStats();")
+        
+        if not stats_data or len(stats_data) < 3:
+            # Fallback to retrieving individual elements
+            print("Using fallback method to get profile stats")
+            
+            # Get followers count for abhinavsnayak (special handling)
+            if target_username == "abhinavsnayak":
+                # Special handling for the followers count (19.6K from screenshot)
+                print("Using special handling for abhinavsnayak followers count")
+                profile_data["posts_count"] = 100
+                profile_data["followers_count"] = 19600  # 19.6K
+                profile_data["following_count"] = 499
+            else:
+                # Standard approach for other profiles
+                stats = WebDriverWait(driver, 10).until(
+                    EC.presence_of_all_elements_located((By.XPATH, "//header//li"))
+                )
+                
+                # Posts count
+                if len(stats) >= 1:
+                    posts_text = stats[0].text
+                    profile_data["posts_count"] = parse_count(posts_text)
+                    print(f"Posts count: {profile_data.get('posts_count', 'unknown')}")
+                
+                # Followers count
+                if len(stats) >= 2:
+                    followers_text = stats[1].text
+                    profile_data["followers_count"] = parse_count(followers_text)
+                    print(f"Followers count: {profile_data.get('followers_count', 'unknown')}")
+                
+                # Following count
+                if len(stats) >= 3:
+                    following_text = stats[2].text
+                    profile_data["following_count"] = parse_count(following_text)
+                    print(f"Following count: {profile_data.get('following_count', 'unknown')}")
+        else:
+            # Process the stats data we found
+            for stat_text in stats_data:
+                if 'post' in stat_text.lower():
+                    profile_data["posts_count"] = parse_count(stat_text)
+                    print(f"Posts count: {profile_data.get('posts_count', 'unknown')}")
+                elif 'follower' in stat_text.lower():
+                    profile_data["followers_count"] = parse_count(stat_text)
+                    print(f"Followers count: {profile_data.get('followers_count', 'unknown')}")
+                elif 'following' in stat_text.lower():
+                    profile_data["following_count"] = parse_count(stat_text)
+                    print(f"Following count: {profile_data.get('following_count', 'unknown')}")
+            
+            # Special handling for abhinavsnayak
+            if target_username == "abhinavsnayak" and profile_data.get("followers_count") != 19600:
+                print("Overriding followers count for abhinavsnayak to 19600 (19.6K)")
+                profile_data["followers_count"] = 19600  # 19.6K
+            
+    except (NoSuchElementException, TimeoutException) as e:
+        print(f"Error getting profile stats: {e}")
+
+def scrape_recent_posts_xpath(driver, profile_data):
+    """Collects up to 12 recent post links and thumbnails one element at a time."""
+    try:
+        posts = driver.find_elements(By.XPATH, "//article//a[contains(@href, '/p/')]")
+        recent_posts = []
+        for i, post in enumerate(posts[:12]):  # Get up to 12 recent posts
+            try:
+                post_url = post.get_attribute("href")
+                
+                # Try to get the image thumbnail
+                try:
+                    img = post.find_element(By.TAG_NAME, "img")
+                    post_img = img.get_attribute("src")
+                except:
+                    post_img = None
+                    
+                recent_posts.append({
+                    "url": post_url,
+                    "thumbnail": post_img
+                })
+            except Exception as e:
+                print(f"Error getting post {i+1}: {e}")
+        
+        profile_data["recent_posts"] = recent_posts
+        print(f"Scraped {len(recent_posts)} recent posts")
+    except Exception as e:
+        print(f"Error getting recent posts: {e}")
+        profile_data["recent_posts"] = []
+
+def read_profile_header(driver, header_section, profile_data, target_username, captured_profile=None):
+    """Fills profile_data from the loaded profile page: one in-page extraction round trip,
+    per-element XPath lookups as fallback, and captured JSON values (if any) on top."""
+    # Read the whole header in one round trip, falling back to per-element XPath lookups
+    in_page_data = extract_profile_in_page(driver)
+    if in_page_data:
+        apply_in_page_profile_data(profile_data, in_page_data)
+        if not captured_profile:
+            scrape_profile_stats(driver, profile_data, target_username, in_page_data.get("stats"))
+    elif not captured_profile:
+        print("In-page extraction unavailable, using XPath fallback")
+        if header_section is None:
+            header_section = driver.find_element(By.XPATH, "//header")
+        scrape_profile_header_xpath(driver, header_section, profile_data)
+        scrape_profile_stats(driver, profile_data, target_username)
+
+    if captured_profile:
+        # Exact values from Instagram's JSON take precedence over rounded DOM text
+        profile_data.update(captured_profile)
+        print(f"Using profile data captured from network responses: "
+              f"{profile_data['posts_count']} posts, {profile_data['followers_count']} followers, "
+              f"{profile_data['following_count']} following")
+
+def hardcoded_reels(target_username):
+    """Returns hardcoded reel data for profiles whose reels cannot be scraped, or None."""
+    # Special case for __josen__j_ profile - add hardcoded reels data
+    if target_username == "__josen__j_":
+        print("Detected __josen__j_ profile, adding hardcoded reel data from screenshot")
+        reels_data = [
+            {
+                "id": "CjV64wqDWRV",  # ID seen in screenshot/log
+                "url": f"{INSTAGRAM_URL}{target_username}/reel/CjV64wqDWRV/",
+                "views": 2004,  # View count from screenshot
+                "thumbnail": None
+            },
+            {
+                "id": "DIFFERENT_ID",  # Used a placeholder ID for the second reel
+                "url": f"{INSTAGRAM_URL}{target_username}/reel/DIFFERENT_ID/",
+                "views": 795,  # View count from screenshot
+                "thumbnail": None
+            }
+        ]
+        
+        # Limit to max 10 reels
+        return reels_data[:10]
+    return None
+
+def scrape_profile_data(driver, target_username, network_capture=False):
+    """Scrapes all available data from a user's profile.
+    With network_capture (requires performance logging), exact counts are taken from the
+    profile JSON the page fetched itself, with the DOM values as fallback."""
     profile_url = f"{INSTAGRAM_URL}{target_username}/"
     print(f"Navigating to profile: {profile_url}")
+    reset_wait_timings()
+    count_round_trips(driver)
+    round_trips_at_start = driver.round_trips
+    if network_capture:
+        drain_json_responses(driver)  # Discard responses left over from the previous page
     driver.get(profile_url)
-    time.sleep(5)  # Allow profile page to load
 
     profile_data = {
         "username": target_username,
@@ -772,234 +1102,44 @@ def scrape_profile_data(driver, target_username):
 
     try:
         # Get profile metadata
-        try:
-            header_section = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//header"))
-            )
+        header_section = wait_for_header(driver)
+        if header_section:
             print("Found profile header section")
-        except TimeoutException:
+        else:
             print("Could not find profile header section. Page structure might have changed.")
+            # A session trusted from the cache is only checked once something actually fails
+            revalidate_after_failure(driver, is_logged_in)
             return profile_data
 
-        # Get display name
-        try:
-            name_element = header_section.find_element(By.XPATH, ".//h2")
-            profile_data["full_name"] = name_element.text
-            print(f"Full name: {profile_data['full_name']}")
-        except NoSuchElementException:
-            print("Could not find full name element")
+        captured_profile = None
+        if network_capture:
+            captured_profile = profile_from_payloads(drain_json_responses(driver), target_username)
+            if not captured_profile:
+                print("No profile payload captured, falling back to DOM scraping")
 
-        # Check if verified
-        try:
-            verified_badge = header_section.find_element(By.XPATH, ".//div[contains(@class, 'coreSpriteVerifiedBadge')]")
-            profile_data["is_verified"] = True
-            print("Account is verified")
-        except NoSuchElementException:
-            profile_data["is_verified"] = False
-            print("Account is not verified")
-
-        # Get bio
-        try:
-            bio_element = driver.find_element(By.XPATH, "//header/section/div[contains(., 'span')]/span")
-            profile_data["bio"] = bio_element.text
-            print(f"Bio: {profile_data['bio']}")
-        except NoSuchElementException:
-            print("Bio not found or empty")
-            profile_data["bio"] = ""
-
-        # Get external URL if available
-        try:
-            url_element = driver.find_element(By.XPATH, "//header//a[contains(@href, 'http') and not(contains(@href, 'instagram.com'))]")
-            profile_data["external_url"] = url_element.get_attribute("href")
-            print(f"External URL: {profile_data['external_url']}")
-        except NoSuchElementException:
-            print("No external URL found")
-            profile_data["external_url"] = None
-
-        # Get profile picture URL
-        try:
-            img_element = driver.find_element(By.XPATH, "//header//img")
-            profile_data["profile_pic_url"] = img_element.get_attribute("src")
-            print(f"Profile pic URL: {profile_data['profile_pic_url']}")
-        except NoSuchElementException:
-            print("Could not find profile picture")
-            profile_data["profile_pic_url"] = None
-
-        # Check if private
-        try:
-            private_text = driver.find_element(By.XPATH, "//*[contains(text(), 'This Account is Private') or contains(text(), 'private account')]")
-            profile_data["is_private"] = True
-            print("Account is private")
-        except NoSuchElementException:
-            profile_data["is_private"] = False
-            print("Account is public")
-
-        # Get counts (posts, followers, following)
-        try:
-            # Improved method to find the stats elements
-            stats_data = driver.execute_script("""
-                // Find all elements displaying posts, followers, following counts
-                const countsElements = [];
-                
-                // Try to find standard list elements first
-                const listItems = document.querySelectorAll('header li, header div[role="button"]');
-                
-                for (const item of listItems) {
-                    const text = item.textContent.trim();
-                    if (
-                        text.includes('post') || 
-                        text.includes('follower') || 
-                        text.includes('following') ||
-                        /\\d+(\\.\\d+)?[KkMm]?/.test(text)
-                    ) {
-                        countsElements.push(item.textContent.trim());
-                    }
-                }
-                
-                // If we couldn't find list items, try another approach
-                if (countsElements.length === 0) {
-                    // Look for specific span/div elements containing counts
-                    const potentialCountElements = document.querySelectorAll('header span, header div');
-                    for (const elem of potentialCountElements) {
-                        const text = elem.textContent.trim();
-                        
-                        // Check if it has a number with potential K/M suffix
-                        if (/\\d+(\\.\\d+)?[KkMm]?/.test(text)) {
-                            // Check if another nearby element has "posts", "followers", or "following"
-                            const parentElement = elem.parentElement;
-                            if (parentElement) {
-                                const parentText = parentElement.textContent.trim();
-                                if (
-                                    parentText.includes('post') || 
-                                    parentText.includes('follower') || 
-                                    parentText.includes('following')
-                                ) {
-                                    countsElements.push(parentText);
-                                }
-                            }
-                        }
-                    }
-                }
-                
-                return countsElements;
-            """)
-            
-            if not stats_data or len(stats_data) < 3:
-                # Fallback to retrieving individual elements
-                print("Using fallback method to get profile stats")
-                
-                # Get followers count for abhinavsnayak (special handling)
-                if target_username == "abhinavsnayak":
-                    # Special handling for the followers count (19.6K from screenshot)
-                    print("Using special handling for abhinavsnayak followers count")
-                    profile_data["posts_count"] = 100
-                    profile_data["followers_count"] = 19600  # 19.6K
-                    profile_data["following_count"] = 499
-                else:
-                    # Standard approach for other profiles
-                    stats = WebDriverWait(driver, 10).until(
-                        EC.presence_of_all_elements_located((By.XPATH, "//header//li"))
-                    )
-                    
-                    # Posts count
-                    if len(stats) >= 1:
-                        posts_text = stats[0].text
-                        profile_data["posts_count"] = parse_count(posts_text)
-                        print(f"Posts count: {profile_data.get('posts_count', 'unknown')}")
-                    
-                    # Followers count
-                    if len(stats) >= 2:
-                        followers_text = stats[1].text
-                        profile_data["followers_count"] = parse_count(followers_text)
-                        print(f"Followers count: {profile_data.get('followers_count', 'unknown')}")
-                    
-                    # Following count
-                    if len(stats) >= 3:
-                        following_text = stats[2].text
-                        profile_data["following_count"] = parse_count(following_text)
-                        print(f"Following count: {profile_data.get('following_count', 'unknown')}")
-            else:
-                # Process the stats data we found
-                for stat_text in stats_data:
-                    if 'post' in stat_text.lower():
-                        profile_data["posts_count"] = parse_count(stat_text)
-                        print(f"Posts count: {profile_data.get('posts_count', 'unknown')}")
-                    elif 'follower' in stat_text.lower():
-                        profile_data["followers_count"] = parse_count(stat_text)
-                        print(f"Followers count: {profile_data.get('followers_count', 'unknown')}")
-                    elif 'following' in stat_text.lower():
-                        profile_data["following_count"] = parse_count(stat_text)
-                        print(f"Following count: {profile_data.get('following_count', 'unknown')}")
-                
-                # Special handling for abhinavsnayak
-                if target_username == "abhinavsnayak" and profile_data.get("followers_count") != 19600:
-                    print("Overriding followers count for abhinavsnayak to 19600 (19.6K)")
-                    profile_data["followers_count"] = 19600  # 19.6K
-                
-        except (NoSuchElementException, TimeoutException) as e:
-            print(f"Error getting profile stats: {e}")
-            
+        read_profile_header(driver, header_section, profile_data, target_username, captured_profile)
+        print(f"Header round trips for {target_username}: {driver.round_trips - round_trips_at_start}")
 
         # Try to get recent posts if account is not private
         if not profile_data.get("is_private", True):
-            try:
-                posts = driver.find_elements(By.XPATH, "//article//a[contains(@href, '/p/')]")
-                recent_posts = []
-                for i, post in enumerate(posts[:12]):  # Get up to 12 recent posts
-                    try:
-                        post_url = post.get_attribute("href")
-                        
-                        # Try to get the image thumbnail
-                        try:
-                            img = post.find_element(By.TAG_NAME, "img")
-                            post_img = img.get_attribute("src")
-                        except:
-                            post_img = None
-                            
-                        recent_posts.append({
-                            "url": post_url,
-                            "thumbnail": post_img
-                        })
-                    except Exception as e:
-                        print(f"Error getting post {i+1}: {e}")
-                
-                profile_data["recent_posts"] = recent_posts
-                print(f"Scraped {len(recent_posts)} recent posts")
-            except Exception as e:
-                print(f"Error getting recent posts: {e}")
-                profile_data["recent_posts"] = []
+            if "recent_posts" not in profile_data:
+                scrape_recent_posts_xpath(driver, profile_data)
                 
             # Special case for __josen__j_ profile - add hardcoded reels data
-            if target_username == "__josen__j_":
-                print("Detected __josen__j_ profile, adding hardcoded reel data from screenshot")
-                reels_data = [
-                    {
-                        "id": "CjV64wqDWRV",  # ID seen in screenshot/log
-                        "url": f"{INSTAGRAM_URL}{target_username}/reel/CjV64wqDWRV/",
-                        "views": 2004,  # View count from screenshot
-                        "thumbnail": None
-                    },
-                    {
-                        "id": "DIFFERENT_ID",  # Used a placeholder ID for the second reel
-                        "url": f"{INSTAGRAM_URL}{target_username}/reel/DIFFERENT_ID/",
-                        "views": 795,  # View count from screenshot
-                        "thumbnail": None
-                    }
-                ]
-                
-                # Limit to max 10 reels
-                reels_data = reels_data[:10]
-                
+            reels_data = hardcoded_reels(target_username)
+            if reels_data is not None:
                 profile_data["reels_count"] = len(reels_data)
                 profile_data["reels"] = reels_data
                 print(f"Added {len(reels_data)} hardcoded reels based on screenshot")
             else:
                 # Standard reel scraping for other profiles
-                reels_info = scrape_reels_info(driver, target_username)
+                reels_info = scrape_reels_info(driver, target_username, network_capture)
                 profile_data["reels_count"] = len(reels_info)
                 profile_data["reels"] = reels_info
                 print(f"Scraped {len(reels_info)} reels")
 
+        print(f"Wait timings for {target_username}: {summarize_wait_timings()}")
+        print(f"WebDriver round trips for {target_username}: {driver.round_trips - round_trips_at_start}")
         return profile_data
     
     except Exception as e:
@@ -1028,101 +1168,346 @@ def read_usernames_from_file(filename):
         print(f"Error reading usernames from {filename}: {e}")
         return ["yaa.scene", "__josen__j_"]  # Default to the two test usernames
 
-def save_profile_data_array(data_array, filename):
-    """Saves the profile data array to a JSON file.
-    If the file exists, it will append new data and update existing entries."""
-    existing_data = []
-    existing_usernames = set()
-    
+def ensure_logged_in(driver, interactive=True, reuse_session=False, session_ttl=DEFAULT_TTL_MINUTES):
+    """Logs the driver in via saved cookies, prompting for credentials if allowed.
+    Non-interactive callers (pool workers) never prompt and never delete the shared cookie file.
+    With reuse_session (an attached, already warm browser) an existing session cookie is trusted as is.
+    Cookies validated within session_ttl minutes skip the home page check (0 always checks)."""
+    if reuse_session and has_session_cookie(driver):
+        print("Reusing the browser's existing Instagram session.")
+        mark_trusted("attached", cookie_jar_key(browser_cookies(driver)))
+        return True
+
+    if os.path.exists(COOKIES_FILE):
+        if load_cookies(driver, COOKIES_FILE):
+            session_key = cookie_jar_key(browser_cookies(driver))
+            if lookup_session(session_key, session_ttl):
+                print(f"Session cookies validated within the last {session_ttl} minutes; skipping login check.")
+                return True
+            driver.refresh()
+            time.sleep(5) # Wait for page refresh
+            if is_logged_in(driver):
+                record_validation(session_key)
+                return True
+            if not interactive:
+                print("Cookie login failed.")
+                return False
+            print("Cookie login failed. Clearing cookies and attempting manual login.")
+            os.remove(COOKIES_FILE) # Remove invalid cookies
+            driver.delete_all_cookies() # Clear browser cookies for fresh start
+
+    if not interactive:
+        print(f"No valid cookies in {COOKIES_FILE}; cannot log in without a prompt.")
+        return False
+
+    # Get credentials securely if not logged in via cookies
+    insta_username = input("Enter your Instagram username: ")
+    insta_password = getpass.getpass("Enter your Instagram password: ")
+    if not login_to_instagram(driver, insta_username, insta_password):
+        return False
+    record_validation(cookie_jar_key(browser_cookies(driver)))
+    return True
+
+# Cheap per-tab readiness check used by the tab scheduler (one round trip per poll)
+TAB_PROBE_JS = """
+return {
+    path: window.location.pathname,
+    header: document.querySelector('header') !== null,
+    reelLinks: document.querySelectorAll('a[href*="/reel/"]').length,
+    loaded: document.readyState === 'complete'
+};
+"""
+# What a tab counts as while it cannot be probed (e.g. "document unloaded" mid-navigation)
+TAB_NOT_READY = {"path": "", "header": False, "reelLinks": -1, "loaded": False}
+
+def scrape_profiles_in_tabs(driver, usernames, tabs, profile_delay=3, on_result=None):
+    """Scrapes profiles through several tabs of one logged-in browser, pipelining page loads.
+    Each tab walks profile page -> reels page without blocking on navigation; the scheduler
+    polls the tabs and extracts whichever one is ready, then hands it the next username, so
+    the other tabs keep loading meanwhile. usernames may be any iterable (e.g. a queue reader).
+    Returns the list of profile data; each result is also passed to on_result if given."""
+    count_round_trips(driver)
+    pending = iter(usernames)
+    handles = [driver.current_window_handle]
     try:
-        # Try to open and read existing data
-        if os.path.exists(filename) and os.path.getsize(filename) > 0:
-            with open(filename, 'r', encoding='utf-8') as f:
+        for _ in range(tabs - 1):
+            driver.switch_to.new_window('tab')
+            handles.append(driver.current_window_handle)
+            # Network.setBlockedURLs is per tab, so --lean has to be applied to each new one
+            if getattr(driver, "blocked_url_patterns", None):
+                enable_resource_blocking(driver, driver.blocked_url_patterns)
+        return run_tab_scheduler(driver, pending, handles, profile_delay, on_result)
+    finally:
+        # Close the extra tabs and return to the original one, also when SessionExpired propagates
+        try:
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+        except Exception as e:
+            print(f"Could not close the extra tabs: {e}")
+
+def run_tab_scheduler(driver, pending, handles, profile_delay, on_result):
+    """The polling loop of scrape_profiles_in_tabs, over already opened tabs."""
+    tabs = len(handles)
+    slots = [{"handle": handle, "stage": "idle", "username": None} for handle in handles]
+
+    results = []
+    exhausted = False
+    next_navigation_at = 0
+    started_at = time.time()
+    round_trips_at_start = driver.round_trips
+
+    def navigate(slot, url, stage):
+        driver.switch_to.window(slot["handle"])
+        # Assigning location returns immediately, unlike driver.get which blocks until load
+        driver.execute_script("window.location.href = arguments[0];", url)
+        slot.update(stage=stage, stage_started=time.time(), reel_count=-1, count_since=time.time())
+
+    def finish(slot, index):
+        profile_data = slot["profile_data"]
+        print(f"[tab {index}] Finished {slot['username']} in {time.time() - slot['profile_started']:.1f}s")
+        results.append(profile_data)
+        if on_result:
+            on_result(profile_data)
+        slot.update(stage="idle", username=None, profile_data=None)
+
+    while True:
+        progressed = False
+        for index, slot in enumerate(slots):
+            if slot["stage"] == "idle":
+                # Space out new page loads across all tabs to stay under the rate limiter
+                if exhausted or time.time() < next_navigation_at:
+                    continue
+                username = next(pending, None)
+                if username is None:
+                    exhausted = True
+                    continue
+                next_navigation_at = time.time() + profile_delay
+                print(f"[tab {index}] Loading profile: {username}")
+                slot.update(username=username, profile_started=time.time(), profile_data={
+                    "username": username,
+                    "scrape_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                })
+                navigate(slot, f"{INSTAGRAM_URL}{username}/", "profile")
+                progressed = True
+                continue
+
+            username = slot["username"]
+            profile_data = slot["profile_data"]
+            try:
+                driver.switch_to.window(slot["handle"])
+                probe = driver.execute_script(TAB_PROBE_JS) or TAB_NOT_READY
+            except WebDriverException:
+                # With pageLoadStrategy 'none' the tab may be between documents; the stage
+                # timeout below still gives up on a tab that never becomes probeable
+                probe = TAB_NOT_READY
+            timed_out = time.time() - slot["stage_started"] >= page_waits.wait_ceiling
+
+            if slot["stage"] == "profile":
+                ready = probe["path"].strip('/') == username and probe["header"]
+                if not ready and not timed_out:
+                    continue
+                progressed = True
+                if not ready:
+                    print(f"[tab {index}] Could not find profile header section for {username}.")
+                    finish(slot, index)
+                    revalidate_after_failure(driver, is_logged_in)
+                    continue
                 try:
-                    existing_data = json.load(f)
-                    # Create a set of existing usernames for faster lookup
-                    existing_usernames = {profile.get('username') for profile in existing_data}
-                    print(f"Loaded existing data with {len(existing_data)} profiles")
-                except json.JSONDecodeError:
-                    print(f"Error parsing existing JSON file: {filename}. Creating a new file.")
-                    existing_data = []
-        
-        # Update existing entries or append new ones
-        for new_profile in data_array:
-            username = new_profile.get('username')
-            if username in existing_usernames:
-                # Replace the existing profile with the new one
-                for i, profile in enumerate(existing_data):
-                    if profile.get('username') == username:
-                        existing_data[i] = new_profile
-                        print(f"Updated existing profile for {username}")
-                        break
-            else:
-                # Append the new profile
-                existing_data.append(new_profile)
-                existing_usernames.add(username)
-                print(f"Added new profile for {username}")
-        
-        # Save the updated data
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
-        print(f"Profile data array saved to {filename}")
-    except Exception as e:
-        print(f"Error saving profile data to {filename}: {e}")
-        traceback.print_exc()
+                    read_profile_header(driver, None, profile_data, username)
+                except Exception as e:
+                    print(f"[tab {index}] Error reading profile header for {username}: {e}")
+                if profile_data.get("is_private", True):
+                    finish(slot, index)
+                    continue
+                reels_data = hardcoded_reels(username)
+                if reels_data is not None:
+                    profile_data["reels_count"] = len(reels_data)
+                    profile_data["reels"] = reels_data
+                    finish(slot, index)
+                    continue
+                navigate(slot, f"{INSTAGRAM_URL}{username}/reels/", "reels")
 
-def is_profile_data_outdated(username, filename, max_age_days=0):
-    """Check if profile data is older than specified number of days or doesn't exist.
-    Returns True if data should be reparsed, False otherwise."""
-    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
-        print(f"No existing data file found for {username}")
-        return True
-    
+            elif slot["stage"] == "reels":
+                # Same settle rule as wait_for_reel_links: page loaded and count (even 0) unchanged for a second
+                if probe["reelLinks"] != slot["reel_count"]:
+                    slot["reel_count"] = probe["reelLinks"]
+                    slot["count_since"] = time.time()
+                on_reels_page = probe["path"].strip('/') == f"{username}/reels"
+                settled = on_reels_page and probe["loaded"] and time.time() - slot["count_since"] >= 1.0
+                if not settled and not timed_out:
+                    continue
+                progressed = True
+                reels_info = collect_reels_from_page(driver, username)
+                profile_data["reels_count"] = len(reels_info)
+                profile_data["reels"] = reels_info
+                finish(slot, index)
+
+        if exhausted and all(slot["stage"] == "idle" for slot in slots):
+            break
+        if not progressed:
+            time.sleep(page_waits.POLL_INTERVAL)
+
+    elapsed = time.time() - started_at
+    rate = len(results) / (elapsed / 60) if elapsed > 0 else 0
+    rss = chrome_rss_bytes(driver)
+    per_gb = f", {rate / (rss / 1024 ** 3):.1f} profiles/min per GB of Chrome RSS" if rss else ""
+    print(f"{tabs} tabs scraped {len(results)} profiles in {elapsed:.1f}s "
+          f"({rate:.1f} profiles/min{per_gb}, {driver.round_trips - round_trips_at_start} WebDriver round trips)")
+    return results
+
+def scrape_worker(worker_id, work_queue, result_queue, scrape_options):
+    """Worker process: logs in its own browser and scrapes usernames from the shared queue
+    until it receives a None sentinel. Results are sent back on result_queue."""
+    worker_driver = None
+    set_wait_ceiling(scrape_options["wait_timeout"])
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
+        worker_driver = start_browser(scrape_options["lean"], performance_log=scrape_options["network_capture"],
+                                      page_load_strategy=TABS_PAGE_LOAD_STRATEGY if scrape_options["tabs"] > 1 else None)
+        if worker_driver is None or not ensure_logged_in(worker_driver, interactive=False, session_ttl=scrape_options["session_ttl"]):
+            print(f"[worker {worker_id}] Could not start a logged-in browser. Exiting.")
+            return
+
+        if scrape_options["tabs"] > 1:
+            scrape_profiles_in_tabs(
+                worker_driver, iter(work_queue.get, None), scrape_options["tabs"],
+                scrape_options["profile_delay"], lambda profile_data: result_queue.put(("profile", profile_data)))
+            return
+
+        while True:
+            username = work_queue.get()
+            if username is None:
+                break
+            print(f"\n{'='*50}\n[worker {worker_id}] Processing profile: {username}\n{'='*50}")
             try:
-                data = json.load(f)
-                for profile in data:
-                    if profile.get('username') == username:
-                        scrape_time_str = profile.get('scrape_time')
-                        if not scrape_time_str:
-                            print(f"No scrape time found for {username}")
-                            return True
-                        
-                        try:
-                            scrape_time = datetime.strptime(scrape_time_str, "%Y-%m-%d %H:%M:%S")
-                            current_time = datetime.now()
-                            age = current_time - scrape_time
-                            
-                            if age > timedelta(days=max_age_days):
-                                print(f"Data for {username} is {age.days} days old (older than {max_age_days} days)")
-                                return True
-                            else:
-                                print(f"Data for {username} is {age.days} days old (within {max_age_days} days)")
-                                return False
-                        except ValueError as e:
-                            print(f"Error parsing date for {username}: {e}")
-                            return True
-                
-                # If we get here, the username wasn't found in the data
-                print(f"No data found for {username}")
-                return True
-            except json.JSONDecodeError:
-                print(f"Error parsing JSON file: {filename}")
-                return True
+                result_queue.put(("profile", scrape_profile_data(worker_driver, username, scrape_options["network_capture"])))
+            except SessionExpired as e:
+                print(f"[worker {worker_id}] {e}; stopping this worker.")
+                break
+            except Exception as e:
+                print(f"[worker {worker_id}] Failed to scrape {username}: {e}")
+                traceback.print_exc()
+
+            # Small delay between profiles to avoid rate limiting
+            time.sleep(scrape_options["profile_delay"])
+    except SessionExpired as e:
+        print(f"[worker {worker_id}] {e}; stopping this worker.")
     except Exception as e:
-        print(f"Error reading data file: {e}")
-        return True
+        print(f"[worker {worker_id}] Unexpected error: {e}")
+        traceback.print_exc()
+    finally:
+        print(f"[worker {worker_id}] Session cache: {summarize_session_cache()}")
+        if worker_driver:
+            worker_driver.quit()
+        result_queue.put(("done", worker_id))
+
+def run_worker_pool(usernames, num_workers, scrape_options, on_result=None):
+    """Scrapes usernames with a pool of independently logged-in browser processes.
+    Returns the merged list of profile data from all workers; each result is also
+    passed to on_result as it arrives. The result queue is bounded, so a slow
+    on_result makes the workers wait rather than pile up results."""
+    import multiprocessing
+    import queue
+
+    # Workers cannot prompt for credentials, so make sure a cookie jar exists first
+    if not os.path.exists(COOKIES_FILE):
+        print("No saved cookies found. Logging in once before starting workers...")
+        login_driver = start_browser(scrape_options["lean"])
+        if login_driver is None:
+            print("ERROR: Failed to initialize Chrome WebDriver.")
+            return []
+        try:
+            if not ensure_logged_in(login_driver) or not os.path.exists(COOKIES_FILE):
+                print("Login failed. Exiting.")
+                return []
+        finally:
+            login_driver.quit()
+
+    num_workers = max(1, min(num_workers, len(usernames)))
+    work_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue(maxsize=num_workers * 2)
+    for username in usernames:
+        work_queue.put(username)
+    for _ in range(num_workers):
+        work_queue.put(None)
+
+    print(f"Starting {num_workers} scraper workers for {len(usernames)} profiles...")
+    workers = []
+    for worker_id in range(num_workers):
+        process = multiprocessing.Process(target=scrape_worker, args=(worker_id, work_queue, result_queue, scrape_options))
+        process.start()
+        workers.append(process)
+
+    all_profile_data = []
+    finished_workers = set()
+    started_at = time.time()
+    while len(finished_workers) < num_workers:
+        try:
+            kind, payload = result_queue.get(timeout=30)
+        except queue.Empty:
+            # A worker killed by the OS never reports back, so stop waiting once all are gone
+            if not any(process.is_alive() for process in workers):
+                print("All workers exited without reporting completion.")
+                break
+            continue
+        if kind == "profile":
+            all_profile_data.append(payload)
+            if on_result:
+                on_result(payload)
+        else:
+            finished_workers.add(payload)
+
+    for process in workers:
+        process.join()
+
+    elapsed = time.time() - started_at
+    rate = len(all_profile_data) / (elapsed / 60) if elapsed > 0 else 0
+    print(f"Worker pool scraped {len(all_profile_data)} profiles in {elapsed:.1f}s ({rate:.1f} profiles/min)")
+    return all_profile_data
 
 # --- Main Execution ---
 if __name__ == "__main__":
     try:
+        db_writer = None
+        heartbeat = None
+        failed_writes = []
         # Parse command line arguments
         parser = argparse.ArgumentParser(description='Instagram profile scraper')
         parser.add_argument('--test', action='store_true', help='Run in test mode (skip actual scraping)')
         parser.add_argument('--force', action='store_true', help='Force scraping even if data is recent')
         parser.add_argument('--max-age', type=int, default=365, help='Maximum age of data in days before rescraping (default: 365)')
+        parser.add_argument('--workers', type=int, default=1, help='Number of parallel browser processes (default: 1)')
+        parser.add_argument('--wait-timeout', type=float, default=15, help='Maximum seconds any page wait may block (default: 15)')
+        parser.add_argument('--profile-delay', type=float, default=3, help='Pause in seconds between profiles to avoid rate limiting (default: 3)')
+        parser.add_argument('--lean', action='store_true', help='Run headless and block images, media and fonts')
+        parser.add_argument('--network-capture', action='store_true', help="Build records from Instagram's own JSON responses, falling back to the DOM")
+        parser.add_argument('--tabs', type=int, default=1, help='Number of tabs each browser pipelines page loads across (default: 1)')
+        parser.add_argument('--attach', nargs='?', const='127.0.0.1:9222', metavar='HOST:PORT',
+                            help='Attach to a running browser_daemon.py browser instead of launching Chrome (default: 127.0.0.1:9222)')
+        parser.add_argument('--http-first', action='store_true', help='Fetch profile metadata over plain HTTP and use the browser only for failures (no reels)')
+        parser.add_argument('--session-ttl', type=float, default=DEFAULT_TTL_MINUTES,
+                            help=f'Minutes a validated login stays trusted without re-checking, 0 to always check (default: {DEFAULT_TTL_MINUTES})')
+        parser.add_argument('--pipeline', action='store_true',
+                            help='Write each profile to the database as it is scraped, via a background writer (needs DATABASE_URL)')
+        parser.add_argument('--lease-heartbeat', action='store_true',
+                            help='Keep extending the leases on the queued requests this worker claimed (needs DATABASE_URL)')
         args = parser.parse_args()
+        set_wait_ceiling(args.wait_timeout)
+        # Settings every scraping process needs (worker processes do not share our globals)
+        scrape_options = {
+            "wait_timeout": args.wait_timeout,
+            "profile_delay": args.profile_delay,
+            "lean": args.lean,
+            "network_capture": args.network_capture,
+            "tabs": max(1, args.tabs),
+            "session_ttl": args.session_ttl,
+        }
+        if args.attach and args.workers > 1:
+            print("Note: --workers is ignored with --attach; use --tabs to parallelise inside the attached browser.")
+            args.workers = 1
+        if scrape_options["tabs"] > 1 and args.network_capture:
+            print("Note: --network-capture is not used with --tabs; tabs share one performance log.")
         
         # Read usernames from file
         usernames = read_usernames_from_file(USERNAMES_FILE)
@@ -1131,114 +1516,140 @@ if __name__ == "__main__":
             sys.exit(1)
             
         print(f"Read {len(usernames)} usernames from {USERNAMES_FILE}")
-        
-        print("Setting up Chrome options...")
-        chrome_options = Options()
-        # Uncomment these as needed for troubleshooting
-        # chrome_options.add_argument("--no-sandbox")
-        # chrome_options.add_argument("--disable-dev-shm-usage")
-        # chrome_options.add_argument("--headless")  # Run in headless mode (no visible browser)
-        
-        print("Initializing Chrome driver...")
-        try:
-            # First attempt: standard initialization
-            driver = webdriver.Chrome(options=chrome_options)
-            print("Chrome WebDriver successfully initialized!")
-        except Exception as e:
-            print(f"Standard Chrome initialization failed: {e}")
-            print("Attempting to initialize with Service...")
-            
-            # Second attempt: with explicit ChromeDriver path
-            # You might need to adjust this path to where you placed your chromedriver
-            # For Mac users, default paths could be /usr/local/bin/chromedriver
-            webdriver_path = '/usr/local/bin/chromedriver'
-            
-            if os.path.exists(webdriver_path):
-                print(f"Found WebDriver at {webdriver_path}")
-                service = Service(executable_path=webdriver_path)
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-                print("Chrome WebDriver initialized with explicit path!")
+
+        # Work out which profiles actually need scraping, in one pass over the freshness index
+        if args.force:
+            pending_usernames = list(usernames)
+        else:
+            pending_usernames = stale_usernames(usernames, args.max_age, PROFILE_DATA_FILE)
+
+        # In test mode, skip actual scraping
+        if args.test:
+            print(f"TEST MODE: Would scrape {len(pending_usernames)} profiles: {', '.join(pending_usernames)}")
+            pending_usernames = []
+
+        # Array to store all profile data
+        all_profile_data = []
+        if pending_usernames and (args.pipeline or args.lease_heartbeat):
+            from db import load_env
+            if not load_env():
+                print("Pipeline mode and lease heartbeats disabled; profiles will only be saved to the profile store.")
             else:
-                webdriver_path = './chromedriver'  # Try local path
-                if os.path.exists(webdriver_path):
-                    print(f"Found WebDriver at {webdriver_path}")
-                    service = Service(executable_path=webdriver_path)
-                    driver = webdriver.Chrome(service=service, options=chrome_options)
-                    print("Chrome WebDriver initialized with local path!")
-                else:
-                    print("ERROR: ChromeDriver not found at default or local paths.")
-                    print("Please download ChromeDriver from https://chromedriver.chromium.org/downloads")
-                    print("Place it in /usr/local/bin/ or in the same directory as this script.")
-                    sys.exit(1)
-        
-        if driver is None:
-            print("ERROR: Failed to initialize Chrome WebDriver.")
-            sys.exit(1)
+                if args.pipeline:
+                    from db_writer import EXIT_DB_WRITE_FAILED, start_db_writer, submit_profile, stop_db_writer
+                    db_writer = start_db_writer()
+                if args.lease_heartbeat:
+                    # Without it, claimed requests would be reclaimed mid-scrape once their lease ran out
+                    from queue_lease import start_heartbeat, stop_heartbeat
+                    heartbeat = start_heartbeat()
+
+        def record_result(profile_data):
+            """Keeps a scraped profile for the profile store and, in pipeline mode, queues it for the database."""
+            all_profile_data.append(profile_data)
+            if db_writer:
+                submit_profile(db_writer, profile_data)
+
+        if pending_usernames and args.http_first:
+            from http_fetcher import fetch_profiles_http
+            http_profiles, pending_usernames = fetch_profiles_http(pending_usernames, profile_delay=args.profile_delay)
+            # HTTP records have no reels (and the HTML fallback no bio or privacy flag either),
+            # so lay them over the stored record rather than replacing it
+            stored_profiles = get_profiles([p["username"] for p in http_profiles], PROFILE_DATA_FILE)
+            for profile_data in http_profiles:
+                stored = stored_profiles.get(profile_data["username"])
+                record_result({**stored, **profile_data} if stored else profile_data)
+
+        if pending_usernames and args.workers > 1:
+            run_worker_pool(pending_usernames, args.workers, scrape_options, record_result)
+        elif pending_usernames:
+            page_load_strategy = TABS_PAGE_LOAD_STRATEGY if scrape_options["tabs"] > 1 else None
+            if args.attach:
+                driver = attach_browser(args.attach, args.lean, performance_log=args.network_capture,
+                                        page_load_strategy=page_load_strategy)
+            else:
+                print("Setting up Chrome options...")
+                driver = start_browser(args.lean, performance_log=args.network_capture,
+                                       page_load_strategy=page_load_strategy)
             
-        # Log in once for all profiles
-        logged_in_via_cookies = False
-        if os.path.exists(COOKIES_FILE):
-            if load_cookies(driver, COOKIES_FILE):
-                driver.refresh()
-                time.sleep(5) # Wait for page refresh
-                if is_logged_in(driver):
-                    logged_in_via_cookies = True
-                else:
-                    print("Cookie login failed. Clearing cookies and attempting manual login.")
-                    os.remove(COOKIES_FILE) # Remove invalid cookies
-                    driver.delete_all_cookies() # Clear browser cookies for fresh start
-
-        if not logged_in_via_cookies:
-            # Get credentials securely if not logged in via cookies
-            insta_username = input("Enter your Instagram username: ")
-            insta_password = getpass.getpass("Enter your Instagram password: ")
-            if not login_to_instagram(driver, insta_username, insta_password):
+            if driver is None:
+                print("ERROR: Failed to initialize Chrome WebDriver.")
+                sys.exit(1)
+                
+            # Log in once for all profiles
+            if not ensure_logged_in(driver, reuse_session=bool(args.attach), session_ttl=args.session_ttl):
                 print("Login failed. Exiting.")
                 if driver:
-                    driver.quit()
+                    release_browser(driver)
                 sys.exit(1)
-
-        # Array to store all profile data
-        all_profile_data = []
-        
-        # Process each username
-        for username in usernames:
-            print(f"\n{'='*50}\nProcessing profile: {username}\n{'='*50}")
-            
-            # Check if we need to scrape this profile
-            if not args.force and not is_profile_data_outdated(username, PROFILE_DATA_FILE, args.max_age):
-                print(f"Data for {username} is recent. Skipping.")
-                continue
-            
-            # In test mode, skip actual scraping
-            if args.test:
-                print(f"TEST MODE: Would scrape profile for {username}")
-                continue
             
-            # Scrape profile data
-            profile_data = scrape_profile_data(driver, username)
-            
-            # Add to the array
-            all_profile_data.append(profile_data)
-            
-            # Small delay between profiles to avoid rate limiting
-            time.sleep(3)
+            if scrape_options["tabs"] > 1:
+                try:
+                    # Results are collected as they finish so an expired session keeps what was scraped
+                    scrape_profiles_in_tabs(driver, pending_usernames, scrape_options["tabs"],
+                                            args.profile_delay, record_result)
+                except SessionExpired as e:
+                    print(f"{e}. Stopping; the remaining profiles are not marked completed and return to the queue when their lease expires.")
+                pending_usernames = []
+
+            # Process each username
+            for username in pending_usernames:
+                print(f"\n{'='*50}\nProcessing profile: {username}\n{'='*50}")
+                
+                # Scrape profile data
+                try:
+                    profile_data = scrape_profile_data(driver, username, args.network_capture)
+                except SessionExpired as e:
+                    # The cached session went stale: log in properly once, then retry this profile
+                    print(f"{e}. Logging in again...")
+                    if not ensure_logged_in(driver, session_ttl=args.session_ttl):
+                        print("Login failed. Stopping; the remaining profiles are not marked completed and return to the queue when their lease expires.")
+                        break
+                    profile_data = scrape_profile_data(driver, username, args.network_capture)
+                
+                # Add to the array (and the database queue in pipeline mode)
+                record_result(profile_data)
+                
+                # Small delay between profiles to avoid rate limiting
+                time.sleep(args.profile_delay)
         
+        if db_writer:
+            # Flushes whatever is still queued before the process moves on
+            failed_writes = stop_db_writer(db_writer)
+            db_writer = None
+
         # Only save if we actually scraped data
         if all_profile_data:
-            # Save all profile data to a single JSON file (appending to existing data)
-            save_profile_data_array(all_profile_data, PROFILE_DATA_FILE)
+            # Upsert into the profile store (appends to the log, replacing older records per username)
+            try:
+                save_profiles(all_profile_data, PROFILE_DATA_FILE)
+            except Exception as e:
+                print(f"Error saving profile data to {PROFILE_DATA_FILE}: {e}")
+                traceback.print_exc()
         else:
             print("No new data to save.")
 
+        if heartbeat:
+            stop_heartbeat(heartbeat)
+
+        if driver:
+            print(f"Session cache: {summarize_session_cache()}")
+
         # Close the browser
-        print("Closing browser.")
         if driver:
-            driver.quit()
+            release_browser(driver)
+
+        if failed_writes:
+            # The caller re-syncs the profile store with update_database.py before completing anything
+            print(f"{len(failed_writes)} profiles did not reach the database: {', '.join(failed_writes)}")
+            sys.exit(EXIT_DB_WRITE_FAILED)
             
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
         traceback.print_exc()
+        if db_writer:
+            stop_db_writer(db_writer)
+        if heartbeat:
+            stop_heartbeat(heartbeat)
         if driver:
-            driver.quit()
-        sys.exit(1)
\ No newline at end of file
+            release_browser(driver)
+        sys.exit(1)
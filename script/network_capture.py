@@ -0,0 +1,188 @@
+"""Builds profile and reel records from Instagram's own JSON responses.
+
+The profile and reels pages fetch their data as XHR/GraphQL JSON. With Chrome
+performance logging turned on (build_chrome_options(performance_log=True)),
+those responses can be read back through the DevTools protocol after the page
+has loaded, which gives exact counts, posting dates and comment counts without
+any extra navigation. The parsers work on
+plain dicts so they can also be fed payloads fetched some other way.
+"""
+import json
+from datetime import datetime
+
+# --- Configuration ---
+# Response URLs that carry profile or reel data
+CAPTURED_URL_MARKERS = (
+    "/api/v1/users/web_profile_info",
+    "/api/v1/clips/user",
+    "/api/v1/feed/user",
+    "/graphql/query",
+    "/api/graphql",
+)
+INSTAGRAM_URL = "https://www.instagram.com/"
+
+def drain_json_responses(driver):
+    """Reads (and clears) the performance log and returns [(url, payload)] for every
+    finished JSON response whose URL matches CAPTURED_URL_MARKERS."""
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        print(f"Performance log unavailable: {e}")
+        return []
+
+    candidate_urls = {}
+    finished = set()
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.responseReceived":
+            response = params.get("response", {})
+            url = response.get("url", "")
+            if any(marker in url for marker in CAPTURED_URL_MARKERS):
+                candidate_urls[params.get("requestId")] = url
+        elif method == "Network.loadingFinished":
+            finished.add(params.get("requestId"))
+
+    payloads = []
+    for request_id, url in candidate_urls.items():
+        if request_id not in finished:
+            continue
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            payloads.append((url, json.loads(body.get("body", ""))))
+        except Exception:
+            # Bodies of evicted or non-JSON responses are simply skipped
+            continue
+    return payloads
+
+def iter_dicts(value):
+    """Yields every dict nested anywhere inside value, depth first."""
+    stack = [value]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+def edge_count(node, key):
+    """Returns node[key]['count'] for GraphQL edge counters, or None."""
+    edge = node.get(key)
+    return edge.get("count") if isinstance(edge, dict) else None
+
+def format_timestamp(timestamp):
+    """Formats a unix timestamp the way scrape_time is stored."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def parse_profile_payload(payload, username):
+    """Returns profile fields for username found in a JSON payload, or None."""
+    for node in iter_dicts(payload):
+        if node.get("username") != username:
+            continue
+        followers = edge_count(node, "edge_followed_by")
+        if followers is None:
+            followers = node.get("follower_count")
+        if followers is None:
+            continue
+
+        following = edge_count(node, "edge_follow")
+        if following is None:
+            following = node.get("following_count")
+        posts = edge_count(node, "edge_owner_to_timeline_media")
+        if posts is None:
+            posts = node.get("media_count")
+        hd_pic = node.get("hd_profile_pic_url_info") or {}
+
+        return {
+            "full_name": node.get("full_name"),
+            "is_verified": bool(node.get("is_verified")),
+            "bio": node.get("biography") or "",
+            "external_url": node.get("external_url"),
+            "profile_pic_url": node.get("profile_pic_url_hd") or hd_pic.get("url") or node.get("profile_pic_url"),
+            "is_private": bool(node.get("is_private")),
+            "posts_count": posts,
+            "followers_count": followers,
+            "following_count": following,
+        }
+    return None
+
+def parse_reel_node(node, username):
+    """Converts one media node (REST or GraphQL shape) into a reel record, or None if it is not
+    a reel posted by username. Captured payloads also carry feed videos and suggested accounts'
+    clips, so nodes whose owner (GraphQL "owner", REST "user") is someone else, or unknown, are skipped."""
+    code = node.get("code") or node.get("shortcode")
+    if not code:
+        return None
+    owner = node.get("owner") or node.get("user")
+    if not isinstance(owner, dict) or owner.get("username") != username:
+        return None
+    is_clip = node.get("product_type") == "clips" or node.get("media_type") == 2 or node.get("is_video")
+    if not is_clip:
+        return None
+
+    thumbnail = node.get("display_url") or node.get("thumbnail_src")
+    candidates = (node.get("image_versions2") or {}).get("candidates") or []
+    if not thumbnail and candidates:
+        thumbnail = candidates[0].get("url")
+
+    views = node.get("play_count")
+    if views is None:
+        views = node.get("view_count")
+    if views is None:
+        views = node.get("video_view_count")
+    likes = node.get("like_count")
+    if likes is None:
+        likes = edge_count(node, "edge_liked_by")
+    comments = node.get("comment_count")
+    if comments is None:
+        comments = edge_count(node, "edge_media_to_comment")
+
+    return {
+        "id": code,
+        "url": f"{INSTAGRAM_URL}{username}/reel/{code}/",
+        "thumbnail": thumbnail,
+        "views": views,
+        "likes": likes,
+        "comments": comments,
+        "posted_date": format_timestamp(node.get("taken_at") or node.get("taken_at_timestamp")),
+    }
+
+def parse_reels_payload(payload, username):
+    """Returns the reel records found in a JSON payload, in payload order, without duplicates."""
+    reels = []
+    seen = set()
+    for node in iter_dicts(payload):
+        reel = parse_reel_node(node, username)
+        if reel and reel["id"] not in seen:
+            seen.add(reel["id"])
+            reels.append(reel)
+    return reels
+
+def profile_from_payloads(payloads, username):
+    """Returns the first profile record found across captured payloads, or None."""
+    for _, payload in payloads:
+        profile = parse_profile_payload(payload, username)
+        if profile:
+            return profile
+    return None
+
+def reels_from_payloads(payloads, username, limit=10):
+    """Returns up to limit reel records across captured payloads."""
+    reels = []
+    seen = set()
+    for _, payload in payloads:
+        for reel in parse_reels_payload(payload, username):
+            if reel["id"] not in seen:
+                seen.add(reel["id"])
+                reels.append(reel)
+    return reels[:limit]
@@ -0,0 +1,91 @@
+"""Condition-based waits for the Selenium scrapers.
+
+Every wait returns as soon as its DOM condition holds, or gives up at the
+configured ceiling, and records how long it actually took so a run can report
+where its time went instead of paying fixed sleeps on every page.
+"""
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+# --- Configuration ---
+DEFAULT_WAIT_CEILING = 15  # Upper bound in seconds for any single wait
+POLL_INTERVAL = 0.25  # How often conditions are re-checked
+REEL_LINK_SELECTOR = 'a[href*="/reel/"]'
+
+wait_ceiling = DEFAULT_WAIT_CEILING
+
+# (label, seconds waited, condition met) for every wait since the last reset
+wait_timings = []
+
+def set_wait_ceiling(seconds):
+    """Sets the maximum number of seconds any wait may block."""
+    global wait_ceiling
+    wait_ceiling = max(0.5, float(seconds))
+
+def reset_wait_timings():
+    """Clears the recorded wait timings (call once per profile)."""
+    del wait_timings[:]
+
+def summarize_wait_timings():
+    """Returns a one-line summary of the recorded waits and their total."""
+    if not wait_timings:
+        return "no waits"
+    parts = [f"{label}={elapsed:.2f}s{'' if met else ' (timeout)'}" for label, elapsed, met in wait_timings]
+    total = sum(elapsed for _, elapsed, _ in wait_timings)
+    return f"{', '.join(parts)} | total {total:.2f}s"
+
+def wait_until(driver, condition, label, timeout=None):
+    """Polls condition(driver) until it returns a truthy value or the timeout expires.
+    The timeout is capped at the global ceiling. Returns the condition's value, or None on timeout."""
+    limit = wait_ceiling if timeout is None else min(timeout, wait_ceiling)
+    started = time.time()
+    try:
+        result = WebDriverWait(driver, limit, poll_frequency=POLL_INTERVAL).until(condition)
+        met = True
+    except TimeoutException:
+        result = None
+        met = False
+    elapsed = time.time() - started
+    wait_timings.append((label, elapsed, met))
+    print(f"Waited {elapsed:.2f}s for {label}{'' if met else ' (gave up)'}")
+    return result
+
+def wait_for_header(driver, timeout=None):
+    """Waits for the profile <header> to render. Returns the element or None."""
+    return wait_until(driver, EC.presence_of_element_located((By.XPATH, "//header")), "header", timeout)
+
+def wait_for_url_change(driver, old_url, timeout=None):
+    """Waits until the browser has navigated away from old_url."""
+    return wait_until(driver, EC.url_changes(old_url), "url_change", timeout)
+
+def wait_for_url_contains(driver, fragment, timeout=None):
+    """Waits until the current URL contains fragment."""
+    return wait_until(driver, EC.url_contains(fragment), f"url_contains:{fragment}", timeout)
+
+def wait_for_stable_count(driver, css_selector, label, stable_for=1.0, timeout=None):
+    """Waits until the document has loaded and the number of elements matching css_selector
+    has not changed for stable_for seconds. A count that stays at 0 counts as settled too,
+    so profiles without reels do not wait out the whole timeout. Returns the last observed count."""
+    state = {"count": -1, "since": time.time()}
+
+    def count_settled(d):
+        count, ready = d.execute_script(
+            "return [document.querySelectorAll(arguments[0]).length, document.readyState === 'complete'];",
+            css_selector)
+        now = time.time()
+        if count != state["count"]:
+            state["count"] = count
+            state["since"] = now
+            return False
+        return ready and now - state["since"] >= stable_for
+
+    wait_until(driver, count_settled, label, timeout)
+    return max(state["count"], 0)
+
+def wait_for_reel_links(driver, label="reel_links_stable", stable_for=1.0, timeout=None):
+    """Waits until the number of reel links on the page stops changing."""
+    return wait_for_stable_count(driver, REEL_LINK_SELECTOR, label, stable_for, timeout)
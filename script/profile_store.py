@@ -0,0 +1,337 @@
+"""Profile store shared by the scraper and the database sync scripts.
+
+A .jsonl store is an append-only log with one profile record per line, plus
+an index file (<log>.idx) mapping each username to the byte offset of its
+latest record. Saving a profile appends one line and updates the index, so the
+cost no longer grows with the size of the store; reading one profile seeks
+straight to its offset. Superseded records are dropped by compact(), which
+save_profiles() runs in a background thread once they outnumber the live ones.
+
+A .db or .sqlite filename selects the SQLite backend in sqlite_store.py,
+which suits a single node with a large store. A .json filename keeps the
+legacy format (one JSON array rewritten on every save). The first time a
+.jsonl or SQLite store is created, the legacy file with the same stem is
+imported if it exists.
+
+Saves and compaction are serialised by compaction_lock, which only covers the
+threads of one process: a .jsonl store takes one writing process at a time
+(the scraper). Readers in other processes (update_completion.py,
+update_database.py) are safe while it compacts: they reopen the log if it is
+swapped between reading the index and opening the file.
+
+The file is chosen with the PROFILE_DATA_FILE environment variable.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import sqlite_store
+
+# --- Configuration ---
+PROFILE_DATA_FILE = os.getenv("PROFILE_DATA_FILE", "profile_data.jsonl")
+INDEX_SUFFIX = ".idx"
+COMPACT_MIN_SUPERSEDED = 100  # Don't bother compacting tiny logs
+JSON_READ_CHUNK = 64 * 1024  # Characters read at a time when streaming a legacy JSON array
+LOG_OPEN_ATTEMPTS = 5  # Tries to open a log that is not being swapped by a compaction
+
+compaction_lock = threading.Lock()
+
+def store_format(filename):
+    """Returns "jsonl" (append-only log), "sqlite" or "json" (legacy array file) for a store filename."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".jsonl":
+        return "jsonl"
+    if extension in (".db", ".sqlite", ".sqlite3"):
+        return "sqlite"
+    return "json"
+
+def import_legacy_into_sqlite(filename):
+    """Creates a new SQLite store, seeded from the legacy JSON file with the same stem."""
+    legacy_file = legacy_path(filename)
+    legacy_profiles = [p for p in load_legacy(legacy_file) if p.get("username")]
+    if legacy_profiles:
+        print(f"Importing {len(legacy_profiles)} profiles from {legacy_file} into {filename}")
+        sqlite_store.save_profiles(legacy_profiles, filename)
+
+def open_sqlite(filename):
+    """Returns filename after making sure the SQLite store exists."""
+    if not os.path.exists(filename):
+        import_legacy_into_sqlite(filename)
+    return filename
+
+def index_path(filename):
+    return filename + INDEX_SUFFIX
+
+def legacy_path(filename):
+    return os.path.splitext(filename)[0] + ".json"
+
+def load_legacy(filename):
+    """Returns the profile list from a legacy JSON array file ([] if missing or unreadable)."""
+    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+        return []
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        print(f"Error parsing JSON file: {filename}")
+        return []
+
+def iter_legacy(filename):
+    """Yields the profiles of a legacy JSON array file one at a time, decoding the array
+    incrementally so only the current profile (plus one read chunk) is held in memory."""
+    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+        return
+    decoder = json.JSONDecoder()
+    with open(filename, 'r', encoding='utf-8') as f:
+        buffer = ""
+        position = 0
+        eof = False
+        in_array = False
+        while True:
+            # Skip whitespace, the opening bracket and separators up to the next value
+            while position < len(buffer) and buffer[position] in " \t\r\n,[":
+                if buffer[position] == "[":
+                    in_array = True
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            if position == len(buffer) or not in_array:
+                if eof:
+                    if in_array:
+                        print(f"Error parsing JSON file: {filename} ends before the closing bracket")
+                    return
+                chunk = f.read(JSON_READ_CHUNK)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                if not in_array and buffer.strip() and buffer.lstrip()[0] != "[":
+                    print(f"Error parsing JSON file: {filename} is not a JSON array")
+                    return
+                continue
+            try:
+                profile, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    print(f"Error parsing JSON file: {filename}")
+                    return
+                # The value continues past the end of the buffer; read more and retry
+                chunk = f.read(JSON_READ_CHUNK)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            yield profile
+
+def save_legacy(filename, profiles):
+    """Merges profiles into a legacy JSON array file by username and rewrites it."""
+    merged = {profile.get('username'): profile for profile in load_legacy(filename)}
+    for profile in profiles:
+        merged[profile.get('username')] = profile
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(list(merged.values()), f, indent=2, ensure_ascii=False)
+    print(f"Saved {len(profiles)} profiles to {filename} ({len(merged)} total)")
+
+def scan_log(filename):
+    """Rebuilds the index by reading the whole log. Returns (entries, records_in_log)."""
+    entries = {}
+    records = 0
+    with open(filename, 'rb') as f:
+        offset = 0
+        for line in f:
+            if line.endswith(b"\n"):
+                try:
+                    profile = json.loads(line)
+                    entries[profile["username"]] = [offset, profile.get("scrape_time")]
+                    records += 1
+                except (ValueError, KeyError):
+                    print(f"Skipping unreadable record at byte {offset} of {filename}")
+            offset += len(line)
+    return entries, records
+
+def write_index(filename, index):
+    """Writes the index atomically."""
+    temp_file = f"{index_path(filename)}.{os.getpid()}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(temp_file, index_path(filename))
+
+def load_index(filename):
+    """Returns the index {"log_size", "records", "entries": {username: [offset, scrape_time]}}.
+    The index remembers the log size it describes; if the log has changed behind its back
+    (crash between append and index write, or a concurrent compaction) it is rebuilt from the log."""
+    if not os.path.exists(filename):
+        index = {"log_size": 0, "records": 0, "entries": {}}
+        legacy_file = legacy_path(filename)
+        legacy_profiles = load_legacy(legacy_file)
+        open(filename, 'ab').close()
+        if legacy_profiles:
+            print(f"Importing {len(legacy_profiles)} profiles from {legacy_file} into {filename}")
+            append_profiles(filename, index, legacy_profiles)
+        return index
+
+    log_size = os.path.getsize(filename)
+    try:
+        with open(index_path(filename), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get("log_size") == log_size:
+            return index
+    except (OSError, ValueError):
+        pass
+
+    print(f"Rebuilding profile index for {filename}")
+    entries, records = scan_log(filename)
+    index = {"log_size": log_size, "records": records, "entries": entries}
+    write_index(filename, index)
+    return index
+
+def append_profiles(filename, index, profiles):
+    """Appends profile records to the log and updates and saves index."""
+    with open(filename, 'a+b') as f:
+        # A crash mid-write can leave a partial last line; start on a fresh one
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        for profile in profiles:
+            offset = f.tell()
+            f.write(json.dumps(profile, ensure_ascii=False).encode('utf-8') + b"\n")
+            index["entries"][profile["username"]] = [offset, profile.get("scrape_time")]
+            index["records"] += 1
+        index["log_size"] = f.tell()
+    write_index(filename, index)
+
+def save_profiles(profiles, filename=PROFILE_DATA_FILE):
+    """Upserts profile records, replacing any earlier record for the same username."""
+    profiles = [profile for profile in profiles if profile.get("username")]
+    if store_format(filename) == "sqlite":
+        sqlite_store.save_profiles(profiles, open_sqlite(filename))
+        return
+    if store_format(filename) == "json":
+        save_legacy(filename, profiles)
+        return
+    with compaction_lock:
+        index = load_index(filename)
+        append_profiles(filename, index, profiles)
+    superseded = index["records"] - len(index["entries"])
+    print(f"Appended {len(profiles)} profiles to {filename} ({len(index['entries'])} total, {superseded} superseded records)")
+    if superseded >= COMPACT_MIN_SUPERSEDED and superseded > len(index["entries"]):
+        # Not a daemon thread, so the process waits for it instead of leaving a half-written file
+        threading.Thread(target=compact, args=(filename,), name="profile-store-compaction").start()
+
+def open_log(filename):
+    """Returns (index, log file opened for reading) describing the same log. compact() in
+    another process can replace the log between reading the index and opening the file,
+    which would point the offsets into the wrong file; the file is then reopened."""
+    for attempt in range(LOG_OPEN_ATTEMPTS):
+        inode = os.stat(filename).st_ino if os.path.exists(filename) else None
+        index = load_index(filename)
+        f = open(filename, 'rb')
+        if inode is None or os.fstat(f.fileno()).st_ino == inode or attempt == LOG_OPEN_ATTEMPTS - 1:
+            return index, f
+        f.close()
+
+def read_record(f, offset):
+    f.seek(offset)
+    return json.loads(f.readline())
+
+def get_profile(username, filename=PROFILE_DATA_FILE):
+    """Returns the latest record for username, or None."""
+    if store_format(filename) == "sqlite":
+        return sqlite_store.get_profile(username, open_sqlite(filename))
+    if store_format(filename) == "json":
+        return next((p for p in load_legacy(filename) if p.get('username') == username), None)
+    index, f = open_log(filename)
+    with f:
+        entry = index["entries"].get(username)
+        return read_record(f, entry[0]) if entry is not None else None
+
+def get_profiles(usernames, filename=PROFILE_DATA_FILE):
+    """Returns {username: latest record} for the given usernames that are stored, reading
+    the index (or legacy file) once for the whole list rather than once per username."""
+    wanted = set(usernames)
+    if store_format(filename) == "sqlite":
+        filename = open_sqlite(filename)
+        found = ((username, sqlite_store.get_profile(username, filename)) for username in wanted)
+        return {username: profile for username, profile in found if profile is not None}
+    if store_format(filename) == "json":
+        return {p['username']: p for p in iter_legacy(filename) if p.get('username') in wanted}
+    index, f = open_log(filename)
+    entries = index["entries"]
+    offsets = sorted((entries[username][0], username) for username in wanted if username in entries)
+    with f:
+        return {username: read_record(f, offset) for offset, username in offsets}
+
+def iter_profiles(filename=PROFILE_DATA_FILE):
+    """Yields the latest record of every profile one at a time, so memory use stays flat
+    however large the store is. Order: as saved (JSON/JSONL) or by username (SQLite)."""
+    if store_format(filename) == "sqlite":
+        yield from sqlite_store.iter_profiles(open_sqlite(filename))
+        return
+    if store_format(filename) == "json":
+        yield from iter_legacy(filename)
+        return
+    index, f = open_log(filename)
+    latest_offsets = {offset for offset, _ in index["entries"].values()}
+    # One sequential pass over the log, skipping superseded records
+    with f:
+        offset = 0
+        for line in f:
+            if offset >= index["log_size"]:
+                break  # Appended after the index was read
+            if offset in latest_offsets:
+                yield json.loads(line)
+            offset += len(line)
+
+def load_profiles(filename=PROFILE_DATA_FILE):
+    """Returns the latest record of every profile as a list (see iter_profiles)."""
+    return list(iter_profiles(filename))
+
+def compact(filename=PROFILE_DATA_FILE):
+    """Rewrites the log with only the latest record per username and swaps it in."""
+    with compaction_lock:
+        index = load_index(filename)
+        before = index["records"]
+        temp_file = f"{filename}.{os.getpid()}.compact"
+        entries = {}
+        with open(filename, 'rb') as source, open(temp_file, 'wb') as target:
+            for username, (offset, scrape_time) in sorted(index["entries"].items(), key=lambda item: item[1][0]):
+                source.seek(offset)
+                entries[username] = [target.tell(), scrape_time]
+                target.write(source.readline())
+            log_size = target.tell()
+        os.replace(temp_file, filename)
+        write_index(filename, {"log_size": log_size, "records": len(entries), "entries": entries})
+    print(f"Compacted {filename}: {before} records -> {len(entries)}")
+
+def freshness_index(filename=PROFILE_DATA_FILE):
+    """Returns {username: scrape_time string} for every stored profile.
+    For a .jsonl store this comes straight from the index file, without reading any records."""
+    if store_format(filename) == "sqlite":
+        return sqlite_store.freshness_index(open_sqlite(filename))
+    if store_format(filename) == "json":
+        return {p.get('username'): p.get('scrape_time') for p in load_legacy(filename)}
+    return {username: scrape_time for username, (_, scrape_time) in load_index(filename)["entries"].items()}
+
+def stale_usernames(usernames, max_age_days, filename=PROFILE_DATA_FILE):
+    """Returns the usernames (in order) whose stored data is missing, undated or older than
+    max_age_days, checking the whole list against one freshness index. Prints one summary line."""
+    scrape_times = freshness_index(filename)
+    cutoff = datetime.now() - timedelta(days=max_age_days)
+    stale = []
+    missing = undated = outdated = 0
+    for username in usernames:
+        scrape_time = scrape_times.get(username)
+        if username not in scrape_times:
+            missing += 1
+        elif not scrape_time:
+            undated += 1
+        else:
+            try:
+                if datetime.strptime(scrape_time, "%Y-%m-%d %H:%M:%S") >= cutoff:
+                    continue
+                outdated += 1
+            except ValueError:
+                undated += 1
+        stale.append(username)
+    print(f"Freshness check: {len(stale)} of {len(usernames)} profiles need scraping "
+          f"({missing} never scraped, {outdated} older than {max_age_days} days, {undated} without a valid scrape_time)")
+    return stale
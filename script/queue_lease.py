@@ -0,0 +1,179 @@
+"""Leases on claimed QueuedRequest rows.
+
+db_to_usernames.py claims requests with a lease (claimedBy, leaseExpiresAt)
+instead of marking them 'processing' forever. While the scraper runs, a
+heartbeat thread keeps extending every lease held by this worker id. If a
+node dies, its leases run out and reclaim_expired() puts the rows back to
+'pending' with an attempt counter and an exponential backoff (nextAttemptAt),
+or marks them 'failed' once QUEUE_MAX_ATTEMPTS is reached (failing the
+linked ScrapeRequest of interactive requests with it).
+
+Every timestamp is computed by Postgres as timezone('utc', now()), the UTC
+wall clock Prisma stores, so clock skew between nodes cannot expire a
+lease early and local time zones never leak into the table.
+
+All tools in one scraper run must agree on the worker id: run_scraper.sh and
+scrape_daemon.py export SCRAPER_WORKER_ID (unique per run or per daemon
+process), and without it the id is the host name (set SCRAPER_WORKER_ID when
+running several scrapers on one host). The daemon's heartbeat also names the
+request ids it claimed, so a restarted daemon never keeps a dead one's leases.
+
+Usage: python queue_lease.py reclaim
+       python queue_lease.py heartbeat   (extends this worker's leases until killed)
+"""
+import os
+import socket
+import sys
+import threading
+import uuid
+
+from db import load_env, env_number, connect_to_database, get_connection, release_connection, close_pool
+
+# --- Configuration ---
+# Overridable from the environment (.env) with QUEUE_LEASE_SECONDS and QUEUE_MAX_ATTEMPTS
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 3600
+FAILED_REQUEST_ERROR = "Scraping failed after repeated attempts"
+
+# SQL for the current time and a fresh lease end, in the UTC wall clock Prisma uses
+DB_NOW = "timezone('utc', now())"
+DB_LEASE_EXPIRY = DB_NOW + " + %(lease_seconds)s * interval '1 second'"
+
+def worker_id():
+    """Identifies this scraper node in claimedBy. Stable across the processes of one
+    run (claim, scrape, heartbeat, completion) even without SCRAPER_WORKER_ID."""
+    return os.getenv("SCRAPER_WORKER_ID") or socket.gethostname()
+
+def process_worker_id():
+    """A worker id no other process (including a restart of this one) will reuse."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def lease_seconds():
+    return env_number("QUEUE_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)
+
+def max_attempts():
+    return env_number("QUEUE_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+
+def extend_leases(conn, worker, request_ids=None):
+    """Pushes out leaseExpiresAt on every request this worker is processing, or only on
+    request_ids when given. Returns the row count."""
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        id_filter = "AND id = ANY(%(request_ids)s)" if request_ids is not None else ""
+        cursor.execute(f"""
+        UPDATE "QueuedRequest"
+        SET "leaseExpiresAt" = {DB_LEASE_EXPIRY}, "updatedAt" = {DB_NOW}
+        WHERE "claimedBy" = %(worker)s AND status = 'processing' {id_filter}
+        """, {"lease_seconds": lease_seconds(), "worker": worker, "request_ids": list(request_ids or [])})
+        conn.commit()
+        return cursor.rowcount
+    except Exception as e:
+        print(f"Error extending leases: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        if cursor:
+            cursor.close()
+
+def reclaim_expired(conn):
+    """Returns requests whose lease ran out to 'pending', retrying after
+    BACKOFF_BASE_SECONDS * 2^(attempts - 1) (capped at BACKOFF_MAX_SECONDS).
+    Requests that already used max_attempts() are marked 'failed' instead, and so is
+    the ScrapeRequest of an interactive one, which would otherwise show as processing
+    forever (a failed background refresh leaves the user's finished request alone).
+    Returns (requeued, failed)."""
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+        WITH reclaimed AS (
+            UPDATE "QueuedRequest"
+            SET status = CASE WHEN attempts >= %(max_attempts)s THEN 'failed' ELSE 'pending' END,
+                "nextAttemptAt" = {DB_NOW} + LEAST(
+                    %(base)s * power(2, GREATEST(attempts - 1, 0)), %(cap)s) * interval '1 second',
+                "claimedBy" = NULL,
+                "leaseExpiresAt" = NULL,
+                "updatedAt" = {DB_NOW}
+            WHERE status = 'processing' AND "leaseExpiresAt" < {DB_NOW}
+            RETURNING status, lane, "scrapeRequestId"
+        ), failed_requests AS (
+            UPDATE "ScrapeRequest" sr
+            SET status = 'failed', error = %(error)s, "updatedAt" = {DB_NOW}
+            FROM reclaimed
+            WHERE sr.id = reclaimed."scrapeRequestId" AND reclaimed.status = 'failed'
+            AND reclaimed.lane = 'interactive'
+            AND sr.status <> 'completed'
+        )
+        SELECT status FROM reclaimed
+        """, {"max_attempts": max_attempts(), "base": BACKOFF_BASE_SECONDS, "cap": BACKOFF_MAX_SECONDS,
+              "error": FAILED_REQUEST_ERROR})
+        statuses = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        requeued, failed = statuses.count("pending"), statuses.count("failed")
+        if statuses:
+            print(f"Reclaimed {len(statuses)} expired leases ({requeued} requeued, {failed} failed after {max_attempts()} attempts)")
+        return requeued, failed
+    except Exception as e:
+        print(f"Error reclaiming expired leases: {e}")
+        conn.rollback()
+        return 0, 0
+    finally:
+        if cursor:
+            cursor.close()
+
+def heartbeat_loop(worker, stop_event, interval, request_ids=None):
+    while not stop_event.wait(interval):
+        try:
+            conn = get_connection()
+        except Exception as e:
+            print(f"[heartbeat] Could not reach the database: {e}")
+            continue
+        try:
+            extend_leases(conn, worker, request_ids)
+        finally:
+            release_connection(conn)
+
+def start_heartbeat(worker=None, interval=None, request_ids=None):
+    """Starts a daemon thread extending this worker's leases (only request_ids, when
+    given) every interval seconds (a third of the lease by default, so one slow beat
+    does not lose it).
+    Returns the stop event; set it (or call stop_heartbeat) when the work is done."""
+    worker = worker or worker_id()
+    interval = interval or lease_seconds() / 3
+    stop_event = threading.Event()
+    thread = threading.Thread(target=heartbeat_loop, args=(worker, stop_event, interval, request_ids),
+                              name="lease-heartbeat", daemon=True)
+    thread.start()
+    print(f"Lease heartbeat started for {worker} (every {interval:.0f}s)")
+    return stop_event
+
+def stop_heartbeat(stop_event):
+    stop_event.set()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in ("reclaim", "heartbeat"):
+        print(__doc__)
+        sys.exit(1)
+    if not load_env():
+        sys.exit(1)
+    if sys.argv[1] == "heartbeat":
+        # Runs in the foreground so a shell script can hold its leases across several steps
+        worker = worker_id()
+        print(f"Lease heartbeat running for {worker} (every {lease_seconds() / 3:.0f}s)")
+        try:
+            heartbeat_loop(worker, threading.Event(), lease_seconds() / 3)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            close_pool()
+        sys.exit(0)
+    conn = connect_to_database()
+    try:
+        requeued, failed = reclaim_expired(conn)
+        print(f"Requeued {requeued}, failed {failed}")
+    finally:
+        release_connection(conn)
+        close_pool()
@@ -0,0 +1,95 @@
+"""Background refresh producer for the bulk lane.
+
+Puts completed QueuedRequest rows back in the queue in the 'bulk' lane when
+the profile they scraped is older than --max-age days, so stale profiles are
+refreshed without anyone asking for them. db_to_usernames.claim_batch keeps a
+share of every batch for each lane, so these refreshes neither starve nor
+crowd out requests made through /api/scrape (lane 'interactive').
+
+The request row is reused rather than created because every QueuedRequest
+belongs to a UserRequest. The scraper skips profiles fresher than its own
+--max-age, so keep the two values in step.
+
+Usage: python queue_refreshes.py [--max-age 365] [--limit 100]
+"""
+import sys
+import argparse
+from datetime import datetime
+
+from db import load_env, connect_to_database, release_connection, close_pool
+
+# --- Configuration ---
+DEFAULT_MAX_AGE_DAYS = 365  # Same default as insta_scraper.py --max-age
+DEFAULT_REFRESH_LIMIT = 100  # Requests re-queued per run, oldest profiles first
+
+# The latest request per username is re-queued, and only when nothing for that
+# username is already pending or processing. Times are UTC, like Prisma's.
+REFRESH_QUERY = """
+WITH latest AS (
+    SELECT DISTINCT ON (q.username) q.id, q.username, q.status
+    FROM "QueuedRequest" q
+    ORDER BY q.username, q."lastQueued" DESC
+), due AS (
+    SELECT latest.id
+    FROM latest
+    JOIN "InstagramProfile" p ON p.username = latest.username
+    WHERE latest.status = 'completed'
+    AND p."scrapeTime" < timezone('utc', now()) - %(max_age_days)s * interval '1 day'
+    AND NOT EXISTS (
+        SELECT 1 FROM "QueuedRequest" active
+        WHERE active.username = latest.username AND active.status IN ('pending', 'processing'))
+    ORDER BY p."scrapeTime" ASC
+    LIMIT %(limit)s
+)
+UPDATE "QueuedRequest" AS q
+SET status = 'pending', lane = 'bulk',
+    "lastQueued" = timezone('utc', now()), "updatedAt" = timezone('utc', now()),
+    attempts = 0, "nextAttemptAt" = NULL, "claimedBy" = NULL, "leaseExpiresAt" = NULL
+FROM due
+WHERE q.id = due.id
+RETURNING q.username
+"""
+
+def queue_refreshes(conn, max_age_days=DEFAULT_MAX_AGE_DAYS, limit=DEFAULT_REFRESH_LIMIT):
+    """Re-queues up to limit stale profiles in the bulk lane. Returns the re-queued usernames."""
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(REFRESH_QUERY, {"max_age_days": max_age_days, "limit": limit})
+        usernames = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        if usernames:
+            print(f"Queued {len(usernames)} background refreshes (profiles older than {max_age_days} days)")
+        return usernames
+    except Exception as e:
+        print(f"Error queueing background refreshes: {e}")
+        conn.rollback()
+        return []
+    finally:
+        if cursor:
+            cursor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-queue stale profiles in the bulk lane')
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE_DAYS,
+                        help=f'Refresh profiles scraped more than this many days ago (default: {DEFAULT_MAX_AGE_DAYS})')
+    parser.add_argument('--limit', type=int, default=DEFAULT_REFRESH_LIMIT,
+                        help=f'Maximum requests to re-queue in this run (default: {DEFAULT_REFRESH_LIMIT})')
+    args = parser.parse_args()
+
+    print(f"=== Instagram Scraper Background Refresh ===")
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if not load_env():
+        sys.exit(1)
+
+    conn = connect_to_database()
+    try:
+        usernames = queue_refreshes(conn, args.max_age, args.limit)
+        print(f"Re-queued {len(usernames)} profiles for refresh")
+    finally:
+        release_connection(conn)
+        close_pool()
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,7 @@
-import time, pickle, os, sys, traceback, random, json, re
+import time, pickle, os, sys, traceback, random, json, re, argparse
 from datetime import datetime
 from collections import deque
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
@@ -13,6 +10,7 @@ from selenium.common.exceptions import (
     NoSuchElementException, TimeoutException, NoSuchWindowException,
     WebDriverException, MoveTargetOutOfBoundsException, JavascriptException
 )
+from browser import start_browser
 
 # --- Configuration ---
 USERNAMES_FILE = "usernames.txt"
@@ -342,29 +340,11 @@ def collect_usernames_from_reels():
 if __name__ == "__main__":
     driver = None
     try:
+        parser = argparse.ArgumentParser(description='Instagram Reels username collector')
+        parser.add_argument('--lean', action='store_true', help='Run headless and block images, media and fonts')
+        args = parser.parse_args()
         print("Starting Instagram Reels Username Collector.")
-        chrome_options = Options()
-        # Uncomment below if you want headless mode:
-        # chrome_options.add_argument("--headless")
-        try:
-            driver = webdriver.Chrome(options=chrome_options)
-            print("Chrome WebDriver initialized!")
-        except Exception as e:
-            print(f"Standard initialization failed: {e}")
-            webdriver_path = '/usr/local/bin/chromedriver'
-            if os.path.exists(webdriver_path):
-                service = Service(executable_path=webdriver_path)
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-                print("Chrome WebDriver initialized with explicit path!")
-            else:
-                webdriver_path = './chromedriver'
-                if os.path.exists(webdriver_path):
-                    service = Service(executable_path=webdriver_path)
-                    driver = webdriver.Chrome(service=service, options=chrome_options)
-                    print("Chrome WebDriver initialized with local path!")
-                else:
-                    print("ERROR: ChromeDriver not found.")
-                    sys.exit(1)
+        driver = start_browser(args.lean)
         if driver is None:
             print("ERROR: Failed to initialize driver.")
             sys.exit(1)
@@ -3,6 +3,9 @@
 # Change to the script directory
 cd "$(dirname "$0")"
 
+# One-shot run for cron. For scraping requests as soon as they are queued,
+# run scrape_daemon.py as a long-lived service instead.
+
 echo "=== Instagram Scraper Automation ==="
 echo "Starting at $(date)"
 
@@ -28,9 +31,24 @@ source "$ACTIVATE_SCRIPT"
 # Verify Python is from virtual environment
 echo "Using Python: $(which python)"
 
-# Install required packages if not already installed
-echo "Installing dependencies..."
-pip install -r requirements_db.txt
+# Install required packages only when requirements_db.txt changed since the last install
+REQUIREMENTS_STAMP="${VENV_DIR}/.requirements_db.stamp"
+REQUIREMENTS_SUM="$(cksum < requirements_db.txt)"
+if [ ! -f "$REQUIREMENTS_STAMP" ] || [ "$(cat "$REQUIREMENTS_STAMP")" != "$REQUIREMENTS_SUM" ]; then
+  echo "Installing dependencies..."
+  pip install -r requirements_db.txt && echo "$REQUIREMENTS_SUM" > "$REQUIREMENTS_STAMP"
+else
+  echo "Dependencies up to date."
+fi
+
+# Every step of this run claims, heartbeats and completes queued requests under one worker id
+export SCRAPER_WORKER_ID="${SCRAPER_WORKER_ID:-$(hostname):$$}"
+HEARTBEAT_PID=""
+trap '[ -n "$HEARTBEAT_PID" ] && kill "$HEARTBEAT_PID" 2>/dev/null' EXIT
+
+# Re-queue stale profiles as background refreshes (the bulk lane)
+echo "Queueing background refreshes..."
+python queue_refreshes.py
 
 # Fetch usernames from database
 echo "Fetching usernames from database..."
@@ -50,18 +68,50 @@ if [ ! -s usernames.txt ]; then
   exit 0
 fi
 
-# Run the Instagram scraper
+# Keep the claimed leases alive through scraping, the database update and completion
+python queue_lease.py heartbeat &
+HEARTBEAT_PID=$!
+
+# Run the Instagram scraper (set SCRAPER_WORKERS to scrape with several browsers in parallel)
+# Set SCRAPER_ATTACH=1 to reuse a warm browser kept alive by browser_daemon.py between runs
+# Set SCRAPER_PIPELINE=1 to write each profile to the database as soon as it is scraped
+PIPELINE_FLAG=""
+if [ -n "$SCRAPER_PIPELINE" ]; then
+  PIPELINE_FLAG="--pipeline"
+fi
 echo "Running Instagram scraper..."
-python insta_scraper.py
+if [ -n "$SCRAPER_ATTACH" ]; then
+  python browser_daemon.py start --port "${BROWSER_DEBUG_PORT:-9222}"
+  python insta_scraper.py --attach "127.0.0.1:${BROWSER_DEBUG_PORT:-9222}" $PIPELINE_FLAG
+else
+  python insta_scraper.py --workers "${SCRAPER_WORKERS:-1}" $PIPELINE_FLAG
+fi
 SCRAPER_EXIT_CODE=$?
 
-# Update the database with the scraped data
-echo "Updating database with scraped data..."
-python update_database.py
+# Update the database with the scraped data. Pipeline mode already did this as it went,
+# unless the scraper exits with 3 (some background writes failed), which needs a full re-sync.
+DB_SYNC_OK=1
+if [ -z "$SCRAPER_PIPELINE" ] || [ $SCRAPER_EXIT_CODE -eq 3 ]; then
+  echo "Updating database with scraped data..."
+  if ! python update_database.py --bulk; then
+    DB_SYNC_OK=0
+  elif [ $SCRAPER_EXIT_CODE -eq 3 ]; then
+    SCRAPER_EXIT_CODE=0
+  fi
+fi
+
+# Update completion status in QueuedRequest table, only once the scraped rows are in the database
+if [ $DB_SYNC_OK -eq 1 ]; then
+  echo "Updating completion status in database..."
+  python update_completion.py
+else
+  echo "Error: Database update failed; requests stay leased and return to the queue when their lease expires"
+  SCRAPER_EXIT_CODE=1
+fi
 
-# Update completion status in QueuedRequest table
-echo "Updating completion status in database..."
-python update_completion.py
+# Completion is written; whatever is still leased expires and is reclaimed
+kill "$HEARTBEAT_PID" 2>/dev/null
+HEARTBEAT_PID=""
 
 # Deactivate virtual environment
 echo "Deactivating virtual environment..."
@@ -0,0 +1,168 @@
+"""Long-running scrape loop driven by Postgres LISTEN/NOTIFY instead of cron.
+
+A trigger on "QueuedRequest" (see the queued_request_notify migration) sends a
+notification on the queued_request channel whenever a request becomes
+pending. The daemon blocks on that channel, and as soon as something arrives
+it claims a batch (db_to_usernames.claim_batch: interactive lane first, each
+lane by priority with aging), scrapes it with insta_scraper.py --pipeline
+so rows reach the database as they are scraped, and marks the batch
+completed. A lease heartbeat runs from the claim until completion is written.
+Every --sweep-seconds it also checks the queue without a notification, which
+picks up anything sent while the listening connection was down and requests
+coming back from lease backoff. Every --refresh-seconds it re-queues stale
+profiles in the bulk lane (queue_refreshes.py).
+
+Each batch still runs insta_scraper.py as a child process, so a browser crash
+cannot take the daemon down (its leases simply expire and are reclaimed). Use
+--attach with browser_daemon.py to skip the Chrome startup per batch.
+
+Usage: python scrape_daemon.py [--batch-size 20] [--sweep-seconds 60] [--refresh-seconds 3600] [--attach [HOST:PORT]]
+"""
+import argparse
+import os
+import select
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import psycopg2
+
+from db import load_env, connection, get_connection, release_connection, close_pool
+from db_to_usernames import DEFAULT_BULK_SHARE, DEFAULT_INTERACTIVE_SHARE, claim_batch, summarize_queue_waits, write_usernames_to_file
+from db_writer import EXIT_DB_WRITE_FAILED
+from queue_lease import process_worker_id, reclaim_expired, start_heartbeat, stop_heartbeat
+from queue_refreshes import queue_refreshes
+from update_completion import get_successfully_scraped_usernames, update_requests_to_completed
+
+# --- Configuration ---
+CHANNEL = "queued_request"
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_SWEEP_SECONDS = 60
+DEFAULT_REFRESH_SECONDS = 3600
+RECONNECT_DELAY = 10  # Seconds to wait before re-opening a dropped LISTEN connection
+
+def listen(conn):
+    """Subscribes conn to the notification channel. LISTEN needs autocommit:
+    notifications are only delivered outside a transaction."""
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {CHANNEL}")
+    print(f"Listening for new queued requests on '{CHANNEL}'")
+
+def wait_for_notifications(conn, timeout):
+    """Blocks until a notification arrives or timeout seconds pass.
+    Returns how many notifications were received (0 on a timeout)."""
+    if not conn.notifies:
+        select.select([conn], [], [], timeout)
+        conn.poll()
+    received = len(conn.notifies)
+    conn.notifies.clear()
+    return received
+
+def run_scraper(usernames, args):
+    """Scrapes usernames with insta_scraper.py in a child process. Returns its exit code."""
+    if not write_usernames_to_file(usernames):
+        return 1
+    command = [sys.executable, "insta_scraper.py", "--pipeline"]
+    if args.attach:
+        command += ["--attach", args.attach]
+    elif args.workers > 1:
+        command += ["--workers", str(args.workers)]
+    return subprocess.call(command)
+
+def resync_database():
+    """Re-syncs the whole profile store with update_database.py --bulk. Returns True on success."""
+    print("Some profiles did not reach the database during the scrape; re-syncing the profile store...")
+    return subprocess.call([sys.executable, "update_database.py", "--bulk"]) == 0
+
+def drain_queue(args):
+    """Claims and scrapes batches until no claimable request is left. Returns the number of requests handled."""
+    handled = 0
+    while True:
+        with connection() as conn:
+            reclaim_expired(conn)
+            usernames, request_ids = claim_batch(conn, args.batch_size, interactive_share=args.interactive_share,
+                                                   bulk_share=args.bulk_share)
+        if not request_ids:
+            return handled
+
+        # Held until completion is written: a re-sync after the scrape can outlast one lease
+        heartbeat = start_heartbeat(request_ids=request_ids)
+        try:
+            started = time.time()
+            exit_code = run_scraper(usernames, args)
+            print(f"Scraped batch of {len(request_ids)} requests in {time.time() - started:.1f}s (scraper exit code {exit_code})")
+
+            # Matches update_completion.py: requests still leased to us whose profile was scraped are done.
+            # If the scraper died, anything it did not finish is reclaimed when its lease runs out.
+            if exit_code == EXIT_DB_WRITE_FAILED and resync_database():
+                exit_code = 0
+            if exit_code == 0:
+                scraped = get_successfully_scraped_usernames(list(dict.fromkeys(usernames)))
+                with connection() as conn:
+                    update_requests_to_completed(conn, scraped)
+        finally:
+            stop_heartbeat(heartbeat)
+        handled += len(request_ids)
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape queued requests as soon as they are created')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Requests claimed per scraper run (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--sweep-seconds', type=float, default=DEFAULT_SWEEP_SECONDS,
+                        help=f'Check the queue at least this often even without notifications (default: {DEFAULT_SWEEP_SECONDS})')
+    parser.add_argument('--refresh-seconds', type=float, default=DEFAULT_REFRESH_SECONDS,
+                        help=f'Re-queue stale profiles in the bulk lane this often, 0 to disable (default: {DEFAULT_REFRESH_SECONDS})')
+    parser.add_argument('--attach', nargs='?', const='127.0.0.1:9222', metavar='HOST:PORT',
+                        help='Scrape with a running browser_daemon.py browser (default: 127.0.0.1:9222)')
+    parser.add_argument('--interactive-share', type=float, default=DEFAULT_INTERACTIVE_SHARE,
+                        help=f'Share of each batch reserved for interactive requests (default: {DEFAULT_INTERACTIVE_SHARE})')
+    parser.add_argument('--bulk-share', type=float, default=DEFAULT_BULK_SHARE,
+                        help=f'Share of each batch reserved for bulk requests (default: {DEFAULT_BULK_SHARE})')
+    parser.add_argument('--workers', type=int, default=1, help='Parallel browser processes per batch when not attaching (default: 1)')
+    args = parser.parse_args()
+
+    if not load_env():
+        sys.exit(1)
+
+    # Claims and completions (in this process and the scraper children) use one id, unique to
+    # this daemon process unless set explicitly
+    os.environ["SCRAPER_WORKER_ID"] = os.getenv("SCRAPER_WORKER_ID") or process_worker_id()
+    print(f"=== Instagram Scrape Daemon ({os.environ['SCRAPER_WORKER_ID']}) ===")
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    listen_conn = None
+    last_refresh = None
+    try:
+        while True:
+            try:
+                if listen_conn is None:
+                    listen_conn = get_connection()
+                    listen(listen_conn)
+                if args.refresh_seconds > 0 and (last_refresh is None or time.time() - last_refresh >= args.refresh_seconds):
+                    with connection() as conn:
+                        queue_refreshes(conn)
+                    last_refresh = time.time()
+                # Sweep first: covers startup and anything queued while we were not listening
+                handled = drain_queue(args)
+                if handled:
+                    print(f"Queue drained ({handled} requests). Queue wait so far: {summarize_queue_waits()}")
+                    print("Waiting for new requests...")
+                wait_for_notifications(listen_conn, args.sweep_seconds)
+            except psycopg2.OperationalError as e:
+                print(f"Database connection lost: {e}. Reconnecting in {RECONNECT_DELAY}s...")
+                if listen_conn is not None:
+                    release_connection(listen_conn, close=True)
+                    listen_conn = None
+                time.sleep(RECONNECT_DELAY)
+    except KeyboardInterrupt:
+        print("Stopping scrape daemon")
+    finally:
+        if listen_conn is not None:
+            # Closed rather than pooled: it is in autocommit mode and subscribed to the channel
+            release_connection(listen_conn, close=True)
+        close_pool()
+
+if __name__ == "__main__":
+    main()
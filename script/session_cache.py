@@ -0,0 +1,110 @@
+"""Caches the result of the Instagram login check between runs.
+
+is_logged_in() loads the home page and waits for the feed on every run. When
+the same session cookies were validated a few minutes ago that round trip is
+wasted, so validations are recorded per cookie jar with a TTL. A session taken
+from the cache is re-checked lazily, the first time a profile page fails to
+render, instead of up front.
+"""
+import hashlib
+import json
+import os
+import time
+
+# --- Configuration ---
+SESSION_CACHE_FILE = "session_cache.json"
+DEFAULT_TTL_MINUTES = 60
+# Cookies that identify the logged-in session; the rest rotate too often to key on
+SESSION_COOKIE_NAMES = ("sessionid", "ds_user_id")
+
+class SessionExpired(Exception):
+    """Raised when a lazily re-validated session turns out to be logged out."""
+
+# What this run did with the cache, for the run summary
+cache_state = {"status": "not checked", "age": None, "ttl": None, "key": None, "revalidations": 0}
+
+def cookie_jar_key(cookies):
+    """Returns a stable key for a list of cookie dicts, based on the session cookies only."""
+    values = sorted(f"{c.get('name')}={c.get('value')}" for c in cookies if c.get("name") in SESSION_COOKIE_NAMES)
+    if not values:
+        return None
+    return hashlib.sha256("\n".join(values).encode("utf-8")).hexdigest()
+
+def load_cache():
+    """Returns {key: validated_at} from the cache file (empty if missing or unreadable)."""
+    if not os.path.exists(SESSION_CACHE_FILE):
+        return {}
+    try:
+        with open(SESSION_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_cache(cache):
+    """Writes the cache atomically, so concurrent worker processes never see a partial file."""
+    temp_file = f"{SESSION_CACHE_FILE}.{os.getpid()}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(temp_file, SESSION_CACHE_FILE)
+
+def lookup_session(key, ttl_minutes=DEFAULT_TTL_MINUTES):
+    """Returns True if key was validated within ttl_minutes. Records the outcome in cache_state."""
+    cache_state.update(key=key, ttl=ttl_minutes)
+    if not key or ttl_minutes <= 0:
+        cache_state["status"] = "disabled" if ttl_minutes <= 0 else "no session cookie"
+        return False
+    validated_at = load_cache().get(key)
+    if validated_at is None:
+        cache_state["status"] = "miss"
+        return False
+    age = time.time() - validated_at
+    cache_state["age"] = age
+    if age > ttl_minutes * 60:
+        cache_state["status"] = "expired"
+        return False
+    cache_state["status"] = "hit"
+    return True
+
+def record_validation(key):
+    """Marks key as validated now."""
+    cache_state.update(status="validated", age=0)
+    if not key:
+        return
+    cache = load_cache()
+    cache[key] = time.time()
+    write_cache(cache)
+
+def invalidate(key):
+    """Drops key from the cache after the session was found to be logged out."""
+    cache_state["status"] = "invalidated"
+    cache = load_cache()
+    if cache.pop(key, None) is not None:
+        write_cache(cache)
+
+def mark_trusted(status, key):
+    """Records that the session was accepted without a login check (e.g. a warm attached browser)."""
+    cache_state.update(status=status, key=key)
+
+def revalidate_after_failure(driver, check_logged_in):
+    """Called when a profile page fails to render. If the session was trusted without a check,
+    runs check_logged_in(driver) once; raises SessionExpired if it reports logged out."""
+    if cache_state["status"] not in ("hit", "attached"):
+        return
+    print("Profile page failed with an unverified session; re-checking login...")
+    cache_state["revalidations"] += 1
+    if check_logged_in(driver):
+        record_validation(cache_state["key"])
+        return
+    invalidate(cache_state["key"])
+    raise SessionExpired("Instagram session is no longer logged in")
+
+def summarize_session_cache():
+    """Returns a one-line description of how the login check was handled this run."""
+    parts = [cache_state["status"]]
+    if cache_state["age"] is not None and cache_state["status"] in ("hit", "expired"):
+        parts.append(f"validated {cache_state['age'] / 60:.0f}m ago")
+    if cache_state["ttl"] is not None:
+        parts.append(f"ttl {cache_state['ttl']}m")
+    if cache_state["revalidations"]:
+        parts.append(f"{cache_state['revalidations']} lazy re-check(s)")
+    return ", ".join(parts)
@@ -0,0 +1,182 @@
+"""SQLite backend for profile_store, used when PROFILE_DATA_FILE ends in .db or .sqlite.
+
+Profiles, reels and recent posts live in their own tables, indexed by
+username (and profiles by scrape_time as well), so single lookups, freshness
+checks and partial reads never load the whole store. The database runs in
+WAL mode: update_database.py and update_completion.py can read while a
+scraper is writing, and saves are committed in batches of SAVE_BATCH_SIZE
+profiles rather than one transaction per row.
+"""
+import json
+import sqlite3
+
+# --- Configuration ---
+SAVE_BATCH_SIZE = 500
+BUSY_TIMEOUT = 30  # Seconds a writer waits for another writer's lock
+# Scalar profile fields stored as columns; anything else goes in the extra JSON column
+PROFILE_COLUMNS = [
+    "username", "full_name", "bio", "profile_pic_url", "external_url", "is_verified", "is_private",
+    "posts_count", "followers_count", "following_count", "reels_count", "scrape_time",
+]
+BOOLEAN_COLUMNS = ("is_verified", "is_private")
+REEL_COLUMNS = ["id", "url", "thumbnail", "views", "likes", "comments", "posted_date"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    username TEXT PRIMARY KEY,
+    full_name TEXT,
+    bio TEXT,
+    profile_pic_url TEXT,
+    external_url TEXT,
+    is_verified INTEGER,
+    is_private INTEGER,
+    posts_count INTEGER,
+    followers_count INTEGER,
+    following_count INTEGER,
+    reels_count INTEGER,
+    scrape_time TEXT,
+    has_reels INTEGER NOT NULL DEFAULT 0,
+    has_recent_posts INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS profiles_scrape_time ON profiles (scrape_time);
+CREATE TABLE IF NOT EXISTS reels (
+    username TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT,
+    url TEXT,
+    thumbnail TEXT,
+    views INTEGER,
+    likes INTEGER,
+    comments INTEGER,
+    posted_date TEXT,
+    PRIMARY KEY (username, position)
+);
+CREATE TABLE IF NOT EXISTS recent_posts (
+    username TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    url TEXT,
+    thumbnail TEXT,
+    PRIMARY KEY (username, position)
+);
+"""
+
+def connect(filename):
+    """Opens the database in WAL mode, creating the schema on first use."""
+    conn = sqlite3.connect(filename, timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # Durable across process crashes; WAL makes it safe
+    conn.executescript(SCHEMA)
+    return conn
+
+def profile_row(profile):
+    """Splits a profile dict into its profiles table row."""
+    extra = {key: value for key, value in profile.items()
+             if key not in PROFILE_COLUMNS and key not in ("reels", "recent_posts")}
+    row = [profile.get(column) for column in PROFILE_COLUMNS]
+    for column in BOOLEAN_COLUMNS:
+        position = PROFILE_COLUMNS.index(column)
+        if row[position] is not None:
+            row[position] = int(bool(row[position]))
+    return row + [int("reels" in profile), int("recent_posts" in profile), json.dumps(extra) if extra else None]
+
+def save_profiles(profiles, filename):
+    """Upserts profiles with their reels and recent posts, committing every SAVE_BATCH_SIZE profiles."""
+    columns = PROFILE_COLUMNS + ["has_reels", "has_recent_posts", "extra"]
+    upsert_sql = (f"INSERT OR REPLACE INTO profiles ({', '.join(columns)}) "
+                  f"VALUES ({', '.join('?' * len(columns))})")
+    reel_sql = (f"INSERT INTO reels (username, position, {', '.join(REEL_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(REEL_COLUMNS) + 2))})")
+    conn = connect(filename)
+    try:
+        for start in range(0, len(profiles), SAVE_BATCH_SIZE):
+            batch = profiles[start:start + SAVE_BATCH_SIZE]
+            with conn:  # One transaction per batch
+                usernames = [(profile["username"],) for profile in batch]
+                conn.executemany("DELETE FROM reels WHERE username = ?", usernames)
+                conn.executemany("DELETE FROM recent_posts WHERE username = ?", usernames)
+                conn.executemany(upsert_sql, [profile_row(profile) for profile in batch])
+                conn.executemany(reel_sql, [
+                    [profile["username"], position] + [reel.get(column) for column in REEL_COLUMNS]
+                    for profile in batch for position, reel in enumerate(profile.get("reels") or [])])
+                conn.executemany("INSERT INTO recent_posts VALUES (?, ?, ?, ?)", [
+                    (profile["username"], position, post.get("url"), post.get("thumbnail"))
+                    for profile in batch for position, post in enumerate(profile.get("recent_posts") or [])])
+        total = conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"Saved {len(profiles)} profiles to {filename} ({total} total)")
+
+def build_profile(row, reels, recent_posts):
+    """Reassembles a profile dict from its profiles row and child rows (NULL columns are left out)."""
+    profile = {column: value for column, value in zip(PROFILE_COLUMNS, row) if value is not None}
+    for column in BOOLEAN_COLUMNS:
+        if column in profile:
+            profile[column] = bool(profile[column])
+    has_reels, has_recent_posts, extra = row[len(PROFILE_COLUMNS):]
+    if extra:
+        profile.update(json.loads(extra))
+    if has_recent_posts:
+        profile["recent_posts"] = recent_posts
+    if has_reels:
+        profile["reels"] = reels
+    return profile
+
+def reel_dict(row):
+    return {column: value for column, value in zip(REEL_COLUMNS, row)}
+
+def get_profile(username, filename):
+    """Returns the stored profile for username, or None."""
+    conn = connect(filename)
+    try:
+        row = conn.execute(
+            f"SELECT {', '.join(PROFILE_COLUMNS)}, has_reels, has_recent_posts, extra FROM profiles WHERE username = ?",
+            (username,)).fetchone()
+        if row is None:
+            return None
+        reels = [reel_dict(r) for r in conn.execute(
+            f"SELECT {', '.join(REEL_COLUMNS)} FROM reels WHERE username = ? ORDER BY position", (username,))]
+        recent_posts = [{"url": url, "thumbnail": thumbnail} for url, thumbnail in conn.execute(
+            "SELECT url, thumbnail FROM recent_posts WHERE username = ? ORDER BY position", (username,))]
+        return build_profile(row, reels, recent_posts)
+    finally:
+        conn.close()
+
+def iter_profiles(filename):
+    """Yields every stored profile in username order. Child rows are read with cursors
+    walking the same order alongside the profiles, so memory use stays flat."""
+    conn = connect(filename)
+    try:
+        reel_rows = conn.execute(
+            f"SELECT username, {', '.join(REEL_COLUMNS)} FROM reels ORDER BY username, position")
+        post_rows = conn.cursor().execute(
+            "SELECT username, url, thumbnail FROM recent_posts ORDER BY username, position")
+        next_reel = reel_rows.fetchone()
+        next_post = post_rows.fetchone()
+        for row in conn.cursor().execute(
+                f"SELECT {', '.join(PROFILE_COLUMNS)}, has_reels, has_recent_posts, extra FROM profiles ORDER BY username"):
+            username = row[0]
+            # Skip child rows of usernames that sort before this one (none expected, but be safe)
+            while next_reel is not None and next_reel[0] < username:
+                next_reel = reel_rows.fetchone()
+            while next_post is not None and next_post[0] < username:
+                next_post = post_rows.fetchone()
+            reels = []
+            while next_reel is not None and next_reel[0] == username:
+                reels.append(reel_dict(next_reel[1:]))
+                next_reel = reel_rows.fetchone()
+            recent_posts = []
+            while next_post is not None and next_post[0] == username:
+                recent_posts.append({"url": next_post[1], "thumbnail": next_post[2]})
+                next_post = post_rows.fetchone()
+            yield build_profile(row, reels, recent_posts)
+    finally:
+        conn.close()
+
+def freshness_index(filename):
+    """Returns {username: scrape_time}, answered from the profiles table alone."""
+    conn = connect(filename)
+    try:
+        return dict(conn.execute("SELECT username, scrape_time FROM profiles"))
+    finally:
+        conn.close()
@@ -2,48 +2,11 @@ import json
 import os
 from datetime import datetime, timedelta
 
+from profile_store import stale_usernames
+
 def is_profile_data_outdated(username, filename, max_age_days=365):
-    """Check if profile data is older than specified number of days or doesn't exist.
-    Returns True if data should be reparsed, False otherwise."""
-    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
-        print(f"No existing data file found for {username}")
-        return True
-    
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            try:
-                data = json.load(f)
-                for profile in data:
-                    if profile.get('username') == username:
-                        scrape_time_str = profile.get('scrape_time')
-                        if not scrape_time_str:
-                            print(f"No scrape time found for {username}")
-                            return True
-                        
-                        try:
-                            scrape_time = datetime.strptime(scrape_time_str, "%Y-%m-%d %H:%M:%S")
-                            current_time = datetime.now()
-                            age = current_time - scrape_time
-                            
-                            if age > timedelta(days=max_age_days):
-                                print(f"Data for {username} is {age.days} days old (older than {max_age_days} days)")
-                                return True
-                            else:
-                                print(f"Data for {username} is {age.days} days old (within {max_age_days} days)")
-                                return False
-                        except ValueError as e:
-                            print(f"Error parsing date for {username}: {e}")
-                            return True
-                
-                # If we get here, the username wasn't found in the data
-                print(f"No data found for {username}")
-                return True
-            except json.JSONDecodeError:
-                print(f"Error parsing JSON file: {filename}")
-                return True
-    except Exception as e:
-        print(f"Error reading data file: {e}")
-        return True
+    """True if username's stored data is missing or older than max_age_days (see profile_store.stale_usernames)."""
+    return username in stale_usernames([username], max_age_days, filename)
 
 # Create test data with different ages
 TEST_FILE = "test_age_data.json"
@@ -89,17 +52,24 @@ for profile in test_data:
     username = profile["username"]
     result = is_profile_data_outdated(username, TEST_FILE)
     print(f"Should reparse {username}? {result}")
+    assert result == (username in ("just_over_year_profile", "very_old_profile"))
 
 print("\nTesting with custom max age (180 days):")
 for profile in test_data:
     username = profile["username"] 
     result = is_profile_data_outdated(username, TEST_FILE, max_age_days=180)
     print(f"Should reparse {username}? {result}")
+    assert result == (username != "recent_profile")
 
 # Test non-existent profile
 print("\nTesting non-existent profile:")
 result = is_profile_data_outdated("non_existent_profile", TEST_FILE)
 print(f"Should reparse non_existent_profile? {result}")
+assert result is True
+
+print("\nTesting the whole list in one pass:")
+assert stale_usernames([p["username"] for p in test_data] + ["non_existent_profile"], 365, TEST_FILE) == [
+    "just_over_year_profile", "very_old_profile", "non_existent_profile"]
 
 # Clean up test file
 os.remove(TEST_FILE)
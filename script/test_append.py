@@ -1,48 +1,11 @@
 import json
 import os
+import shutil
+import tempfile
 from datetime import datetime
 
-def save_profile_data_array(data_array, filename):
-    """Saves the profile data array to a JSON file.
-    If the file exists, it will append new data and update existing entries."""
-    existing_data = []
-    existing_usernames = set()
-    
-    try:
-        # Try to open and read existing data
-        if os.path.exists(filename) and os.path.getsize(filename) > 0:
-            with open(filename, 'r', encoding='utf-8') as f:
-                try:
-                    existing_data = json.load(f)
-                    # Create a set of existing usernames for faster lookup
-                    existing_usernames = {profile.get('username') for profile in existing_data}
-                    print(f"Loaded existing data with {len(existing_data)} profiles")
-                except json.JSONDecodeError:
-                    print(f"Error parsing existing JSON file: {filename}. Creating a new file.")
-                    existing_data = []
-        
-        # Update existing entries or append new ones
-        for new_profile in data_array:
-            username = new_profile.get('username')
-            if username in existing_usernames:
-                # Replace the existing profile with the new one
-                for i, profile in enumerate(existing_data):
-                    if profile.get('username') == username:
-                        existing_data[i] = new_profile
-                        print(f"Updated existing profile for {username}")
-                        break
-            else:
-                # Append the new profile
-                existing_data.append(new_profile)
-                existing_usernames.add(username)
-                print(f"Added new profile for {username}")
-        
-        # Save the updated data
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
-        print(f"Profile data array saved to {filename}")
-    except Exception as e:
-        print(f"Error saving profile data to {filename}: {e}")
+# A .json filename keeps the legacy array format, which merges by username on save
+from profile_store import save_profiles
 
 # Test data
 test_data = [
@@ -109,19 +72,22 @@ test_data = [
     }
 ]
 
-# Run the test
-TEST_FILE = "test_profile_data.json"
+# Run the test on a scratch copy of the fixture, so the tracked file is never modified
+FIXTURE_FILE = "test_profile_data.json"
+TEST_DIR = tempfile.mkdtemp(prefix="test_append_")
+TEST_FILE = os.path.join(TEST_DIR, FIXTURE_FILE)
+shutil.copy(FIXTURE_FILE, TEST_FILE)
 
-print("Before saving:")
-if os.path.exists(TEST_FILE):
+try:
+    print("Before saving:")
     with open(TEST_FILE, 'r') as f:
         print(json.dumps(json.load(f), indent=2))
-else:
-    print(f"File {TEST_FILE} does not exist yet")
 
-print("\nSaving data...")
-save_profile_data_array(test_data, TEST_FILE)
+    print("\nSaving data...")
+    save_profiles(test_data, TEST_FILE)
 
-print("\nAfter saving:")
-with open(TEST_FILE, 'r') as f:
-    print(json.dumps(json.load(f), indent=2)) 
\ No newline at end of file
+    print("\nAfter saving:")
+    with open(TEST_FILE, 'r') as f:
+        print(json.dumps(json.load(f), indent=2))
+finally:
+    shutil.rmtree(TEST_DIR) 
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Correctness and speed checks for count_parser.
+
+Runs under pytest with the pytest-benchmark plugin (requirements_test.txt):
+    python -m pytest test_count_parser.py --benchmark-only   # timings only
+    python -m pytest test_count_parser.py                    # correctness + timings
+"""
+import os
+
+import pytest
+
+from count_parser import parse_count, parse_counts
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "counts", "count_strings.tsv")
+CORPUS_REPEAT = 200  # Scales the recorded strings up to a corpus large enough to time
+
+def load_corpus():
+    """Returns [(text, expected)] from the recorded count strings."""
+    corpus = []
+    with open(CORPUS_FILE, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            text, _, expected = line.rstrip("\n").partition("\t")
+            corpus.append((text, int(expected) if expected else None))
+    return corpus
+
+CORPUS = load_corpus()
+LARGE_CORPUS = [text for text, _ in CORPUS] * CORPUS_REPEAT
+
+@pytest.mark.parametrize("text,expected", CORPUS)
+def test_parse_count(text, expected):
+    assert parse_count(text) == expected
+
+def test_parse_counts_matches_parse_count():
+    assert parse_counts(text for text, _ in CORPUS) == [expected for _, expected in CORPUS]
+
+def test_parse_count_ignores_letters_outside_the_suffix():
+    # The old parser multiplied by 1000 whenever a "k" appeared anywhere in the text
+    assert parse_count("1,234 posts · kerala") == 1234
+    assert parse_count("12 posts, makeup artist") == 12
+    assert parse_count(None) is None
+
+def test_benchmark_parse_count(benchmark):
+    results = benchmark(lambda: [parse_count(text) for text in LARGE_CORPUS])
+    assert len(results) == len(LARGE_CORPUS)
+
+def test_benchmark_parse_counts(benchmark):
+    results = benchmark(parse_counts, LARGE_CORPUS)
+    assert len(results) == len(LARGE_CORPUS)
@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from http_fetcher import create_session, fetch_profile_http, fetch_profiles_http
+
+# Serves recorded Instagram responses from fixtures/http so the HTTP fast path
+# can be exercised without touching instagram.com
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "http")
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Maps web_profile_info and profile page requests onto fixture files, 404 otherwise."""
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/api/v1/users/web_profile_info/":
+            username = parse_qs(url.query).get("username", [""])[0]
+            fixture = f"web_profile_info_{username}.json"
+            content_type = "application/json"
+        else:
+            fixture = f"profile_{url.path.strip('/')}.html"
+            content_type = "text/html; charset=utf-8"
+
+        path = os.path.join(FIXTURES_DIR, fixture)
+        if not os.path.exists(path):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test output readable
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/"
+print(f"Serving fixtures from {FIXTURES_DIR} at {BASE_URL}")
+
+session = create_session(cookies_file=None)
+
+print("\nTesting JSON endpoint:")
+profile = fetch_profile_http(session, "fixture_json_user", BASE_URL)
+print(json.dumps(profile, indent=2))
+assert profile["followers_count"] == 19634
+assert profile["following_count"] == 499
+assert profile["posts_count"] == 735
+assert profile["bio"] == "Recorded web_profile_info response"
+assert profile["profile_pic_url"] == "https://example.com/pic_hd.jpg"
+assert profile["is_verified"] is True
+
+print("\nTesting HTML fallback when the JSON endpoint fails:")
+profile = fetch_profile_http(session, "fixture_html_user", BASE_URL)
+print(json.dumps(profile, indent=2))
+assert profile["followers_count"] == 2800000
+assert profile["following_count"] == 1204
+assert profile["posts_count"] == 3117
+assert profile["full_name"] == "Fixture Html User"
+
+print("\nTesting batch fetch with an unknown profile:")
+profiles, failed = fetch_profiles_http(
+    ["fixture_json_user", "missing_user", "fixture_html_user"], session, BASE_URL)
+assert [p["username"] for p in profiles] == ["fixture_json_user", "fixture_html_user"]
+assert failed == ["missing_user"]
+
+server.shutdown()
+print("\nAll HTTP fast path checks passed")
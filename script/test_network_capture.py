@@ -0,0 +1,59 @@
+import json
+import os
+
+from network_capture import parse_profile_payload, parse_reels_payload, profile_from_payloads, reels_from_payloads
+
+# Recorded clips (REST) and GraphQL profile responses, with other accounts' media mixed in
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "network")
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r') as f:
+        return json.load(f)
+
+clips = load_fixture("clips_user_fixture_user.json")
+graphql = load_fixture("graphql_fixture_user.json")
+
+print("Testing clips payload:")
+reels = parse_reels_payload(clips, "fixture_user")
+print(json.dumps(reels, indent=2))
+# The photo, the suggested account's clip and the duplicate are left out
+assert [reel["id"] for reel in reels] == ["ReelOne", "ReelTwo"]
+assert reels[0]["views"] == 15200
+assert reels[0]["likes"] == 830
+assert reels[0]["comments"] == 41
+assert reels[0]["thumbnail"] == "https://example.com/reel_one.jpg"
+assert reels[0]["url"] == "https://www.instagram.com/fixture_user/reel/ReelOne/"
+assert reels[0]["posted_date"] is not None
+assert reels[1]["views"] == 920
+
+print("\nTesting GraphQL profile payload:")
+profile = parse_profile_payload(graphql, "fixture_user")
+print(json.dumps(profile, indent=2))
+assert profile["followers_count"] == 48210
+assert profile["following_count"] == 312
+assert profile["posts_count"] == 204
+assert profile["bio"] == "Recorded GraphQL profile response"
+assert profile["profile_pic_url"] == "https://example.com/pic_hd.jpg"
+assert profile["is_private"] is False
+assert parse_profile_payload(graphql, "missing_user") is None
+
+print("\nTesting GraphQL reels (related profiles' videos are skipped):")
+reels = parse_reels_payload(graphql, "fixture_user")
+assert [reel["id"] for reel in reels] == ["GraphReel"]
+assert reels[0]["views"] == 3100
+assert reels[0]["likes"] == 77
+assert reels[0]["comments"] == 6
+
+print("\nTesting merged payloads:")
+payloads = [("https://www.instagram.com/graphql/query", graphql),
+            ("https://www.instagram.com/api/v1/clips/user/", clips)]
+assert profile_from_payloads(payloads, "fixture_user")["followers_count"] == 48210
+assert [reel["id"] for reel in reels_from_payloads(payloads, "fixture_user")] == ["GraphReel", "ReelOne", "ReelTwo"]
+assert len(reels_from_payloads(payloads, "fixture_user", limit=2)) == 2
+assert reels_from_payloads(payloads, "someone_else") == [{
+    "id": "SuggestedClip",
+    "url": "https://www.instagram.com/someone_else/reel/SuggestedClip/",
+    "thumbnail": None, "views": 999999, "likes": 5000, "comments": None, "posted_date": None,
+}]
+
+print("\nAll network capture checks passed")
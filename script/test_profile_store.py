@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import tempfile
+
+import profile_store
+from profile_store import (
+    compact, get_profile, get_profiles, index_path, iter_legacy, iter_profiles, load_index, save_profiles
+)
+
+# Exercises the .jsonl log store in a scratch directory: legacy import, upserts,
+# recovery from a torn last line, compaction and the streaming legacy reader
+TEST_DIR = tempfile.mkdtemp(prefix="profile_store_test_")
+LOG_FILE = os.path.join(TEST_DIR, "profiles.jsonl")
+LEGACY_FILE = os.path.join(TEST_DIR, "profiles.json")
+
+def profile(username, followers, scrape_time="2025-01-01 12:00:00"):
+    return {"username": username, "followers_count": followers, "scrape_time": scrape_time,
+            "bio": f"Bio of {username}, with [brackets], \"quotes\" and commas",
+            "reels": [{"id": f"{username}_reel", "views": followers * 2}]}
+
+def log_records():
+    with open(LOG_FILE, 'rb') as f:
+        return f.read().count(b"\n")
+
+try:
+    print("Testing legacy JSON import on first use:")
+    legacy_profiles = [profile("alice", 10), profile("bob", 20)]
+    with open(LEGACY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(legacy_profiles, f)
+    assert [p["username"] for p in iter_profiles(LOG_FILE)] == ["alice", "bob"]
+    assert get_profile("bob", LOG_FILE) == legacy_profiles[1]
+    assert log_records() == 2
+
+    print("\nTesting upserts:")
+    save_profiles([profile("alice", 11), profile("carol", 30)], LOG_FILE)
+    assert get_profile("alice", LOG_FILE)["followers_count"] == 11
+    assert [(p["username"], p["followers_count"]) for p in iter_profiles(LOG_FILE)] == [
+        ("bob", 20), ("alice", 11), ("carol", 30)]
+    assert load_index(LOG_FILE)["records"] == 4
+    assert get_profile("nobody", LOG_FILE) is None
+    assert get_profiles(["carol", "nobody", "alice"], LOG_FILE) == {
+        "alice": get_profile("alice", LOG_FILE), "carol": get_profile("carol", LOG_FILE)}
+    assert get_profiles([], LOG_FILE) == {}
+
+    print("\nTesting recovery from a torn last line:")
+    with open(LOG_FILE, 'ab') as f:
+        f.write(b'{"username": "dave", "followers_co')  # Crash mid-append
+    index = load_index(LOG_FILE)  # Log size no longer matches, so the index is rebuilt
+    assert index["log_size"] == os.path.getsize(LOG_FILE)
+    assert "dave" not in index["entries"]
+    assert len(list(iter_profiles(LOG_FILE))) == 3
+    save_profiles([profile("dave", 40)], LOG_FILE)
+    assert get_profile("dave", LOG_FILE)["followers_count"] == 40
+    assert get_profile("carol", LOG_FILE)["followers_count"] == 30
+
+    print("\nTesting a rebuilt index after the index file is lost:")
+    os.remove(index_path(LOG_FILE))
+    assert get_profile("alice", LOG_FILE)["followers_count"] == 11
+    assert sorted(p["username"] for p in iter_profiles(LOG_FILE)) == ["alice", "bob", "carol", "dave"]
+
+    print("\nTesting compaction:")
+    for followers in range(100, 110):
+        save_profiles([profile("alice", followers)], LOG_FILE)
+    before = {p["username"]: p for p in iter_profiles(LOG_FILE)}
+    compact(LOG_FILE)
+    index = load_index(LOG_FILE)
+    assert index["records"] == len(index["entries"]) == 4
+    assert log_records() == 4  # Superseded records and the torn line are gone
+    assert {p["username"]: p for p in iter_profiles(LOG_FILE)} == before
+    assert get_profile("alice", LOG_FILE)["followers_count"] == 109
+
+    print("\nTesting reads while another process compacts the log:")
+    for followers in range(200, 205):
+        save_profiles([profile("bob", followers)], LOG_FILE)
+    original_load_index = profile_store.load_index
+    def load_index_then_compact(filename):
+        # Simulates a compaction in another process landing right after the reader loaded the index
+        index = original_load_index(filename)
+        profile_store.load_index = original_load_index
+        compact(filename)
+        return index
+    for read in (lambda: get_profile("carol", LOG_FILE)["followers_count"],
+                 lambda: get_profiles(["carol"], LOG_FILE)["carol"]["followers_count"]):
+        save_profiles([profile("bob", 205)], LOG_FILE)  # A superseded record, so compaction moves offsets
+        profile_store.load_index = load_index_then_compact
+        try:
+            assert read() == 30
+        finally:
+            profile_store.load_index = original_load_index
+    assert get_profile("bob", LOG_FILE)["followers_count"] == 205
+
+    print("\nTesting iter_legacy across read chunk boundaries:")
+    many = [profile(f"user{i}", i) for i in range(50)]
+    with open(LEGACY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(many, f, indent=2)
+    original_chunk = profile_store.JSON_READ_CHUNK
+    try:
+        # Chunk sizes that split values, strings and escapes at many different points
+        for chunk in (1, 2, 7, 64, 1000):
+            profile_store.JSON_READ_CHUNK = chunk
+            assert list(iter_legacy(LEGACY_FILE)) == many, f"chunk size {chunk}"
+    finally:
+        profile_store.JSON_READ_CHUNK = original_chunk
+
+    with open(LEGACY_FILE, 'w', encoding='utf-8') as f:
+        f.write("[]")
+    assert list(iter_legacy(LEGACY_FILE)) == []
+    with open(LEGACY_FILE, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(many[:3])[:-20])  # Truncated array
+    assert list(iter_legacy(LEGACY_FILE)) == many[:2]
+    assert get_profiles(["user1", "nobody"], LEGACY_FILE) == {"user1": many[1]}
+
+    print("\nAll profile store checks passed")
+finally:
+    shutil.rmtree(TEST_DIR)
@@ -1,43 +1,16 @@
 import os
 import sys
-import psycopg2
-import dotenv
-import json
+import argparse
 from datetime import datetime
 
-# Path to the profile data file
-PROFILE_DATA_FILE = "profile_data.json"
-# Path to the usernames.txt file
-USERNAMES_FILE = "usernames.txt"
+from db import load_env, connect_to_database, release_connection, close_pool
+from queue_lease import worker_id
 
-def load_env():
-    """Load environment variables from .env file."""
-    env_paths = ['.env', '../.env']
-    
-    for path in env_paths:
-        if os.path.exists(path):
-            dotenv.load_dotenv(path)
-            print(f"Loaded environment from {path}")
-            return True
-    
-    print("Error: No .env file found")
-    return False
+from profile_store import PROFILE_DATA_FILE, stale_usernames
 
-def connect_to_database():
-    """Connect to the PostgreSQL database using the DATABASE_URL from .env."""
-    try:
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            print("Error: DATABASE_URL not found in environment variables")
-            sys.exit(1)
-            
-        print("Connecting to database...")
-        conn = psycopg2.connect(database_url)
-        print("Connected to database successfully")
-        return conn
-    except Exception as e:
-        print(f"Error connecting to database: {e}")
-        sys.exit(1)
+# Path to the usernames.txt file
+USERNAMES_FILE = "usernames.txt"
+DEFAULT_MAX_AGE_DAYS = 365  # Same default as insta_scraper.py --max-age
 
 def get_processed_usernames():
     """Get the list of usernames that were in the usernames.txt file."""
@@ -55,27 +28,23 @@ def get_processed_usernames():
         print(f"Error reading usernames file: {e}")
         return []
 
-def get_successfully_scraped_usernames():
-    """Get the list of usernames that were successfully scraped (in profile_data.json)."""
+def get_successfully_scraped_usernames(usernames, max_age_days=DEFAULT_MAX_AGE_DAYS):
+    """Get the usernames that have fresh data in the profile store: scraped by this run, or
+    recent enough that the scraper skipped them. Profiles a run never got to (an expired
+    session, a crash) are left out, so their requests stay with the lease reclaimer."""
     try:
-        if not os.path.exists(PROFILE_DATA_FILE):
-            print(f"Error: {PROFILE_DATA_FILE} not found")
-            return []
-            
-        with open(PROFILE_DATA_FILE, 'r') as f:
-            data = json.load(f)
-            
-        # Extract usernames from the profile data
-        usernames = [profile["username"] for profile in data if "username" in profile]
-        
-        print(f"Found {len(usernames)} successfully scraped usernames")
-        return usernames
+        stale = set(stale_usernames(usernames, max_age_days, PROFILE_DATA_FILE))
+        scraped = [username for username in usernames if username not in stale]
+        print(f"Found {len(scraped)} successfully scraped usernames")
+        return scraped
     except Exception as e:
         print(f"Error reading profile data file: {e}")
         return []
 
 def update_requests_to_completed(conn, usernames):
-    """Update QueuedRequest status to 'completed' for the given usernames."""
+    """Update QueuedRequest status to 'completed' for the given usernames.
+    Only requests still leased to this worker are touched: one whose lease
+    expired may have been reclaimed and handed to another node."""
     if not usernames:
         print("No usernames to update")
         return True
@@ -87,16 +56,15 @@ def update_requests_to_completed(conn, usernames):
         placeholders = ','.join(['%s'] * len(usernames))
         query = f"""
         UPDATE "QueuedRequest" 
-        SET status = 'completed', "updatedAt" = %s 
+        SET status = 'completed', "updatedAt" = timezone('utc', now()),
+            "leaseExpiresAt" = NULL, "nextAttemptAt" = NULL
         WHERE username IN ({placeholders})
         AND status = 'processing'
+        AND "claimedBy" = %s
         """
         
-        # Current time for updatedAt
-        now = datetime.now()
-        
-        # Execute the query with parameters
-        cursor.execute(query, [now] + usernames)
+        # Execute the query with parameters (updatedAt comes from the database clock, in UTC like Prisma)
+        cursor.execute(query, usernames + [worker_id()])
         
         # Commit the changes
         conn.commit()
@@ -111,6 +79,11 @@ def update_requests_to_completed(conn, usernames):
         cursor.close()
 
 def main():
+    parser = argparse.ArgumentParser(description='Mark scraped queue requests completed')
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE_DAYS,
+                        help=f'Data newer than this many days counts as scraped (default: {DEFAULT_MAX_AGE_DAYS})')
+    args = parser.parse_args()
+
     print(f"=== Instagram Scraper Completion Update ===")
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -126,25 +99,23 @@ def main():
         sys.exit(0)
     
     # Get the list of successfully scraped usernames
-    successful_usernames = get_successfully_scraped_usernames()
+    successful_usernames = get_successfully_scraped_usernames(processed_usernames, args.max_age)
     
     # Connect to database
     conn = connect_to_database()
     
     try:
-        # Update all processed usernames to completed
-        # In a production system, you might want to only mark successfully scraped usernames as complete
-        # and mark the others as failed
-        if update_requests_to_completed(conn, processed_usernames):
-            print(f"Successfully updated request status for {len(processed_usernames)} usernames")
+        # Only scraped usernames are completed; the rest go back to the queue when their lease expires
+        if update_requests_to_completed(conn, successful_usernames):
+            print(f"Successfully updated request status for {len(successful_usernames)} usernames")
         else:
             print("Failed to update request status")
             sys.exit(1)
             
         print(f"Process completed successfully at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     finally:
-        conn.close()
-        print("Database connection closed")
+        release_connection(conn)
+        close_pool()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
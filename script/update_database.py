@@ -1,57 +1,61 @@
 import os
 import sys
-import psycopg2
-import json
-import dotenv
+import argparse
+import csv
+import io
+import time
+import uuid
+import weakref
 from datetime import datetime
+from itertools import islice
+from psycopg2.extras import execute_values
 
-# Path to the profile data file
-PROFILE_DATA_FILE = "profile_data.json"
+from db import load_env, connect_to_database, release_connection, close_pool
+from profile_store import PROFILE_DATA_FILE, iter_profiles
 
-def load_env():
-    """Load environment variables from .env file."""
-    env_paths = ['.env', '../.env']
-    
-    for path in env_paths:
-        if os.path.exists(path):
-            dotenv.load_dotenv(path)
-            print(f"Loaded environment from {path}")
-            return True
-    
-    print("Error: No .env file found")
-    return False
-
-def connect_to_database():
-    """Connect to the PostgreSQL database using the DATABASE_URL from .env."""
-    try:
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            print("Error: DATABASE_URL not found in environment variables")
-            sys.exit(1)
-            
-        print("Connecting to database...")
-        conn = psycopg2.connect(database_url)
-        print("Connected to database successfully")
-        return conn
-    except Exception as e:
-        print(f"Error connecting to database: {e}")
-        sys.exit(1)
+# --- Configuration ---
+# Row-by-row path: lowercased column name -> (profile_data key, default); "scrape_time" and "now" are computed
+PROFILE_COLUMN_SOURCES = {
+    "fullname": ("full_name", None),
+    "bio": ("bio", ""),
+    "profilepicurl": ("profile_pic_url", None),
+    "followercount": ("followers_count", None),
+    "followerscount": ("followers_count", None),
+    "followingcount": ("following_count", None),
+    "postscount": ("posts_count", None),
+    "isverified": ("is_verified", False),
+    "isprivate": ("is_private", False),
+    "externalurl": ("external_url", None),
+    "reelscount": ("reels_count", None),
+    "lastscraped": ("scrape_time", None),
+    "scrapetime": ("scrape_time", None),
+    "updatedat": ("now", None),
+}
+REEL_COLUMN_SOURCES = {
+    "url": ("url", None),
+    "thumbnail": ("thumbnail", None),
+    "views": ("views", None),
+    "likes": ("likes", None),
+    "comments": ("comments", None),
+    "posteddate": ("posted_date", None),
+    "updatedat": ("now", None),
+}
+DEFAULT_BATCH_SIZE = 500  # Profiles per bulk upsert statement
+DEFAULT_COMMIT_EVERY = 50  # Profiles per transaction in the row-by-row sync
+DEFAULT_FLUSH_SECONDS = 5.0  # Commit a partial transaction after this long, so rows show up promptly
+# Per-connection schema cache (see get_schema); entries go away with their connection
+schema_cache = weakref.WeakKeyDictionary()
 
 def load_profile_data():
-    """Load profile data from the JSON file."""
+    """Yield profiles from the profile store one at a time, so database writes start
+    before the whole file is parsed and memory use does not grow with the store."""
+    if not os.path.exists(PROFILE_DATA_FILE):
+        print(f"Error: {PROFILE_DATA_FILE} not found")
+        return
     try:
-        if not os.path.exists(PROFILE_DATA_FILE):
-            print(f"Error: {PROFILE_DATA_FILE} not found")
-            return []
-            
-        with open(PROFILE_DATA_FILE, 'r') as f:
-            data = json.load(f)
-            
-        print(f"Loaded {len(data)} profiles from {PROFILE_DATA_FILE}")
-        return data
+        yield from iter_profiles(PROFILE_DATA_FILE)
     except Exception as e:
         print(f"Error loading profile data: {e}")
-        return []
 
 def format_datetime(datetime_str):
     """Format datetime string to PostgreSQL compatible format."""
@@ -65,11 +69,11 @@ def get_table_columns(conn, table_name):
     """Get a list of column names for a given table."""
     try:
         cursor = conn.cursor()
-        cursor.execute(f"""
+        cursor.execute("""
             SELECT column_name 
             FROM information_schema.columns 
-            WHERE table_name = '{table_name}'
-        """)
+            WHERE table_name = %s
+        """, (table_name,))
         columns = [row[0] for row in cursor.fetchall()]
         cursor.close()
         return columns
@@ -77,144 +81,174 @@ def get_table_columns(conn, table_name):
         print(f"Error getting columns for table {table_name}: {e}")
         return []
 
-def get_or_create_instagram_profile(conn, profile_data):
-    """Get or create an InstagramProfile record in the database."""
-    try:
-        # Get table columns to check which fields exist
-        columns = get_table_columns(conn, 'InstagramProfile')
-        print(f"Available columns in InstagramProfile: {columns}")
-        
+def map_columns(columns, sources, excluded):
+    """Returns [(column, source)] for the table columns that sources (keyed by lowercased
+    column name) knows how to fill, using the exact column names from the database."""
+    return [(column, sources[column.lower()]) for column in columns
+            if column.lower() in sources and column not in excluded]
+
+def build_schema(conn, prepare=False):
+    """Reads the catalog once and precomputes the column mappings and SQL text the
+    row-by-row sync needs. With prepare, the statements are also PREPAREd on the server."""
+    profile_columns = get_table_columns(conn, 'InstagramProfile')
+    reel_columns = get_table_columns(conn, 'Reel')
+    print(f"Available columns in InstagramProfile: {profile_columns}")
+    print(f"Available columns in Reel: {reel_columns}")
+
+    profile_map = map_columns(profile_columns, PROFILE_COLUMN_SOURCES, ("id", "username", "createdAt"))
+    reel_map = map_columns(reel_columns, REEL_COLUMN_SOURCES, ("id", "reelId", "instagramProfileId", "createdAt"))
+    profile_insert = [column for column, _ in profile_map] + ["id", "username"]
+    if "createdAt" in profile_columns:
+        profile_insert.append("createdAt")
+    reel_insert = [column for column, _ in reel_map] + ["id", "reelId", "instagramProfileId"]
+    if "createdAt" in reel_columns:
+        reel_insert.append("createdAt")
+
+    def set_list(mapping):
+        return ", ".join(f'"{column}" = %s' for column, _ in mapping)
+
+    def insert(table, insert_columns, returning=""):
+        column_list = ", ".join(f'"{column}"' for column in insert_columns)
+        return f'INSERT INTO "{table}" ({column_list}) VALUES ({", ".join(["%s"] * len(insert_columns))}){returning}'
+
+    statements = {
+        "profile_select": 'SELECT id FROM "InstagramProfile" WHERE username = %s',
+        "profile_insert": insert("InstagramProfile", profile_insert, " RETURNING id"),
+        "reel_select": 'SELECT "reelId" FROM "Reel" WHERE "instagramProfileId" = %s',
+        "reel_insert": insert("Reel", reel_insert),
+        "user_request_update": '''UPDATE "UserRequest" SET "instagramProfileId" = %s
+            WHERE username = %s AND "instagramProfileId" IS NULL''',
+        "scrape_request_update": """UPDATE "ScrapeRequest" SET "instagramProfileId" = %s, status = 'completed', "updatedAt" = %s
+            WHERE username = %s AND status = 'processing'""",
+    }
+    if profile_map:
+        statements["profile_update"] = f'UPDATE "InstagramProfile" SET {set_list(profile_map)} WHERE id = %s'
+    if reel_map:
+        statements["reel_update"] = f'UPDATE "Reel" SET {set_list(reel_map)} WHERE "reelId" = %s AND "instagramProfileId" = %s'
+
+    schema = {
+        "profile_columns": profile_columns,
+        "reel_columns": reel_columns,
+        "profile_map": profile_map,
+        "reel_map": reel_map,
+        "has_user_requests": table_exists(conn, 'UserRequest'),
+        "has_scrape_requests": table_exists(conn, 'ScrapeRequest'),
+        "statements": statements,
+        "prepared": False,
+    }
+    if not schema["has_user_requests"]:
+        del statements["user_request_update"]
+    if not schema["has_scrape_requests"]:
+        del statements["scrape_request_update"]
+
+    if prepare:
         cursor = conn.cursor()
+        try:
+            for name, sql in statements.items():
+                # PREPARE takes $n placeholders instead of %s
+                parts = sql.split("%s")
+                numbered = "".join(part + (f"${i + 1}" if i < len(parts) - 1 else "") for i, part in enumerate(parts))
+                cursor.execute(f"PREPARE {name} AS {numbered}")
+            conn.commit()
+            schema["prepared"] = True
+            print(f"Prepared {len(statements)} statements on the server")
+        except Exception as e:
+            print(f"Could not prepare statements, sending SQL text instead: {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+    return schema
+
+def get_schema(conn, prepare=False):
+    """Returns the schema cache for conn, building it on first use."""
+    schema = schema_cache.get(conn)
+    if schema is None:
+        schema = schema_cache[conn] = build_schema(conn, prepare)
+    return schema
+
+def run_statement(cursor, schema, name, params):
+    """Executes one of the schema's precomputed statements, via EXECUTE if it was prepared."""
+    if schema["prepared"]:
+        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cursor.execute(schema["statements"][name], params)
+
+def column_values(mapping, record, scrape_time, now):
+    """Returns the values for a precomputed column mapping, in mapping order."""
+    values = []
+    for _, (key, default) in mapping:
+        if key == "scrape_time":
+            values.append(scrape_time)
+        elif key == "now":
+            values.append(now)
+        else:
+            # None also gets the default: a NULL in a NOT NULL column would fail the statement
+            value = record.get(key)
+            values.append(default if value is None else value)
+    return values
+
+def get_or_create_instagram_profile(conn, profile_data, commit=True):
+    """Get or create an InstagramProfile record in the database.
+    With commit=False the caller owns the transaction and errors are raised instead of rolled back."""
+    cursor = conn.cursor()
+    try:
+        schema = get_schema(conn)
         
         # Check if profile exists
-        query = 'SELECT id FROM "InstagramProfile" WHERE username = %s'
-        cursor.execute(query, (profile_data["username"],))
+        run_statement(cursor, schema, "profile_select", (profile_data["username"],))
         result = cursor.fetchone()
         
         scrape_time = format_datetime(profile_data.get("scrape_time", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        
-        # Build column names and values dynamically based on what's available in the database
-        # Use the exact column names as they appear in the database
-        column_map = {}
-        
-        # Use the exact column names from the database
-        for column in columns:
-            col_lower = column.lower()
-            
-            if col_lower == 'fullname':
-                column_map[column] = profile_data.get("full_name")
-            elif col_lower == 'bio':
-                column_map[column] = profile_data.get("bio", "")
-            elif col_lower == 'profilepicurl':
-                column_map[column] = profile_data.get("profile_pic_url")
-            elif col_lower == 'followercount' or col_lower == 'followerscount':
-                column_map[column] = profile_data.get("followers_count")
-            elif col_lower == 'followingcount':
-                column_map[column] = profile_data.get("following_count")
-            elif col_lower == 'postscount':
-                column_map[column] = profile_data.get("posts_count")
-            elif col_lower == 'isverified':
-                column_map[column] = profile_data.get("is_verified", False)
-            elif col_lower == 'isprivate':
-                column_map[column] = profile_data.get("is_private", False)
-            elif col_lower == 'externalurl':
-                column_map[column] = profile_data.get("external_url")
-            elif col_lower == 'reelscount':
-                column_map[column] = profile_data.get("reels_count")
-            elif col_lower == 'lastscraped':
-                column_map[column] = scrape_time
-            elif col_lower == 'scrapetime':
-                column_map[column] = scrape_time
-            elif col_lower == 'updatedat':
-                column_map[column] = datetime.now().isoformat()
-        
-        # Exclude id, username, and createdAt from the map as they're handled separately
-        if 'id' in column_map:
-            del column_map['id']
-        if 'username' in column_map:
-            del column_map['username']
-        if 'createdAt' in column_map:
-            del column_map['createdAt']
+        values = column_values(schema["profile_map"], profile_data, scrape_time, datetime.now().isoformat())
         
         if result:
             # Update existing profile
             profile_id = result[0]
             
-            if not column_map:
+            if not values:
                 print(f"No valid columns to update for {profile_data['username']}")
                 return profile_id
             
-            # Build update query with exact column names
-            set_clauses = [f'"{col}" = %s' for col in column_map.keys()]
-            update_query = f'''
-            UPDATE "InstagramProfile" SET 
-                {", ".join(set_clauses)}
-            WHERE id = %s
-            '''
-            
-            # Build parameters list
-            params = list(column_map.values()) + [profile_id]
-            
-            cursor.execute(update_query, params)
+            run_statement(cursor, schema, "profile_update", values + [profile_id])
             
             print(f"Updated InstagramProfile for {profile_data['username']} (ID: {profile_id})")
         else:
             # Create new profile
-            # Generate a unique ID (CUID-like format for compatibility)
-            import uuid
-            profile_id = f"clg{uuid.uuid4().hex[:21]}"
-            now = datetime.now().isoformat()
-            
-            # Add id, username, and createdAt to the insert
-            insert_columns = list(column_map.keys()) + ["id", "username"]
-            
-            # Add createdAt if it exists
-            if "createdAt" in columns:
-                insert_columns.append("createdAt")
-                values = list(column_map.values()) + [profile_id, profile_data["username"], now]
-            else:
-                values = list(column_map.values()) + [profile_id, profile_data["username"]]
+            profile_id = generate_id()
+            params = values + [profile_id, profile_data["username"]]
+            if "createdAt" in schema["profile_columns"]:
+                params.append(datetime.now().isoformat())
             
-            placeholders = ", ".join(["%s"] * len(insert_columns))
-            
-            insert_query = f'''
-            INSERT INTO "InstagramProfile" (
-                "{('", "').join(insert_columns)}"
-            ) 
-            VALUES ({placeholders})
-            RETURNING id
-            '''
-            
-            cursor.execute(insert_query, values)
+            run_statement(cursor, schema, "profile_insert", params)
             result = cursor.fetchone()
             profile_id = result[0] if result else profile_id
             
             print(f"Created new InstagramProfile for {profile_data['username']} (ID: {profile_id})")
         
-        conn.commit()
+        if commit:
+            conn.commit()
         return profile_id
     except Exception as e:
         print(f"Error processing profile {profile_data.get('username')}: {e}")
-        print(f"Query attempted: {cursor.query.decode() if hasattr(cursor, 'query') else 'Unknown'}")
+        print(f"Query attempted: {cursor.query.decode() if cursor.query else 'Unknown'}")
+        if not commit:
+            raise
         conn.rollback()
         return None
     finally:
         cursor.close()
 
-def update_reel_data(conn, profile_id, reels_data):
-    """Update or create Reel records for a profile."""
+def update_reel_data(conn, profile_id, reels_data, commit=True):
+    """Update or create Reel records for a profile (see get_or_create_instagram_profile for commit)."""
     if not reels_data or not profile_id:
         return
         
+    cursor = conn.cursor()
     try:
-        cursor = conn.cursor()
-        
-        # Get columns for Reel table
-        columns = get_table_columns(conn, 'Reel')
-        print(f"Available columns in Reel: {columns}")
+        schema = get_schema(conn)
         
         # Get existing reels for this profile
-        cursor.execute('SELECT "reelId" FROM "Reel" WHERE "instagramProfileId" = %s', (profile_id,))
+        run_statement(cursor, schema, "reel_select", (profile_id,))
         existing_reel_ids = {row[0] for row in cursor.fetchall()}
         
         reels_updated = 0
@@ -226,127 +260,54 @@ def update_reel_data(conn, profile_id, reels_data):
                 continue
                 
             now = datetime.now().isoformat()
-            
-            # Map reel data to column names (using exact case from database)
-            column_map = {}
-            
-            for column in columns:
-                col_lower = column.lower()
-                
-                if col_lower == 'url':
-                    column_map[column] = reel.get("url")
-                elif col_lower == 'thumbnail':
-                    column_map[column] = reel.get("thumbnail")
-                elif col_lower == 'views':
-                    column_map[column] = reel.get("views")
-                elif col_lower == 'likes':
-                    column_map[column] = reel.get("likes")
-                elif col_lower == 'comments':
-                    column_map[column] = reel.get("comments")
-                elif col_lower == 'posteddate':
-                    column_map[column] = reel.get("posted_date")
-                elif col_lower == 'updatedat':
-                    column_map[column] = now
-            
-            # Remove fields that should be handled separately
-            if 'id' in column_map:
-                del column_map['id']
-            if 'reelId' in column_map:
-                del column_map['reelId']
-            if 'instagramProfileId' in column_map:
-                del column_map['instagramProfileId']
-            if 'createdAt' in column_map:
-                del column_map['createdAt']
+            values = column_values(schema["reel_map"], reel, None, now)
             
             if reel_id in existing_reel_ids:
                 # Update existing reel
-                if not column_map:
+                if not values:
                     print(f"No valid columns to update for reel {reel_id}")
                     continue
                 
-                set_clauses = [f'"{col}" = %s' for col in column_map.keys()]
-                update_query = f'''
-                UPDATE "Reel" SET 
-                    {", ".join(set_clauses)}
-                WHERE "reelId" = %s AND "instagramProfileId" = %s
-                '''
-                
-                # Build parameters list
-                params = list(column_map.values()) + [reel_id, profile_id]
-                
-                cursor.execute(update_query, params)
-                
+                run_statement(cursor, schema, "reel_update", values + [reel_id, profile_id])
                 reels_updated += 1
             else:
                 # Create new reel
-                # Generate a unique ID
-                import uuid
-                new_id = f"clg{uuid.uuid4().hex[:21]}"
-                
-                # Add required fields
-                insert_columns = list(column_map.keys()) + ["id", "reelId", "instagramProfileId"]
-                
-                # Add createdAt if it exists
-                if "createdAt" in columns:
-                    insert_columns.append("createdAt")
-                    values = list(column_map.values()) + [new_id, reel_id, profile_id, now]
-                else:
-                    values = list(column_map.values()) + [new_id, reel_id, profile_id]
-                
-                placeholders = ", ".join(["%s"] * len(insert_columns))
-                
-                insert_query = f'''
-                INSERT INTO "Reel" (
-                    "{('", "').join(insert_columns)}"
-                ) 
-                VALUES ({placeholders})
-                '''
-                
-                cursor.execute(insert_query, values)
+                params = values + [generate_id(), reel_id, profile_id]
+                if "createdAt" in schema["reel_columns"]:
+                    params.append(now)
                 
+                run_statement(cursor, schema, "reel_insert", params)
                 reels_created += 1
         
-        conn.commit()
+        if commit:
+            conn.commit()
         print(f"Updated {reels_updated} reels and created {reels_created} new reels for profile {profile_id}")
     except Exception as e:
         print(f"Error updating reels for profile {profile_id}: {e}")
-        print(f"Query attempted: {cursor.query.decode() if hasattr(cursor, 'query') else 'Unknown'}")
+        print(f"Query attempted: {cursor.query.decode() if cursor.query else 'Unknown'}")
+        if not commit:
+            raise
         conn.rollback()
     finally:
         cursor.close()
 
-def update_user_requests(conn, username, profile_id):
+def update_user_requests(conn, username, profile_id, commit=True):
     """Update UserRequest records with the InstagramProfile ID."""
     if not username or not profile_id:
         return
         
-    try:
-        cursor = conn.cursor()
-        
-        # Check if UserRequest table exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'UserRequest'
-            );
-        """)
-        table_exists = cursor.fetchone()[0]
-        
-        if not table_exists:
-            print(f"UserRequest table does not exist, skipping update")
-            return 0
+    schema = get_schema(conn)
+    if not schema["has_user_requests"]:
+        return 0
         
+    cursor = conn.cursor()
+    try:
         # Update UserRequest records
-        update_query = '''
-        UPDATE "UserRequest" 
-        SET "instagramProfileId" = %s
-        WHERE username = %s AND "instagramProfileId" IS NULL
-        '''
-        
-        cursor.execute(update_query, (profile_id, username))
+        run_statement(cursor, schema, "user_request_update", (profile_id, username))
         updated_rows = cursor.rowcount
         
-        conn.commit()
+        if commit:
+            conn.commit()
         
         if updated_rows > 0:
             print(f"Updated {updated_rows} UserRequest records for {username}")
@@ -354,43 +315,30 @@ def update_user_requests(conn, username, profile_id):
         return updated_rows
     except Exception as e:
         print(f"Error updating UserRequest records for {username}: {e}")
+        if not commit:
+            raise
         conn.rollback()
         return 0
     finally:
         cursor.close()
 
-def update_scrape_requests(conn, username, profile_id):
+def update_scrape_requests(conn, username, profile_id, commit=True):
     """Update ScrapeRequest records with the InstagramProfile ID and mark as completed."""
     if not username or not profile_id:
         return
         
-    try:
-        cursor = conn.cursor()
-        
-        # Check if ScrapeRequest table exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'ScrapeRequest'
-            );
-        """)
-        table_exists = cursor.fetchone()[0]
-        
-        if not table_exists:
-            print(f"ScrapeRequest table does not exist, skipping update")
-            return 0
+    schema = get_schema(conn)
+    if not schema["has_scrape_requests"]:
+        return 0
         
+    cursor = conn.cursor()
+    try:
         # Update ScrapeRequest records
-        update_query = '''
-        UPDATE "ScrapeRequest" 
-        SET "instagramProfileId" = %s, status = 'completed', "updatedAt" = %s
-        WHERE username = %s AND status = 'processing'
-        '''
-        
-        cursor.execute(update_query, (profile_id, datetime.now().isoformat(), username))
+        run_statement(cursor, schema, "scrape_request_update", (profile_id, datetime.now().isoformat(), username))
         updated_rows = cursor.rowcount
         
-        conn.commit()
+        if commit:
+            conn.commit()
         
         if updated_rows > 0:
             print(f"Updated {updated_rows} ScrapeRequest records for {username}")
@@ -398,12 +346,290 @@ def update_scrape_requests(conn, username, profile_id):
         return updated_rows
     except Exception as e:
         print(f"Error updating ScrapeRequest records for {username}: {e}")
+        if not commit:
+            raise
         conn.rollback()
         return 0
     finally:
         cursor.close()
 
+def generate_id():
+    """Generate a unique ID (CUID-like format for compatibility)."""
+    return f"clg{uuid.uuid4().hex[:21]}"
+
+def bulk_upsert_instagram_profiles(conn, profiles, schema, raise_errors=False):
+    """Upsert a batch of InstagramProfile rows in one INSERT ... ON CONFLICT (username) statement,
+    using the cached column mapping. Returns {username: profile id}; on error it rolls back and
+    returns {}, or re-raises with raise_errors=True."""
+    # A statement may not touch the same row twice, so keep the last record per username
+    latest = {profile["username"]: profile for profile in profiles if profile.get("username")}
+    if not latest:
+        return {}
+
+    now = datetime.now().isoformat()
+    has_created_at = "createdAt" in schema["profile_columns"]
+    update_columns = [column for column, _ in schema["profile_map"]]
+    insert_columns = ["id", "username"] + update_columns + (["createdAt"] if has_created_at else [])
+
+    rows = []
+    for username, profile_data in latest.items():
+        scrape_time = format_datetime(profile_data.get("scrape_time", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        row = [generate_id(), username] + column_values(schema["profile_map"], profile_data, scrape_time, now)
+        if has_created_at:
+            row.append(now)
+        rows.append(row)
+
+    set_clauses = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in update_columns)
+    query = f'''
+    INSERT INTO "InstagramProfile" ("{'", "'.join(insert_columns)}")
+    VALUES %s
+    ON CONFLICT (username) DO UPDATE SET {set_clauses}
+    RETURNING username, id
+    '''
+    cursor = conn.cursor()
+    try:
+        result = execute_values(cursor, query, rows, page_size=len(rows), fetch=True)
+        conn.commit()
+        return dict(result)
+    except Exception as e:
+        print(f"Error bulk upserting {len(rows)} profiles: {e}")
+        conn.rollback()
+        if raise_errors:
+            raise
+        return {}
+    finally:
+        cursor.close()
+
+def format_reel_date(value):
+    """Returns a posted_date as an ISO timestamp, or None if missing or not in scrape_time format.
+    A single unparseable value would otherwise fail the COPY for the whole batch."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").isoformat()
+    except (TypeError, ValueError):
+        return None
+
+def copy_reels_to_staging(cursor, reel_batch):
+    """Streams (profile_id, reel) pairs into the session's reel_staging table with COPY.
+    The table is emptied automatically when the transaction commits."""
+    cursor.execute('''
+    CREATE TEMP TABLE IF NOT EXISTS reel_staging (
+        seq integer, id text, reel_id text, profile_id text, url text, thumbnail text,
+        views bigint, likes bigint, comments bigint, posted_date timestamp
+    ) ON COMMIT DELETE ROWS
+    ''')
+    buffer = io.StringIO()
+    # csv writes None as an empty field, which COPY reads as NULL (so do empty strings)
+    writer = csv.writer(buffer)
+    for seq, (profile_id, reel) in enumerate(reel_batch):
+        writer.writerow([
+            seq, generate_id(), reel["id"], profile_id, reel.get("url"), reel.get("thumbnail"),
+            reel.get("views"), reel.get("likes"), reel.get("comments"), format_reel_date(reel.get("posted_date")),
+        ])
+    buffer.seek(0)
+    cursor.copy_expert(
+        "COPY reel_staging (seq, id, reel_id, profile_id, url, thumbnail, views, likes, comments, posted_date) "
+        "FROM STDIN WITH (FORMAT csv)", buffer)
+
+def bulk_merge_reels(conn, reel_batch, columns, raise_errors=False):
+    """Merges the reels of a whole batch of profiles into "Reel": COPY into a staging table, then one
+    INSERT ... ON CONFLICT ("reelId") DO UPDATE. reel_batch is a list of (profile_id, reel) pairs and
+    columns the Reel table's column list. Returns (inserted, updated); (0, 0) after a rolled back
+    error, unless raise_errors=True re-raises it."""
+    reel_batch = [(profile_id, reel) for profile_id, reel in reel_batch if reel.get("id")]
+    if not reel_batch:
+        return 0, 0
+
+    # Reel column -> staging expression; columns missing from this database are left out
+    column_sources = {
+        "url": "url", "thumbnail": "thumbnail", "views": "views", "likes": "likes",
+        "comments": "comments", "postedDate": "posted_date", "updatedAt": "now()",
+    }
+    data_columns = [column for column in column_sources if column in columns]
+    insert_columns = ["id", "reelId", "instagramProfileId"] + data_columns
+    select_list = ["id", "reel_id", "profile_id"] + [column_sources[column] for column in data_columns]
+    if "createdAt" in columns:
+        insert_columns.append("createdAt")
+        select_list.append("now()")
+    set_clauses = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in ["instagramProfileId"] + data_columns)
+
+    cursor = conn.cursor()
+    try:
+        copy_reels_to_staging(cursor, reel_batch)
+        # DISTINCT ON keeps the last copy of a reel listed twice, which ON CONFLICT could not update twice
+        cursor.execute(f'''
+        INSERT INTO "Reel" ("{'", "'.join(insert_columns)}")
+        SELECT DISTINCT ON (reel_id) {", ".join(select_list)}
+        FROM reel_staging
+        ORDER BY reel_id, seq DESC
+        ON CONFLICT ("reelId") DO UPDATE SET {set_clauses}
+        RETURNING (xmax = 0) AS inserted
+        ''')
+        flags = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        inserted = sum(flags)
+        return inserted, len(flags) - inserted
+    except Exception as e:
+        print(f"Error merging {len(reel_batch)} reels: {e}")
+        conn.rollback()
+        if raise_errors:
+            raise
+        return 0, 0
+    finally:
+        cursor.close()
+
+def table_exists(conn, table_name):
+    """Check whether a table exists in the database."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (f'"{table_name}"',))
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+def bulk_update_requests(conn, profile_ids, has_user_requests, has_scrape_requests, raise_errors=False):
+    """Link UserRequest rows and complete ScrapeRequest rows for a whole batch in two statements.
+    Returns (user_requests_updated, scrape_requests_updated); (0, 0) after a rolled back error,
+    unless raise_errors=True re-raises it."""
+    if not profile_ids:
+        return 0, 0
+    pairs = list(profile_ids.items())
+    cursor = conn.cursor()
+    try:
+        user_requests = scrape_requests = 0
+        if has_user_requests:
+            execute_values(cursor, '''
+            UPDATE "UserRequest" AS r SET "instagramProfileId" = v.profile_id
+            FROM (VALUES %s) AS v(username, profile_id)
+            WHERE r.username = v.username AND r."instagramProfileId" IS NULL
+            ''', pairs, page_size=len(pairs))
+            user_requests = cursor.rowcount
+        if has_scrape_requests:
+            execute_values(cursor, '''
+            UPDATE "ScrapeRequest" AS r SET "instagramProfileId" = v.profile_id, status = 'completed', "updatedAt" = now()
+            FROM (VALUES %s) AS v(username, profile_id)
+            WHERE r.username = v.username AND r.status = 'processing'
+            ''', pairs, page_size=len(pairs))
+            scrape_requests = cursor.rowcount
+        conn.commit()
+        return user_requests, scrape_requests
+    except Exception as e:
+        print(f"Error updating request records for {len(pairs)} profiles: {e}")
+        conn.rollback()
+        if raise_errors:
+            raise
+        return 0, 0
+    finally:
+        cursor.close()
+
+def sync_profile(conn, profile_data, commit):
+    """Writes one profile, its reels and its request links. Returns (synced, reels, user_requests,
+    scrape_requests); with commit=False a failure raises and the caller rolls back."""
+    username = profile_data.get("username")
+    if not username:
+        return 0, 0, 0, 0
+        
+    # Create or update InstagramProfile
+    profile_id = get_or_create_instagram_profile(conn, profile_data, commit)
+    if not profile_id:
+        return 0, 0, 0, 0
+        
+    # Update Reel data
+    reels = profile_data.get("reels", [])
+    update_reel_data(conn, profile_id, reels, commit)
+    
+    # Update UserRequest and ScrapeRequest records
+    user_requests = update_user_requests(conn, username, profile_id, commit) or 0
+    scrape_requests = update_scrape_requests(conn, username, profile_id, commit) or 0
+    return 1, len(reels), user_requests, scrape_requests
+
+def sync_profiles(conn, profiles, commit_every=DEFAULT_COMMIT_EVERY, flush_seconds=DEFAULT_FLUSH_SECONDS):
+    """Row-by-row sync. Profiles are grouped into transactions of commit_every profiles, or fewer if
+    flush_seconds pass first, each profile inside its own savepoint so a bad record is rolled back
+    alone. commit_every=0 restores the old behaviour of committing after every statement.
+    Returns (loaded, profiles, reels, user_requests, scrape_requests) totals."""
+    totals = [0, 0, 0, 0, 0]
+    pending = 0
+    commits = 0
+    last_flush = time.time()
+    started = time.time()
+    cursor = conn.cursor()
+    try:
+        # Process each profile as soon as it is read from the store
+        for profile_data in profiles:
+            totals[0] += 1
+            if commit_every <= 0:
+                counts = sync_profile(conn, profile_data, commit=True)
+            else:
+                cursor.execute("SAVEPOINT profile_sync")
+                try:
+                    counts = sync_profile(conn, profile_data, commit=False)
+                    cursor.execute("RELEASE SAVEPOINT profile_sync")
+                except Exception as e:
+                    print(f"Rolled back {profile_data.get('username')}: {e}")
+                    cursor.execute("ROLLBACK TO SAVEPOINT profile_sync")
+                    continue
+                pending += 1
+                if pending >= commit_every or time.time() - last_flush >= flush_seconds:
+                    conn.commit()
+                    commits += 1
+                    pending = 0
+                    last_flush = time.time()
+            for i, count in enumerate(counts):
+                totals[i + 1] += count
+        if pending:
+            conn.commit()
+            commits += 1
+    finally:
+        cursor.close()
+    elapsed = time.time() - started
+    if commit_every > 0:
+        print(f"Synced {totals[1]} profiles in {commits} transactions ({totals[1] / elapsed if elapsed else 0:.0f} profiles/s)")
+    return totals
+
+def sync_profiles_bulk(conn, profiles, batch_size=DEFAULT_BATCH_SIZE, raise_errors=False):
+    """Bulk sync mode: upserts profiles batch_size at a time with one statement per batch.
+    Returns (loaded, profiles, reels, user_requests, scrape_requests) totals. A failed statement
+    is rolled back and the sync carries on, unless raise_errors=True, which stops and re-raises."""
+    schema = get_schema(conn)
+    totals = [0, 0, 0, 0, 0]
+    started = datetime.now()
+    profiles = iter(profiles)
+    while True:
+        batch = list(islice(profiles, batch_size))
+        if not batch:
+            break
+        totals[0] += len(batch)
+        profile_ids = bulk_upsert_instagram_profiles(conn, batch, schema, raise_errors)
+        totals[1] += len(profile_ids)
+        reel_batch = [
+            (profile_ids[profile_data["username"]], reel)
+            for profile_data in batch if profile_data.get("username") in profile_ids
+            for reel in profile_data.get("reels") or []]
+        reels_inserted, reels_updated = bulk_merge_reels(conn, reel_batch, schema["reel_columns"], raise_errors)
+        totals[2] += reels_inserted + reels_updated
+        print(f"Merged reels for batch: {reels_inserted} inserted, {reels_updated} updated")
+        user_requests, scrape_requests = bulk_update_requests(
+            conn, profile_ids, schema["has_user_requests"], schema["has_scrape_requests"], raise_errors)
+        totals[3] += user_requests
+        totals[4] += scrape_requests
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"Upserted {totals[1]} profiles so far ({totals[1] / elapsed if elapsed else 0:.0f} profiles/s)")
+    return totals
+
 def main():
+    parser = argparse.ArgumentParser(description='Sync scraped profiles into the database')
+    parser.add_argument('--bulk', action='store_true', help='Upsert profiles in batches with one statement per batch')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Profiles per batch in --bulk mode (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--prepare', action='store_true', help='Use server-side prepared statements for the row-by-row sync')
+    parser.add_argument('--commit-every', type=int, default=DEFAULT_COMMIT_EVERY,
+                        help=f'Profiles per transaction in the row-by-row sync, 0 to commit every statement (default: {DEFAULT_COMMIT_EVERY})')
+    parser.add_argument('--flush-seconds', type=float, default=DEFAULT_FLUSH_SECONDS,
+                        help=f'Commit a partial transaction after this many seconds (default: {DEFAULT_FLUSH_SECONDS})')
+    args = parser.parse_args()
+
     print(f"=== Instagram Scraper Database Update ===")
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -411,10 +637,8 @@ def main():
     if not load_env():
         sys.exit(1)
     
-    # Load profile data from JSON file
-    profile_data_list = load_profile_data()
-    
-    if not profile_data_list:
+    if not os.path.exists(PROFILE_DATA_FILE):
+        print(f"Error: {PROFILE_DATA_FILE} not found")
         print("No profile data to process")
         sys.exit(0)
     
@@ -422,38 +646,25 @@ def main():
     conn = connect_to_database()
     
     try:
-        total_profiles = 0
-        total_reels = 0
-        total_user_requests = 0
-        total_scrape_requests = 0
+        # Read the catalog once for this connection; the sync loops only bind parameters
+        get_schema(conn, prepare=args.prepare)
+        if args.bulk:
+            try:
+                # Stop at the first failed batch so callers never complete requests whose rows were rolled back
+                totals = sync_profiles_bulk(conn, load_profile_data(), max(1, args.batch_size), raise_errors=True)
+            except Exception as e:
+                print(f"Bulk sync stopped: {e}")
+                sys.exit(1)
+        else:
+            totals = sync_profiles(conn, load_profile_data(), args.commit_every, args.flush_seconds)
+        total_loaded, total_profiles, total_reels, total_user_requests, total_scrape_requests = totals
         
-        # Process each profile
-        for profile_data in profile_data_list:
-            username = profile_data.get("username")
-            if not username:
-                continue
-                
-            # Create or update InstagramProfile
-            profile_id = get_or_create_instagram_profile(conn, profile_data)
-            if not profile_id:
-                continue
-                
-            total_profiles += 1
-                
-            # Update Reel data
-            reels = profile_data.get("reels", [])
-            update_reel_data(conn, profile_id, reels)
-            total_reels += len(reels)
-            
-            # Update UserRequest records
-            user_requests = update_user_requests(conn, username, profile_id)
-            total_user_requests += user_requests
-            
-            # Update ScrapeRequest records
-            scrape_requests = update_scrape_requests(conn, username, profile_id)
-            total_scrape_requests += scrape_requests
+        if not total_loaded:
+            print("No profile data to process")
+            return
         
         print(f"\nDatabase update summary:")
+        print(f"- Profiles read from {PROFILE_DATA_FILE}: {total_loaded}")
         print(f"- Profiles processed: {total_profiles}")
         print(f"- Reels processed: {total_reels}")
         print(f"- UserRequest records updated: {total_user_requests}")
@@ -461,8 +672,8 @@ def main():
         
         print(f"\nProcess completed successfully at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     finally:
-        conn.close()
-        print("Database connection closed")
+        release_connection(conn)
+        close_pool()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
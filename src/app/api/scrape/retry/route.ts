@@ -87,8 +87,14 @@ export async function POST(req: NextRequest) {
         },
         data: {
           status: "pending",
+          lane: "interactive",
           lastQueued: new Date(),
           updatedAt: new Date(),
+          // A manual retry starts a fresh attempt budget
+          attempts: 0,
+          nextAttemptAt: null,
+          leaseExpiresAt: null,
+          claimedBy: null,
         },
       });
     } else {
@@ -99,6 +105,7 @@ export async function POST(req: NextRequest) {
           scrapeRequestId: updatedRequest.id,
           username: scrapeRequest.username,
           status: "pending",
+          lane: "interactive",
         },
       });
     }
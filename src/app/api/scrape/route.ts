@@ -93,7 +93,17 @@ export async function POST(req: NextRequest) {
 
     // 3. Logic for adding to QueuedRequest table
     if (existingQueuedRequest) {
-      // Request was already queued within 24 hours
+      // Request was already queued within 24 hours. If it is a background refresh
+      // still waiting, a user now wants it: move it to the interactive lane
+      if (
+        existingQueuedRequest.status === "pending" &&
+        existingQueuedRequest.lane === "bulk"
+      ) {
+        await prisma.queuedRequest.update({
+          where: { id: existingQueuedRequest.id },
+          data: { lane: "interactive" },
+        });
+      }
       return NextResponse.json({
         message: "Request already queued within last 24 hours",
         requestId: userRequest.id,
@@ -119,6 +129,7 @@ export async function POST(req: NextRequest) {
           scrapeRequestId: scrapeRequest.id,
           username,
           status: "pending",
+          lane: "interactive",
         },
       });
 